@@ -0,0 +1,321 @@
+import os
+import re
+import json
+import fnmatch
+import sqlite3
+import numpy as np
+import pandas as pd
+
+from .Defaults import DEFAULT_CONDITIONING_STRUCTURE, DEFAULT_TEMPERATURE_STRUCTURE, DEFAULT_FE_STRUCTURE, LABVIEW_TIMESTAMP_OFFSET
+from . import Data
+from .FileIndex import count_newlines, skip_lines, read_line_at, read_last_row, get_field
+
+DEFAULT_CATALOG_FILENAME = '.sparkdc_catalog.sqlite' # the default name of the catalog database, inside the data folder
+CATALOG_VERSION = 2
+RUN_FILENAME = 'Marx_data.txt' # the file containing the data of a conditioning run
+RUN_FOLDER_PATTERN = re.compile(r'^(?:(\d{4})_(\d{2})_(\d{2})_)?.*?(\d+)$') # e.g. 2023_06_14_066_RFQ_Nb_rm1_006: the date and the run number
+
+# the folders of the data root containing measurement files, with the settings used for indexing their files
+MEASUREMENT_FOLDERS = {
+    'CryoDC':           {'kind': 'status',          'pattern': 'cryodc_*.dat',  'timestamp_col': DEFAULT_TEMPERATURE_STRUCTURE['timestamp']['col'], 'delimiter': '\t', 'skiprows': 0},
+    'FieldEmission':    {'kind': 'field_emission',  'pattern': '*.dat',         'timestamp_col': DEFAULT_FE_STRUCTURE['timestamp']['col'],          'delimiter': '\t', 'skiprows': 1},
+    'RGA':              {'kind': 'rga',             'pattern': '*',             'timestamp_col': None,                                              'delimiter': ',',  'skiprows': 22},
+}
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)",
+    "CREATE TABLE IF NOT EXISTS runs (electrode TEXT NOT NULL, run INTEGER NOT NULL, date TEXT, path TEXT NOT NULL, size INTEGER, mtime_ns INTEGER, \
+        n_rows INTEGER, first_timestamp REAL, last_timestamp REAL, total_pulses REAL, total_BDs REAL, PRIMARY KEY (electrode, run))",
+    "CREATE TABLE IF NOT EXISTS files (kind TEXT NOT NULL, path TEXT NOT NULL, size INTEGER, mtime_ns INTEGER, \
+        n_rows INTEGER, first_timestamp REAL, last_timestamp REAL, PRIMARY KEY (kind, path))",
+    "CREATE INDEX IF NOT EXISTS files_by_time ON files (kind, first_timestamp)",
+]
+
+class Catalog():
+    """
+    Persistent catalog of a data root: the electrodes, their conditioning runs and the measurement files (CryoDC, FieldEmission, RGA).
+    For each run it stores the date, the run number, the path, the number of rows, the first and the last timestamp and the total number of pulses and BDs.
+    For each measurement file it stores the number of rows and, if known, the first and the last timestamp.
+    The catalog is stored in a SQLite database and it is updated incrementally: only the files which were added or changed since the last update are read.
+    The runs and the files are found with the indexes of the database, without scanning the folders.
+
+    Parameters
+    ----------
+    data_folder:            str
+                            The data root, containing one folder per electrode (with one folder per run) and the measurement folders
+    db_path:                str, default: None
+                            The path of the database. If None, the file '.sparkdc_catalog.sqlite' from data_folder is used
+    measurement_folders:    dict, default: MEASUREMENT_FOLDERS
+                            The folders of the data root containing measurement files: {folder: {'kind', 'pattern', 'timestamp_col', 'delimiter', 'skiprows'}}.
+                            All the other folders are treated as electrodes
+    update:                 bool, default: True
+                            If True, the catalog is updated when it is opened
+
+    Example
+    -------
+    catalog = Catalog('./Example Data')
+    catalog.get_runs('066_RFQ_Nb_rm1')
+    cond_data = ConditioningData.read_runs('./Example Data', '066_RFQ_Nb_rm1', [1, 2, 3], catalog = catalog)
+    """
+
+    def __init__(self, data_folder, db_path = None, measurement_folders = MEASUREMENT_FOLDERS, update = True):
+        self.data_folder = data_folder
+        self.db_path = db_path if db_path is not None else os.path.join(data_folder, DEFAULT_CATALOG_FILENAME)
+        self.measurement_folders = measurement_folders
+        self.connection = sqlite3.connect(self.db_path)
+        self.__open__()
+        if update:
+            self.update()
+
+    def update(self, kinds = None):
+        """
+        Updates the catalog with the runs and the files that were added, changed or removed since the last update
+
+        Parameters
+        ----------
+        kinds:          list of str, default: None
+                        The kinds of data updated: 'runs' and the kinds of the measurement folders (e.g. 'status'). If None, everything is updated
+
+        Returns
+        -------
+        changed:        bool
+                        True if the catalog changed
+        """
+        changed = False
+        with self.connection:
+            if kinds is None or 'runs' in kinds:
+                changed = self.__update_runs__() or changed
+            for folder, settings in self.measurement_folders.items():
+                if kinds is None or settings['kind'] in kinds:
+                    changed = self.__update_files__(folder, settings) or changed
+        return changed
+
+    def get_electrodes(self):
+        """
+        Returns the names of the electrodes which have at least one run
+
+        Returns
+        -------
+        electrodes:     list of str
+        """
+        return [row[0] for row in self.connection.execute("SELECT DISTINCT electrode FROM runs ORDER BY electrode")]
+
+    def get_runs(self, electrode = None):
+        """
+        Returns the runs of an electrode (or of all the electrodes)
+
+        Parameters
+        ----------
+        electrode:      str, default: None
+                        The name of the electrode. If None, the runs of all the electrodes are returned
+
+        Returns
+        -------
+        runs:           pandas.core.frame.DataFrame
+                        The columns 'electrode', 'run', 'date', 'path' (of the Marx_data.txt file), 'n_rows', 'first_timestamp', 'last_timestamp'
+                        (unix timestamps), 'total_pulses' and 'total_BDs', sorted by electrode and run
+        """
+        query = "SELECT electrode, run, date, path, n_rows, first_timestamp, last_timestamp, total_pulses, total_BDs FROM runs"
+        if electrode is None:
+            runs = pd.read_sql_query(query + " ORDER BY electrode, run", self.connection)
+        else:
+            runs = pd.read_sql_query(query + " WHERE electrode = ? ORDER BY run", self.connection, params = (electrode,))
+        runs['path'] = [os.path.join(self.data_folder, path) for path in runs['path']]
+        return runs
+
+    def get_run_paths(self, electrode, runs):
+        """
+        Returns the paths of the Marx_data.txt files of the selected runs. If a run is not found (or its file was removed), the runs of the catalog
+        are updated once, such that the runs started or moved since the last update are found
+
+        Parameters
+        ----------
+        electrode:      str
+                        The name of the electrode
+        runs:           list of int
+                        The run numbers
+
+        Returns
+        -------
+        file_paths:     list of str
+        """
+        paths = self.__find_runs__(electrode, runs)
+        if any(path is None or not os.path.isfile(os.path.join(self.data_folder, path)) for path in paths):
+            self.update(kinds = ['runs'])
+            paths = self.__find_runs__(electrode, runs)
+        missing = [run for run, path in zip(runs, paths) if path is None]
+        if len(missing) > 0:
+            raise ValueError(f"Runs {missing} of the electrode {electrode} not found in {self.data_folder}")
+        return [os.path.join(self.data_folder, path) for path in paths]
+
+    def files_between_timestamps(self, timestamp_limits, kind = 'status'):
+        """
+        Returns the measurement files which contain data in the inclusive range timestamp_limits[0], timestamp_limits[1]
+
+        Parameters
+        ----------
+        timestamp_limits:   list of double
+                            The unix timestamp limits
+        kind:               str, default: 'status'
+                            The kind of the files (e.g. 'status' or 'field_emission')
+
+        Returns
+        -------
+        file_paths:         list of str
+                            The full paths of the files, in ascending time order
+        """
+        rows = self.connection.execute("SELECT path FROM files WHERE kind = ? AND n_rows > 0 AND first_timestamp <= ? AND last_timestamp >= ? \
+            ORDER BY first_timestamp, path", (kind, float(timestamp_limits[1]), float(timestamp_limits[0])))
+        return [os.path.join(self.data_folder, row[0]) for row in rows]
+
+    def get_files(self, kind):
+        """
+        Returns the measurement files of a kind
+
+        Parameters
+        ----------
+        kind:           str
+                        The kind of the files (e.g. 'status', 'field_emission' or 'rga')
+
+        Returns
+        -------
+        files:          pandas.core.frame.DataFrame
+                        The columns 'path', 'size', 'n_rows', 'first_timestamp' and 'last_timestamp' (unix timestamps, NaN if not known), sorted by path
+        """
+        files = pd.read_sql_query("SELECT path, size, n_rows, first_timestamp, last_timestamp FROM files WHERE kind = ? ORDER BY path", \
+            self.connection, params = (kind,))
+        files['path'] = [os.path.join(self.data_folder, path) for path in files['path']]
+        return files
+
+    def close(self):
+        """
+        Closes the database
+        """
+        self.connection.close()
+
+    def __open__(self):
+        """
+        Creates the tables of the database. The catalog is emptied if it was made with a different version or different settings
+        """
+        settings = json.dumps({'version': CATALOG_VERSION, 'measurement_folders': self.measurement_folders}, sort_keys = True)
+        with self.connection:
+            for statement in SCHEMA:
+                self.connection.execute(statement)
+            saved = self.connection.execute("SELECT value FROM meta WHERE key = 'settings'").fetchone()
+            if saved is None or saved[0] != settings:
+                self.connection.execute("DELETE FROM runs")
+                self.connection.execute("DELETE FROM files")
+                self.connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('settings', ?)", (settings,))
+
+    def __find_runs__(self, electrode, runs):
+        """
+        Returns the relative path of each run, or None if the run is not in the catalog
+        """
+        paths = []
+        for run in runs:
+            row = self.connection.execute("SELECT path FROM runs WHERE electrode = ? AND run = ?", (electrode, int(run))).fetchone()
+            paths.append(row[0] if row is not None else None)
+        return paths
+
+    def __update_runs__(self):
+        """
+        Updates the runs of all the electrodes. The runs which did not change are not read again
+        """
+        stored = {(row[0], row[1]): row[2:] for row in self.connection.execute("SELECT electrode, run, path, size, mtime_ns FROM runs")}
+        found = set()
+        changed = False
+        for electrode_entry in sorted(os.scandir(self.data_folder), key = lambda entry: entry.name):
+            if not electrode_entry.is_dir() or electrode_entry.name.startswith('.') or electrode_entry.name in self.measurement_folders:
+                continue
+            electrode = electrode_entry.name
+            for run_entry in sorted(os.scandir(electrode_entry.path), key = lambda entry: entry.name):
+                match = RUN_FOLDER_PATTERN.match(run_entry.name)
+                file_path = os.path.join(run_entry.path, RUN_FILENAME)
+                if not run_entry.is_dir() or electrode not in run_entry.name or match is None or not os.path.isfile(file_path):
+                    continue
+                run = int(match.group(4))
+                if (electrode, run) in found: # the same run number in several folders, the first folder is used
+                    continue
+                found.add((electrode, run))
+                path = os.path.relpath(file_path, self.data_folder)
+                stat = os.stat(file_path)
+                if stored.get((electrode, run)) == (path, stat.st_size, stat.st_mtime_ns):
+                    continue # unchanged
+                date = f'{match.group(1)}-{match.group(2)}-{match.group(3)}' if match.group(1) is not None else None
+                self.connection.execute("INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", \
+                    (electrode, run, date, path, stat.st_size, stat.st_mtime_ns) + Catalog.__summarize_run__(file_path))
+                changed = True
+
+        for electrode, run in stored:
+            if (electrode, run) not in found: # the run was removed
+                self.connection.execute("DELETE FROM runs WHERE electrode = ? AND run = ?", (electrode, run))
+                changed = True
+        return changed
+
+    def __update_files__(self, folder, settings):
+        """
+        Updates the measurement files of a folder. The files which did not change are not read again
+        """
+        kind = settings['kind']
+        stored = {row[0]: row[1:] for row in self.connection.execute("SELECT path, size, mtime_ns FROM files WHERE kind = ?", (kind,))}
+        found = set()
+        changed = False
+        folder_path = os.path.join(self.data_folder, folder)
+        if os.path.isdir(folder_path):
+            for dir_entry in os.scandir(folder_path):
+                if not dir_entry.is_file() or dir_entry.name.startswith('.') or not fnmatch.fnmatch(dir_entry.name, settings['pattern']):
+                    continue
+                path = os.path.join(folder, dir_entry.name)
+                found.add(path)
+                stat = dir_entry.stat()
+                if stored.get(path) == (stat.st_size, stat.st_mtime_ns):
+                    continue # unchanged
+                self.connection.execute("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?)", \
+                    (kind, path, stat.st_size, stat.st_mtime_ns) + Catalog.__summarize_file__(dir_entry.path, stat.st_size, settings))
+                changed = True
+
+        for path in stored:
+            if path not in found: # the file was removed
+                self.connection.execute("DELETE FROM files WHERE kind = ? AND path = ?", (kind, path))
+                changed = True
+        return changed
+
+    @staticmethod
+    def __summarize_run__(file_path):
+        """
+        Returns the number of rows, the first and the last timestamp and the total number of pulses and BDs of a run
+        """
+        read_dict = {key: DEFAULT_CONDITIONING_STRUCTURE[key] for key in ['timestamp', 'all_pulses', 'BDs']}
+        df = Data.read_from_files(file_path, delimiter = '\s+', skiprows = 1, info_dict = read_dict).df
+        if df.shape[0] == 0:
+            return (0, None, None, None, None)
+        timestamp = df['timestamp'].to_numpy(dtype = float) - LABVIEW_TIMESTAMP_OFFSET
+        # the pulses and the BDs are counted from the start of the run, their totals are the last values
+        return (df.shape[0], Catalog.__to_sql__(np.nanmin(timestamp)), Catalog.__to_sql__(np.nanmax(timestamp)), \
+            Catalog.__to_sql__(df['all_pulses'].max()), Catalog.__to_sql__(df['BDs'].max()))
+
+    @staticmethod
+    def __summarize_file__(file_path, size, settings):
+        """
+        Returns the number of rows and the first and the last timestamp of a measurement file. Only the first and the last line are parsed
+        """
+        delimiter = None if settings['delimiter'] == '\\s+' else settings['delimiter']
+        with open(file_path, 'rb') as file:
+            n_newlines = count_newlines(file, 0, size)
+            # a last line which is still being written is not a row, the timestamp of the last complete row is used
+            last_line, last_is_row = read_last_row(file, size, delimiter)
+            n_rows = max(n_newlines + (1 if last_is_row else 0) - settings['skiprows'], 0)
+            if settings['timestamp_col'] is None or n_rows == 0:
+                return (n_rows, None, None)
+            first = get_field(read_line_at(file, skip_lines(file, 0, settings['skiprows'])), settings['timestamp_col'], delimiter)
+            last = get_field(last_line, settings['timestamp_col'], delimiter)
+        if first is None or last is None:
+            return (n_rows, None, None)
+        return (n_rows, first - LABVIEW_TIMESTAMP_OFFSET, last - LABVIEW_TIMESTAMP_OFFSET)
+
+    @staticmethod
+    def __to_sql__(value):
+        """
+        Converts a numpy value to a float, or None if it is NaN
+        """
+        return float(value) if np.isfinite(value) else None
@@ -0,0 +1,113 @@
+import pandas as pd
+
+STATS = ['count', 'min', 'max', 'mean'] # the statistics returned by ChunkStats
+
+class ChunkStats():
+    """
+    Streaming reducer of data chunks: computes the count (of non-NaN values), minimum, maximum and mean of each column, in total and per file,
+    without building the full data frame. Only the running statistics are kept in memory.
+
+    Parameters
+    ----------
+    keys:           str or list of str, default: None
+                    The keys of the columns to be reduced. If None, all the numeric columns of the first chunk are used
+    by:             str, default: 'file_id'
+                    The column used for grouping the statistics (e.g. 'file_id' or 'run_id')
+
+    Example
+    -------
+    stats = ChunkStats(['temp_A', 'temp_B'])
+    for chunk in StatusData.read_chunks(file_paths):
+        stats.update(chunk)
+    stats.total()     # the statistics of each column
+    stats.per_group() # the statistics of each column, for each file
+    """
+
+    def __init__(self, keys = None, by = 'file_id'):
+        if isinstance(keys, str):
+            keys = [keys]
+        self.keys = keys
+        self.by = by
+        self.count = None # the running statistics, data frames indexed by the group with one column per key
+        self.sum = None
+        self.min = None
+        self.max = None
+
+    def update(self, data):
+        """
+        Adds a chunk to the statistics
+
+        Parameters
+        ----------
+        data:           Data or pandas.core.frame.DataFrame
+                        The chunk
+        """
+        df = data.df if hasattr(data, 'df') else data
+        if self.keys is None:
+            self.keys = [key for key in df.select_dtypes(include = ['number', 'bool']).columns if key not in [self.by, 'file_id']]
+        keys = [key for key in self.keys if key in df]
+
+        grouped = df[keys].astype(float).groupby(df[self.by].to_numpy())
+        partial = [grouped.count(), grouped.sum(), grouped.min(), grouped.max()]
+        if self.count is None:
+            self.count, self.sum, self.min, self.max = partial
+            return
+        self.count = self.count.add(partial[0], fill_value = 0)
+        self.sum = self.sum.add(partial[1], fill_value = 0)
+        self.min = pd.concat([self.min, partial[2]]).groupby(level = 0).min()
+        self.max = pd.concat([self.max, partial[3]]).groupby(level = 0).max()
+
+    def per_group(self):
+        """
+        Returns the statistics of each column, for each group (e.g. file)
+
+        Returns
+        -------
+        stats:          pandas.core.frame.DataFrame
+                        Indexed by the values of the 'by' column, with the columns (key, stat), stat in ['count', 'min', 'max', 'mean']
+        """
+        if self.count is None:
+            return pd.DataFrame(columns = pd.MultiIndex.from_product([[], STATS]))
+        mean = self.sum / self.count.where(self.count > 0)
+        stats = pd.concat({'count': self.count.fillna(0).astype(int), 'min': self.min, 'max': self.max, 'mean': mean}, axis = 1)
+        stats = stats.swaplevel(axis = 1)
+        keys = [key for key in self.keys if key in self.count]
+        return stats.reindex(columns = pd.MultiIndex.from_product([keys, STATS]))
+
+    def total(self):
+        """
+        Returns the statistics of each column, over all the chunks
+
+        Returns
+        -------
+        stats:          pandas.core.frame.DataFrame
+                        Indexed by the keys, with the columns ['count', 'min', 'max', 'mean']
+        """
+        if self.count is None:
+            return pd.DataFrame(columns = STATS)
+        count = self.count.sum()
+        stats = pd.DataFrame({'count': count.astype(int), 'min': self.min.min(), 'max': self.max.max(), 'mean': self.sum.sum() / count.where(count > 0)})
+        return stats.loc[[key for key in self.keys if key in stats.index]]
+
+    @staticmethod
+    def reduce(chunks, keys = None, by = 'file_id'):
+        """
+        Reduces an iterator of chunks
+
+        Parameters
+        ----------
+        chunks:         iterator of Data
+                        For example the result of Data.read_chunks()
+        keys:           str or list of str, default: None
+                        The keys of the columns to be reduced. If None, all the numeric columns are used
+        by:             str, default: 'file_id'
+                        The column used for grouping the statistics
+
+        Returns
+        -------
+        stats:          ChunkStats
+        """
+        stats = ChunkStats(keys, by = by)
+        for chunk in chunks:
+            stats.update(chunk)
+        return stats
@@ -1,17 +1,35 @@
 import os
+import re
 import glob
 import pandas as pd
 import numpy as np
 
 from . import Data
-from .Defaults import DEFAULT_CONDITIONING_STRUCTURE, DEFAULT_STYLE, LABVIEW_TIMESTAMP_OFFSET
+from .Defaults import DEFAULT_CONDITIONING_STRUCTURE, DEFAULT_STYLE, LABVIEW_TIMESTAMP_OFFSET, DEFAULT_CHUNKSIZE
 from . import Utils
+from .LiveData import Follower
+from .Catalog import Catalog
 
 
 DEFAULT_FILENAME = 'Marx_data.txt' # the filename containing the data from the Marx generator
 
 INVALID_RUN_INDEX = -99999
 
+# the columns of the breakdown event table taken from the data frame, {name in the table: key in the data frame}, see ConditioningData.get_breakdowns()
+BREAKDOWN_COLUMNS = {
+    'pulse':            'all_pulses',
+    'timestamp':        'timestamp',
+    'field':            'field',
+    'target_field':     'target_field',
+    'pulses_before_BD': 'pulses_before_BD',
+}
+
+# the columns needed for calculating each derived column
+DERIVED_COLUMNS = {
+    'target_field': ['target_voltage', 'gap'],
+    'field':        ['output_voltage', 'gap'],
+}
+
 class ConditioningData(Data):
     """
     ConditioningData Class for SparkDC Data
@@ -29,22 +47,30 @@ class ConditioningData(Data):
 
     electrode_name: str, default: ''
                          The name of the electrode
+    calculate_derived: bool, default: True
+                         If False, the derived columns are not (re)calculated, e.g. because they are already in the data frame
     """
 
-    def __init__(self, *args, electrode_name = ''):
+    INVALID_RUN_INDEX = INVALID_RUN_INDEX # the index returned by get_run_separators() for runs which are not found
+
+    def __init__(self, *args, electrode_name = '', calculate_derived = True):
         self.electrode_name = electrode_name
         super().__init__(*args)
-        self.calculate_derived_columns()
+        if calculate_derived:
+            self.calculate_derived_columns()
 
     def calculate_derived_columns(self):
         """
-        (Re)calculates the derived columns: 'target_field' and 'field'
+        (Re)calculates the derived columns: 'target_field' and 'field'. A derived column is skipped if the columns needed for calculating it were not read
         """
-        self.df['target_field'] = (self.df['target_voltage'] / self.df['gap'])
-        self.add_info_dict_entry('target_field', label = 'Target Field', unit = 'MV/m')
+        if 'target_voltage' in self.df and 'gap' in self.df:
+            self.df['target_field'] = (self.df['target_voltage'] / self.df['gap'])
+            self.add_info_dict_entry('target_field', label = 'Target Field', unit = 'MV/m')
 
-        self.df['field'] = (self.df['output_voltage'] / self.df['gap'])
-        self.add_info_dict_entry('field', label = 'Electric Field', unit = 'MV/m')
+        if 'output_voltage' in self.df and 'gap' in self.df:
+            self.df['field'] = (self.df['output_voltage'] / self.df['gap'])
+            self.add_info_dict_entry('field', label = 'Electric Field', unit = 'MV/m')
+        self.invalidate()
 
     def get_run_separators(self, run_id, key = 'run_id'):
         """
@@ -69,25 +95,147 @@ class ConditioningData(Data):
         elif len(dim) > 1:
             raise ValueError("Invalid run_id")
 
-        run_separators = np.empty([len(run_id), 2], dtype = int)
+        # the first and the last row of each run, from the cached segment index
+        values, separators = self.get_segments(key)
+        run_separators = np.full([len(run_id), 2], INVALID_RUN_INDEX, dtype = int)
 
         for j in range(0, len(run_id)):
-            mask = self.df[key] == run_id[j]
-            if any(mask):
-                start = np.min(np.argwhere(mask))
-                end = np.max(np.argwhere(mask))
-
-                run_separators[j, 0] = start
-                run_separators[j, 1] = end
-            else: # if run not found
-                run_separators[j, 0] = ConditioningData.INVALID_RUN_INDEX
-                run_separators[j, 1] = ConditioningData.INVALID_RUN_INDEX
+            found = np.flatnonzero(values == run_id[j])
+            if len(found) > 0:
+                run_separators[j, 0] = separators[found[0], 0]
+                run_separators[j, 1] = separators[found[-1], 1]
 
         if len(dim) == 0:
             return run_separators[0]
         else:
             return run_separators
 
+    def get_breakdowns(self, baseline = 0):
+        """
+        Get the breakdown event table: one event per breakdown, found in one vectorized pass from the increments of the cumulative 'BDs' column.
+        A row in which n breakdowns were counted gives n events with the values of that row. The BDs counter of the Marx generator restarts at every run,
+        therefore the BDs counted in the first row of the data read from the files are events of the first row.
+        The table is cached until the data frame is modified, see Data.invalidate()
+
+        Parameters
+        ----------
+        baseline:       float or ['first'], default: 0
+                        The value of the 'BDs' counter before the first row. For a slice of the data (e.g. not starting at the start of a run),
+                        pass the BDs counted before the slice, or 'first' to use the first row as the baseline (its BDs are then not events)
+
+        Returns
+        -------
+        breakdowns:     dict of numpy.ndarray
+                        The contiguous (read-only) arrays of the events:
+                        'row'               - the index of the row in which the breakdown was counted
+                        'pulse'             - the cumulative number of pulses ('all_pulses') at that row
+                        'timestamp'         - the timestamp of the row
+                        'field'             - the electric field
+                        'target_field'      - the target field
+                        'run_id'            - the run number, ConditioningData.INVALID_RUN_INDEX if the 'run_id' column is not present
+                        'pulses_before_BD'  - the pulses before the breakdown, as reported by the Marx generator
+                        'time_since_BD'     - the time since the previous breakdown (NaN for the first one, 0 for the other breakdowns of the same row)
+                        The columns which are not in the data frame are filled with NaN
+        """
+        if 'BDs' not in self.df:
+            raise ValueError("The 'BDs' column is needed for the breakdown table!")
+        cached = self.__get_cached__(('breakdowns', baseline))
+        if cached is not None:
+            return cached
+
+        # the number of breakdowns counted in each row. NaN values do not count, a decreasing counter (e.g. a reset) gives no breakdowns
+        bds = self.df['BDs'].ffill().fillna(0).to_numpy(dtype = float)
+        if baseline == 'first':
+            baseline = bds[0] if bds.shape[0] > 0 else 0
+        new_bds = np.clip(np.rint(np.diff(bds, prepend = baseline)), 0, None).astype(int)
+        rows = np.repeat(np.arange(bds.shape[0]), new_bds)
+
+        breakdowns = {'row': rows}
+        for name, key in BREAKDOWN_COLUMNS.items():
+            breakdowns[name] = self.df[key].to_numpy(dtype = float)[rows] if key in self.df else np.full([rows.shape[0]], np.nan)
+        if 'run_id' in self.df:
+            breakdowns['run_id'] = self.df['run_id'].to_numpy(dtype = int)[rows]
+        else:
+            breakdowns['run_id'] = np.full([rows.shape[0]], INVALID_RUN_INDEX, dtype = int)
+        breakdowns['time_since_BD'] = np.diff(breakdowns['timestamp'], prepend = np.nan)
+        for array in breakdowns.values():
+            array.flags.writeable = False # the arrays are cached, they should not be modified
+
+        return self.__set_cached__(('breakdowns', baseline), breakdowns)
+
+    def calculate_BDR(self, windows, by = None, full_windows = False, add_columns = False):
+        """
+        Recalculates the breakdown rate (BDs per pulse) over user-chosen pulse windows, from the prefix sums 'all_pulses' and 'BDs'.
+        The start of each window is found with a binary search, therefore the cost does not depend on the size of the windows.
+        The windows are aligned to the rows: the window of a row ends at the row and starts at the last row (of the same group)
+        with at most all_pulses - window pulses
+
+        Parameters
+        ----------
+        windows:        int, str or list
+                        The windows: a number of pulses (sliding window), 'cumulative' (from the start of the group) or 'total' (the BDR of the whole group)
+        by:             str, default: None
+                        The column defining the groups (e.g. 'run_id' or 'target_field' for the field plateaus): each set of consecutive rows
+                        with the same value is a group and the windows do not cross the groups. If None, the whole data is one group
+        full_windows:   bool, default: False
+                        If True, the BDR of the sliding windows reaching before the start of their group is NaN.
+                        Otherwise, it is calculated over the pulses available in the group
+        add_columns:    bool, default: False
+                        If True, the results are added to the data frame as the columns 'BDR_' + window (+ '_' + by), e.g. 'BDR_1000000' or 'BDR_total_run_id'
+
+        Returns
+        -------
+        BDR:            dict of numpy.ndarray
+                        The BDR of each row, for each window
+        """
+        for key in ['all_pulses', 'BDs']:
+            if key not in self.df:
+                raise ValueError(f"The '{key}' column is needed for calculating the BDR!")
+        if len(Utils.dim(windows)) == 0:
+            windows = [windows]
+        n_rows = self.df.shape[0]
+
+        # the prefix sums, preceded by 0 such that the index k is the end of row k-1. A decreasing counter is not counted back
+        pulses = np.concatenate([[0], np.maximum.accumulate(self.df['all_pulses'].ffill().fillna(0).to_numpy(dtype = float))])
+        bds = np.concatenate([[0], self.df['BDs'].ffill().fillna(0).to_numpy(dtype = float)])
+        end = np.arange(1, n_rows + 1)
+        if by is None:
+            separators = np.array([[0, n_rows - 1]]) if n_rows > 0 else np.empty([0, 2], dtype = int)
+        else:
+            separators = self.get_segments(by)[1]
+        group_size = separators[:, 1] - separators[:, 0] + 1
+        group_start = np.repeat(separators[:, 0], group_size) # the prefix index before the first row of the group of each row
+
+        BDR = {}
+        for window in windows:
+            if window == 'cumulative':
+                lower, upper = group_start, end
+            elif window == 'total':
+                lower, upper = group_start, np.repeat(separators[:, 1] + 1, group_size)
+            elif isinstance(window, str):
+                raise ValueError(f"Invalid window '{window}'. Valid windows: a number of pulses, 'cumulative' or 'total'")
+            else:
+                lower = np.searchsorted(pulses, pulses[end] - window, side = 'right') - 1
+                partial = lower < group_start
+                lower = np.maximum(lower, group_start)
+                upper = end
+            with np.errstate(invalid = 'ignore', divide = 'ignore'):
+                rate = (bds[upper] - bds[lower]) / (pulses[upper] - pulses[lower])
+            rate[pulses[upper] == pulses[lower]] = np.nan
+            if full_windows and not isinstance(window, str):
+                rate[partial] = np.nan
+            BDR[window] = rate
+
+            if add_columns:
+                name = window if isinstance(window, str) else f'{window:.0f}' # e.g. 1e6 gives 'BDR_1000000'
+                key = f'BDR_{name}' + (f'_{by}' if by is not None else '')
+                label = {'cumulative': 'Cumulative BDR', 'total': 'Total BDR'}.get(window, f'BDR ({name} pulses)')
+                self.df[key] = rate
+                self.add_info_dict_entry(key, label = label + (f' per {by}' if by is not None else ''), unit = '')
+        if add_columns:
+            self.invalidate()
+        return BDR
+
 
     def plot_standard(self, first_axis = 'field', second_axis = 'BDs', third_axis = 'BDR', plot_third_axis = False, log_third_axis = True,\
         figsize = (20, 8), fontsize = 15, fontweight = 'normal', marker = None, markersize = 5, linestyle = '-', linewidth = 2, stripe = True,\
@@ -179,7 +327,8 @@ class ConditioningData(Data):
         return fplot
 
     @staticmethod
-    def read_from_files(file_paths, header = None, delimiter = '\s+', skiprows = 1, engine ='python', info_dict = DEFAULT_CONDITIONING_STRUCTURE, electrode_name = ''):
+    def read_from_files(file_paths, header = None, delimiter = '\s+', skiprows = 1, engine ='c', info_dict = DEFAULT_CONDITIONING_STRUCTURE, electrode_name = '', \
+        cache = None, n_workers = 1, columns = None, compact = False):
         """
         Reads data from multiple files
 
@@ -193,24 +342,36 @@ class ConditioningData(Data):
                         The delimiter used in the file.
         info_dict:      dict, default: DEFAULT_CONDITIONING_STRUCTURE
                         The info_dict of the file
-        engine:         str, default: 'python'
-                        Parser engine to use. The C and pyarrow engines are faster, while the python engine is currently more feature-complete. Multithreading is currently only supported by the pyarrow engine.
+        engine:         str, default: 'c'
+                        Parser engine to use. The C engine tokenizes the whitespace separated Marx files with the compiled parser ('\s+' is handled natively),
+                        giving results identical to the much slower python engine.
         skiprows:       int, default: 1
                         Skips the first N rows when reading the file
         electrode_name: str, default: ''
                              The name of the electrode
+        cache:          ParseCache, default: None
+                        If not None, the parsed files are loaded from (and stored in) this on-disk cache instead of being parsed every time
+        n_workers:      int, default: 1
+                        The number of files parsed at the same time. If 1, the files are parsed sequentially
+        columns:        str or list of str, default: None
+                        The keys of the columns to be read. Only these columns (and the ones needed for the requested derived columns) are parsed.
+                        If None, all the columns are read
+        compact:        bool, default: False
+                        If True, the columns are converted to the compact dtypes declared in the info_dict. See Data.read_from_files()
 
         Returns
         -------
         cond_data:      ConditioningData
                         ConditioningData object corresponding to the data read from the file_paths
         """
-        data = Data.read_from_files(file_paths, header = header, delimiter = delimiter, engine = engine, skiprows = skiprows, info_dict = DEFAULT_CONDITIONING_STRUCTURE)
+        data = Data.read_from_files(file_paths, header = header, delimiter = delimiter, engine = engine, skiprows = skiprows, info_dict = info_dict, \
+            cache = cache, n_workers = n_workers, columns = Data.__get_read_columns__(columns, DERIVED_COLUMNS), compact = compact)
         cond_data = ConditioningData(data.df, data.info_dict, electrode_name = electrode_name)
         return cond_data
 
     @staticmethod
-    def read_runs(data_folder, electrode, runs, header = None, delimiter = '\s+', skiprows = 1, engine ='python', info_dict = DEFAULT_CONDITIONING_STRUCTURE):
+    def read_runs(data_folder, electrode, runs, header = None, delimiter = '\s+', skiprows = 1, engine ='c', info_dict = DEFAULT_CONDITIONING_STRUCTURE, cache = None, n_workers = 1, \
+        columns = None, compact = False, catalog = None):
         """
         Reads the selected runs from the conditiong data folder
 
@@ -226,28 +387,289 @@ class ConditioningData(Data):
                         The delimiter used in the file.
         info_dict:      dict, default: DEFAULT_CONDITIONING_STRUCTURE
                         The info_dict of the file
-        engine:         str, default: 'python'
-                        Parser engine to use. The C and pyarrow engines are faster, while the python engine is currently more feature-complete. Multithreading is currently only supported by the pyarrow engine.
+        engine:         str, default: 'c'
+                        Parser engine to use. The C engine tokenizes the whitespace separated Marx files with the compiled parser ('\s+' is handled natively),
+                        giving results identical to the much slower python engine.
         skiprows:       int, default: 1
                         Skips the first N rows when reading the file
-        electrode_name: str, default: ''
-                             The name of the electrode
+        cache:          ParseCache, default: None
+                        If not None, the parsed files are loaded from (and stored in) this on-disk cache instead of being parsed every time
+        n_workers:      int, default: 1
+                        The number of files parsed at the same time. If 1, the files are parsed sequentially
+        columns:        str or list of str, default: None
+                        The keys of the columns to be read. Only these columns (and the ones needed for the requested derived columns) are parsed.
+                        If None, all the columns are read
+        compact:        bool, default: False
+                        If True, the columns are converted to the compact dtypes declared in the info_dict. See Data.read_from_files()
+        catalog:        Catalog or bool, default: None
+                        If not None, the paths of the runs are found in this catalog of the data folder instead of searching the electrode folder.
+                        If True, the catalog from data_folder is opened without updating it, the runs are updated only if a run is not found
 
         Returns
         -------
         cond_data:      ConditioningData
                         ConditioningData object
         """
+        files_to_read = ConditioningData.__get_run_paths__(data_folder, electrode, runs, catalog = catalog)
+        cond_data = ConditioningData.read_from_files(files_to_read, header = header, delimiter = delimiter, skiprows = skiprows, \
+        engine = engine, info_dict = info_dict, electrode_name = electrode, cache = cache, n_workers = n_workers, columns = columns, compact = compact)
+        col_len = cond_data.df.shape[1]
+
+        #make the run_id column, which shows the run number
+        cond_data.df.insert(col_len, "run_id", np.asarray(runs)[pd.Series.to_numpy(cond_data.df.file_id)], True) # runs can also be a list (e.g. from a report spec)
+        cond_data.invalidate()
+        return cond_data
+
+    @staticmethod
+    def read_chunks(file_paths, chunksize = DEFAULT_CHUNKSIZE, header = None, delimiter = '\s+', skiprows = 1, engine = 'c', \
+        info_dict = DEFAULT_CONDITIONING_STRUCTURE, electrode_name = '', columns = None, compact = False, runs = None):
+        """
+        Reads data from multiple files in chunks with at most chunksize rows, see Data.read_chunks().
+        The derived columns are calculated for each chunk
+
+        Parameters
+        ----------
+        file_paths:     str or list
+                        The filepaths from where the data will be read
+        chunksize:      int, default: 100000
+                        The maximum number of rows of a chunk
+        header:         int, default: None
+                        Row number(s) containing column labels and marking the start of the data (zero-indexed).
+        delimiter:      char, default: '\s+'
+                        The delimiter used in the file.
+        skiprows:       int, default: 1
+                        Skips the first N rows when reading the file
+        engine:         str, default: 'c'
+                        Parser engine to use
+        info_dict:      dict, default: DEFAULT_CONDITIONING_STRUCTURE
+                        The info_dict of the file
+        electrode_name: str, default: ''
+                        The name of the electrode
+        columns:        str or list of str, default: None
+                        The keys of the columns to be read. Only these columns (and the ones needed for the requested derived columns) are parsed.
+                        If None, all the columns are read
+        compact:        bool, default: False
+                        If True, the columns are converted to the compact dtypes declared in the info_dict
+        runs:           list of int, default: None
+                        The run number of each file. If not None, the 'run_id' column is added
+
+        Returns
+        -------
+        chunks:         iterator of ConditioningData
+        """
+        for data in Data.read_chunks(file_paths, chunksize = chunksize, header = header, delimiter = delimiter, engine = engine, skiprows = skiprows, \
+            info_dict = info_dict, columns = Data.__get_read_columns__(columns, DERIVED_COLUMNS), compact = compact):
+            cond_data = ConditioningData(data.df, data.info_dict, electrode_name = electrode_name)
+            if runs is not None:
+                cond_data.df['run_id'] = np.asarray(runs)[cond_data.df['file_id'].to_numpy()]
+            yield cond_data
+
+    @staticmethod
+    def read_runs_chunks(data_folder, electrode, runs, chunksize = DEFAULT_CHUNKSIZE, header = None, delimiter = '\s+', skiprows = 1, engine = 'c', \
+        info_dict = DEFAULT_CONDITIONING_STRUCTURE, columns = None, compact = False, catalog = None):
+        """
+        Reads the selected runs from the conditiong data folder in chunks with at most chunksize rows, see ConditioningData.read_runs()
+
+        Parameters
+        ----------
+        data_folder:    str
+                        The path corresponding to the folder containing the conditioning data
+        electrode:      str
+                        The id of the electrode
+        runs:           list of int
+                        The run numbers to be read
+        chunksize:      int, default: 100000
+                        The maximum number of rows of a chunk
+        delimiter:      char, default: '\s+'
+                        The delimiter used in the file.
+        skiprows:       int, default: 1
+                        Skips the first N rows when reading the file
+        engine:         str, default: 'c'
+                        Parser engine to use
+        info_dict:      dict, default: DEFAULT_CONDITIONING_STRUCTURE
+                        The info_dict of the file
+        columns:        str or list of str, default: None
+                        The keys of the columns to be read. If None, all the columns are read
+        compact:        bool, default: False
+                        If True, the columns are converted to the compact dtypes declared in the info_dict
+        catalog:        Catalog or bool, default: None
+                        If not None, the paths of the runs are found in this catalog, see ConditioningData.read_runs()
+
+        Returns
+        -------
+        chunks:         iterator of ConditioningData
+        """
+        files_to_read = ConditioningData.__get_run_paths__(data_folder, electrode, runs, catalog = catalog)
+        return ConditioningData.read_chunks(files_to_read, chunksize = chunksize, header = header, delimiter = delimiter, skiprows = skiprows, \
+            engine = engine, info_dict = info_dict, electrode_name = electrode, columns = columns, compact = compact, runs = runs)
+
+    @staticmethod
+    def __get_run_paths__(data_folder, electrode, runs, catalog = None):
+        """
+        Returns the paths of the Marx_data.txt files of the selected runs
+
+        Parameters
+        ----------
+        data_folder:    str
+        electrode:      str
+        runs:           list of int
+        catalog:        Catalog or bool, default: None
+                        If not None, the paths are found in the catalog instead of searching the electrode folder.
+                        If True, the catalog of data_folder is opened without updating it, the runs are updated only if a run is not found
+
+        Returns
+        -------
+        file_paths:     list of str
+        """
+        if catalog is True: # open the catalog of the data folder only for this lookup
+            catalog = Catalog(data_folder, update = False)
+            files_to_read = catalog.get_run_paths(electrode, runs)
+            catalog.close()
+            return files_to_read
+        if catalog is not None:
+            return catalog.get_run_paths(electrode, runs)
         electrode_path = os.path.join(data_folder, electrode)
         files_to_read = []
         for current_run in runs:
             run_path = glob.glob(f"{electrode_path}/*{electrode}*{current_run:03d}")[0] # make the path of the folder containing the .txt file
             file_path = os.path.join(run_path, DEFAULT_FILENAME)
             files_to_read.append(file_path)
-        cond_data = ConditioningData.read_from_files(files_to_read, header = header, delimiter = delimiter, skiprows = skiprows, \
-        engine = engine, info_dict = info_dict, electrode_name = electrode)
-        col_len = cond_data.df.shape[1]
+        return files_to_read
 
-        #make the run_id column, which shows the run number
-        cond_data.df.insert(col_len, "run_id", runs[pd.Series.to_numpy(cond_data.df.file_id)], True)
-        return cond_data
+    @staticmethod
+    def follow_runs(data_folder, electrode, runs = None, delimiter = '\s+', skiprows = 1, engine = 'c', info_dict = DEFAULT_CONDITIONING_STRUCTURE, columns = None):
+        """
+        Follows the conditioning runs while they are in progress. The returned ConditioningFollower ingests only the rows appended since the previous
+        refresh, keeping the additive columns, the derived columns and the run_id consistent with ConditioningData.read_runs()
+
+        Parameters
+        ----------
+        data_folder:    str
+                        The path corresponding to the folder containing the conditioning data
+        electrode:      str
+                        The id of the electrode
+        runs:           list of int, default: None
+                        The run numbers to be read. The last one is followed and the runs started later are added when they appear.
+                        If None, only the latest run is followed
+        delimiter:      char, default: '\s+'
+                        The delimiter used in the file.
+        skiprows:       int, default: 1
+                        Skips the first N rows when reading the file
+        engine:         str, default: 'c'
+                        Parser engine to use
+        info_dict:      dict, default: DEFAULT_CONDITIONING_STRUCTURE
+                        The info_dict of the file
+        columns:        str or list of str, default: None
+                        The keys of the columns to be read. Only these columns (and the ones needed for the requested derived columns) are parsed.
+                        If None, all the columns are read
+
+        Returns
+        -------
+        follower:       ConditioningFollower
+
+        Example
+        -------
+        follower = ConditioningData.follow_runs(data_folder, electrode, runs = [1, 2, 3])
+        new_data = follower.refresh() # call periodically, new_data contains only the new rows
+        cond_data = follower.data     # all the rows read so far
+        """
+        return ConditioningFollower(data_folder, electrode, runs = runs, delimiter = delimiter, skiprows = skiprows, engine = engine, info_dict = info_dict, \
+            columns = columns)
+
+class ConditioningFollower(Follower):
+    """
+    Follows the Marx_data.txt files of the conditioning runs of an electrode while they are written.
+    Each refresh() parses only the new rows of the active run. The additive columns ('all_pulses', 'BDs') continue from the previous runs,
+    while the derived columns and the run_id are calculated only for the new rows. See ConditioningData.follow_runs()
+
+    Parameters
+    ----------
+    data_folder:    str
+                    The path corresponding to the folder containing the conditioning data
+    electrode:      str
+                    The id of the electrode
+    runs:           list of int, default: None
+                    The run numbers to be read. If None, only the latest run is followed
+    delimiter:      char, default: '\s+'
+    skiprows:       int, default: 1
+    engine:         str, default: 'c'
+    info_dict:      dict, default: DEFAULT_CONDITIONING_STRUCTURE
+    columns:        str or list of str, default: None
+    """
+
+    def __init__(self, data_folder, electrode, runs = None, delimiter = '\s+', skiprows = 1, engine = 'c', info_dict = DEFAULT_CONDITIONING_STRUCTURE, \
+        columns = None):
+        super().__init__(delimiter = delimiter, engine = engine, skiprows = skiprows, info_dict = info_dict, \
+            columns = Data.__get_read_columns__(columns, DERIVED_COLUMNS))
+        self.electrode = electrode
+        self.electrode_path = os.path.join(data_folder, electrode)
+        self.runs = None if runs is None else np.array(runs, dtype = int)
+        self.run_ids = [] # the run number of each followed file
+        if self.runs is not None:
+            files = self.find_files()
+            if len(files) == 0:
+                raise ValueError(f"Runs {runs} not found in {self.electrode_path}")
+            self.__open_file__(files[0])
+
+    def find_files(self):
+        """
+        Returns the Marx_data.txt files of the selected runs and of the runs started after them, sorted by the run number
+
+        Returns
+        -------
+        file_paths:     list of str
+        """
+        found = []
+        for run_path in glob.glob(f"{self.electrode_path}/*{self.electrode}*"):
+            match = re.search(r'(\d+)$', run_path)
+            file_path = os.path.join(run_path, DEFAULT_FILENAME)
+            if match is None or not os.path.isfile(file_path):
+                continue
+            run = int(match.group(1))
+            if self.runs is None or run in self.runs or run > self.runs.max():
+                found.append((run, file_path))
+        found.sort()
+        return [file_path for run, file_path in found]
+
+    def get_run_separators(self, run_id):
+        """
+        Get the indices corresponding to the start and end of each run, from the number of rows read from each run.
+        Same format as ConditioningData.get_run_separators()
+
+        Parameters
+        ----------
+        run_id:     int or list of int
+
+        Returns
+        -------
+        run_separators: numpy.ndarray
+        """
+        dim = Utils.dim(run_id)
+        if len(dim) == 0:
+            run_id = [run_id]
+        n_points = np.array(self.n_points, dtype = int)
+        ends = np.cumsum(n_points)
+        run_separators = np.full([len(run_id), 2], INVALID_RUN_INDEX, dtype = int)
+        for j in range(0, len(run_id)):
+            if run_id[j] in self.run_ids:
+                i = self.run_ids.index(run_id[j])
+                if n_points[i] > 0:
+                    run_separators[j] = [ends[i] - n_points[i], ends[i] - 1]
+        if len(dim) == 0:
+            return run_separators[0]
+        return run_separators
+
+    def __open_file__(self, file_path):
+        super().__open_file__(file_path)
+        self.run_ids.append(int(re.search(r'(\d+)$', os.path.dirname(file_path)).group(1)))
+
+    def __postprocess__(self, df):
+        """
+        Calculates the derived columns and the run_id of the new rows
+        """
+        ConditioningData(df, self.info_dict, electrode_name = self.electrode) # adds the derived columns to df
+        df['run_id'] = np.array(self.run_ids, dtype = int)[df['file_id'].to_numpy()]
+
+    def __make_data__(self, df):
+        data = super().__make_data__(df)
+        return ConditioningData(data.df, data.info_dict, electrode_name = self.electrode, calculate_derived = False)
@@ -6,10 +6,14 @@ from dateutil import tz
 from zoneinfo import ZoneInfo
 import time
 import datetime
+import io
+import functools
+import concurrent.futures
 
 from . import Utils
 from . import FancyPlot
-from .Defaults import DEFAULT_TEMPERATURE_STRUCTURE, DEFAULT_STYLE
+from .Defaults import DEFAULT_TEMPERATURE_STRUCTURE, DEFAULT_STYLE, DEFAULT_CHUNKSIZE
+from .ParseCache import ParseCache
 
 class Data:
     """
@@ -31,6 +35,49 @@ class Data:
         self.df = df
         self.info_dict = info_dict
 
+    @property
+    def df(self):
+        """
+        The data frame. Replacing it invalidates the cached indices (e.g. the file separators)
+        """
+        return self.__df__
+
+    @df.setter
+    def df(self, df):
+        self.__df__ = df
+        self.invalidate()
+
+    @property
+    def version(self):
+        """
+        The version of the data frame. It is increased every time the data frame is replaced or Data.invalidate() is called
+        """
+        return self.__version__
+
+    def invalidate(self):
+        """
+        Marks the data frame as modified and clears the cached indices. The methods of the class call it themselves (e.g. calculate_derived_columns()),
+        it is needed only after writing to the data frame directly, e.g. data.df[key] = ... or data.df.loc[:, key] = ...
+        """
+        self.__version__ = getattr(self, '__version__', -1) + 1
+        self.__cache__ = {}
+
+    def __get_cached__(self, name):
+        """
+        Returns the result cached under name for the current version of the data frame, or None if there is none
+        """
+        cached = self.__cache__.get(name)
+        if cached is None or cached[0] != self.__version__:
+            return None
+        return cached[1]
+
+    def __set_cached__(self, name, result):
+        """
+        Caches result under name for the current version of the data frame
+        """
+        self.__cache__[name] = (self.__version__, result)
+        return result
+
 
     # def __getattr__(self, key):
     #     if key in self.df.keys():
@@ -42,7 +89,8 @@ class Data:
     @property
     def file_separators(self):
         """
-        Get the indices corresponding to the start and end of each run. Returns a numpy array of size n_files * 2.
+        Get the indices corresponding to the start and end of each file. Returns a numpy array of size n_files * 2.
+        The separators are obtained from the segment index of the 'file_id' column, see Data.get_segments()
 
         Returns
         -------
@@ -50,22 +98,88 @@ class Data:
                          file_separators[i, 0] - the index corresponding to the start of data for each file
                          file_separators[i, 1] - the index corresponding to the end of data for each file
         """
-        files = self.df.file.unique()
-        n_files = len(files)
-        file_separators = np.empty([n_files, 2], dtype = int)
-        for j in range(0, n_files):
-            mask = self.df.file == files[j]
-            start = np.min(np.argwhere(mask))
-            end = np.max(np.argwhere(mask))
-            # if end < start: # check if there is somehow no columns comming from the file
-            #     end = start
-            file_separators[j, 0] = start
-            file_separators[j, 1] = end
-        return file_separators
+        key = 'file_id' if 'file_id' in self.df else 'file'
+        return self.get_segments(key)[1].copy()
+
+    def get_segments(self, key = 'file_id'):
+        """
+        Get the segments of consecutive rows with the same value in a column (e.g. the rows coming from each file or run).
+        The segment index is built in O(n) from the change points of the column and it is cached until the data frame is modified, see Data.invalidate()
+
+        Parameters
+        ----------
+        key:            str, default: 'file_id'
+                        The column defining the segments
+
+        Returns
+        -------
+        values:         numpy.ndarray
+                        The value of the column in each segment
+        separators:     numpy.ndarray
+                        separators[i, 0] - the index corresponding to the start of segment i
+                        separators[i, 1] - the index corresponding to the end of segment i
+        """
+        cached = self.__get_cached__(('segments', key))
+        if cached is not None:
+            return cached
+
+        n_rows = self.df.shape[0]
+        column = self.df[key]
+        if isinstance(column.dtype, pd.CategoricalDtype): # compare the integer codes instead of the categories
+            codes = column.cat.codes.to_numpy()
+        else:
+            codes = column.to_numpy()
+        starts = np.concatenate([[0], np.flatnonzero(codes[1:] != codes[:-1]) + 1]) if n_rows > 0 else np.empty([0], dtype = int)
+        ends = np.append(starts[1:] - 1, n_rows - 1) if n_rows > 0 else np.empty([0], dtype = int)
+        values = column.to_numpy()[starts]
+        separators = np.stack([starts, ends], axis = 1).astype(int)
+
+        return self.__set_cached__(('segments', key), (values, separators))
+
+    def fix_gaps_between_files(self, keys, add_nan = True):
+        """
+        Fixes the data for plotting. It adds n-1 data points in between data corresponding to different files. If add_nan it adds a nan, otherwise it copies the previous data.
+        The insertion positions come from the cached file separators and all the requested columns are fixed with a single vectorized insertion
+
+        Parameters
+        ----------
+        keys:               str or list of str
+                            The keys corresponding to the columns to be fixed
+        add_nan:            bool, default: True
+                            If True, add a NaN value at the end of the data corresponding to each file. Otherwise, copy the previous value
+
+        Returns
+        -------
+        new_x:              dict of numpy.ndarray
+                            The fixed arrays, for each key
+        """
+        if len(Utils.dim(keys)) == 0:
+            keys = [keys]
+        keys = list(dict.fromkeys(keys))
+
+        # the gaps are inserted after the last row of each file, except the last one
+        positions = self.file_separators[:-1, 1] + 1
+
+        # all the columns are written in one block, the data of file i is shifted by i
+        n_rows = self.df.shape[0]
+        starts = np.append(0, positions)
+        ends = np.append(positions, n_rows)
+        gaps = positions + np.arange(positions.shape[0]) # the positions of the gaps in the fixed arrays
+        fixed = np.empty([len(keys), n_rows + positions.shape[0]])
+        for i, key in enumerate(keys):
+            x = self.df[key].to_numpy(dtype = float)
+            row = fixed[i]
+            for j in range(0, starts.shape[0]): # contiguous copies are faster than fancy indexing
+                row[starts[j]+j:ends[j]+j] = x[starts[j]:ends[j]]
+            if not add_nan:
+                row[gaps] = x[positions - 1]
+        if add_nan:
+            fixed[:, gaps] = np.nan
+        return {key: fixed[i] for i, key in enumerate(keys)}
 
     def plot(self, keys, x_key = 'timestamp', datetime_plot = True, date_format = "%m-%d %H:%M:%S", timezone = 'Europe/Stockholm', \
     fplot = None, ax_id = None, figsize = (13, 8), marker = None, markersize = 5, linestyle = '-', linewidth = 2, color = None, \
-    labels = None, fontsize = 12, fontweight = 'normal', use_style_dict = True, style_dict = DEFAULT_STYLE, scaling_x = 1, scaling_y = 1):
+    labels = None, fontsize = 12, fontweight = 'normal', use_style_dict = True, style_dict = DEFAULT_STYLE, scaling_x = 1, scaling_y = 1, decimate = None, n_pixels = None):
         """
         Plots the selected columns from the pandas dataframe of the Data obejct
 
@@ -110,6 +224,10 @@ class Data:
                             The style dictionary used
         use_style_dict:     bool,   default: True
                             If true, the proprieties of the plot will be derived from the provided style_dict
+        decimate:           ['minmax'|'lttb'], default: None
+                            If not None, the data is decimated before plotting. See FancyPlot.plot_data()
+        n_pixels:           int, default: None
+                            The point budget used for the decimation. See FancyPlot.plot_data()
 
         Returns
         -------
@@ -131,12 +249,28 @@ class Data:
 
         fplot.plot_data(self, keys,  x_key = x_key, datetime_plot = datetime_plot, date_format = date_format, timezone = timezone, \
                 ax_id = ax_id, marker = marker, markersize = markersize, linestyle = linestyle, linewidth = linewidth, color = color, labels = labels, \
-                use_style_dict = use_style_dict, scaling_x = scaling_x, scaling_y = scaling_y)
+                use_style_dict = use_style_dict, scaling_x = scaling_x, scaling_y = scaling_y, decimate = decimate, n_pixels = n_pixels)
         return fplot
 
 
 
 
+    def memory_usage(self, deep = True):
+        """
+        Returns the memory usage of each column of the data frame, in bytes
+
+        Parameters
+        ----------
+        deep:           bool, default: True
+                        If True, the memory used by the objects in object columns (e.g. strings) is also counted
+
+        Returns
+        -------
+        usage:          pandas.Series
+                        The memory usage of each column and of the index. The total is usage.sum()
+        """
+        return self.df.memory_usage(index = True, deep = deep)
+
     def remove_data_timestamp_range(self, timestamp_limits):
         """
         Removes data outside the inclusive range timestamp_limits[0], timestamp_limits[1]
@@ -230,7 +364,8 @@ class Data:
         self.info_dict[key] = subdict
 
     @staticmethod
-    def read_from_files(file_paths, header = None, delimiter = '\t', engine = 'c', skiprows = 0, info_dict = DEFAULT_TEMPERATURE_STRUCTURE):
+    def read_from_files(file_paths, header = None, delimiter = '\t', engine = 'c', skiprows = 0, info_dict = DEFAULT_TEMPERATURE_STRUCTURE, cache = None, \
+        n_workers = 1, executor = 'thread', columns = None, compact = False, byte_ranges = None):
         """
         Reads data from multiple files
 
@@ -248,6 +383,22 @@ class Data:
                         Parser engine to use. The C and pyarrow engines are faster, while the python engine is currently more feature-complete. Multithreading is currently only supported by the pyarrow engine.
         skiprows:       int, default: 0
                         Skips the first N rows when reading the file
+        cache:          ParseCache, default: None
+                        If not None, the parsed files are loaded from (and stored in) this on-disk cache instead of being parsed every time
+        n_workers:      int, default: 1
+                        The number of files parsed at the same time. If 1, the files are parsed sequentially
+        executor:       ['thread'|'process'], default: 'thread'
+                        The type of pool used to parse the files when n_workers > 1
+        columns:        str or list of str, default: None
+                        The keys of the info_dict to be read. Only these columns are passed to the parser, the others are not converted or stored.
+                        If None, all the columns from the info_dict are read
+        compact:        bool, default: False
+                        If True, the columns are converted to the 'dtype' declared in the info_dict (e.g. float32, int8, bool) to reduce the memory usage.
+                        Integer and bool dtypes are not applied to columns containing NaN values
+        byte_ranges:    list of (int, int), default: None
+                        If not None, only the bytes between byte_ranges[i][0] and byte_ranges[i][1] are parsed from file_paths[i].
+                        The ranges must start at the beginning of a data line, header and skiprows are not applied. A None entry means the whole file.
+                        The cache is not used for partially read files
 
         Returns
         -------
@@ -256,49 +407,340 @@ class Data:
         """
         Data.__check_and_fill_info_dict__(info_dict)
 
-        dfs = [] # create list of dataframes, corresponding to each file
-
         # if filepaths is just a str, convert to list: [file_paths]
         dim_file_paths = Utils.dim(file_paths)
         if(len(dim_file_paths)) == 0:
             file_paths = [file_paths]
 
-        n_files = len(file_paths)
-        i = 0
-        prev_file_end_index = 0
-        for file_path in file_paths:
-            keys = np.array(Utils.get_keys_info_dict(info_dict)) #get the keys from the info_dict
-            used_cols = np.array(Utils.get_from_info_dict(info_dict, 'col'))  # get the columns from the info_dict
-
-            # read all the columns
-            full_df = pd.read_csv(file_path, engine = engine, index_col=False, header = header, skiprows = skiprows, delimiter = delimiter)
-
-            #   filter and use only the columns from the info_dict
-            mask = np.array(used_cols)<full_df.shape[1]
-            new_df = full_df.iloc[:, used_cols[mask]]
-            new_df.columns = keys[mask]
-
-            # get the additive columns
-            additive_columns = Utils.get_concatenation_type_columns(info_dict, 'additive')
-
-            # process the additive columns
-            if i != 0 and additive_columns is not []:
-                last_values_additive_columns = dfs[i-1][additive_columns].iloc[-1] #the value in the previous file
-                new_df[additive_columns] += last_values_additive_columns    #add it to the data from the current file
-
-            # add at the end new columns corresponding to the filename and the number of the file
-            col_len = new_df.shape[1]
-            new_df.insert(col_len, "file", file_path, True)
-            new_df.insert(col_len+1, "file_id", i, True)
-
-            dfs.append(new_df)
-            n_points = new_df.shape[0]
-            prev_file_end_index = prev_file_end_index + n_points
-            i += 1
+        read_dict = Data.__select_columns__(info_dict, columns) # keep only the requested columns
+
+        # parse the files, create list of dataframes, corresponding to each file
+        read_file = functools.partial(Data.__read_file__, header = header, delimiter = delimiter, engine = engine, skiprows = skiprows, \
+            info_dict = read_dict, cache = cache)
+        if byte_ranges is None:
+            byte_ranges = [None] * len(file_paths)
+        if n_workers > 1 and len(file_paths) > 1:
+            if executor == 'thread':
+                pool = concurrent.futures.ThreadPoolExecutor(max_workers = n_workers)
+            elif executor == 'process':
+                pool = concurrent.futures.ProcessPoolExecutor(max_workers = n_workers)
+            else:
+                raise ValueError(f"Invalid executor '{executor}'. Only 'thread' and 'process' are valid values")
+            with pool:
+                dfs = list(pool.map(read_file, file_paths, byte_ranges))
+        else:
+            dfs = [read_file(file_path, byte_range) for file_path, byte_range in zip(file_paths, byte_ranges)]
+
         df = pd.concat(dfs, axis=0, ignore_index=True) # concatenate the data frames
+        n_points = np.array([new_df.shape[0] for new_df in dfs], dtype = int)
+
+        # process the additive columns: the data from each file continues from the last value of the previous files
+        additive_columns = Utils.get_concatenation_type_columns(read_dict, 'additive')
+        Data.__add_additive_offsets__(df, additive_columns, n_points)
+
+        # add at the end new columns corresponding to the filename and the number of the file
+        # the filenames are stored as a categorical column, such that each path is stored only once
+        file_id = np.repeat(np.arange(len(dfs)), n_points)
+        unique_file_paths = list(dict.fromkeys(file_paths))
+        file_codes = np.array([unique_file_paths.index(file_path) for file_path in file_paths], dtype = int)
+        df['file'] = pd.Categorical.from_codes(file_codes[file_id], categories = unique_file_paths)
+        df['file_id'] = file_id
+
+        if compact:
+            Data.__compact_dtypes__(df, read_dict)
 
         return Data(df, info_dict)
 
+    @staticmethod
+    def read_chunks(file_paths, chunksize = DEFAULT_CHUNKSIZE, header = None, delimiter = '\t', engine = 'c', skiprows = 0, \
+        info_dict = DEFAULT_TEMPERATURE_STRUCTURE, columns = None, compact = False):
+        """
+        Reads data from multiple files in chunks, such that the memory used does not depend on the size of the files.
+        The chunks are the same as the rows of Data.read_from_files(), split in pieces: the additive columns continue across the files,
+        the index continues across the chunks and the 'file' column has all the file_paths as categories. A chunk contains data from a single file
+
+        Parameters
+        ----------
+        file_paths:     str or list
+                        The filepaths from where the data will be read
+        chunksize:      int, default: 100000
+                        The maximum number of rows of a chunk
+        header:         int, default: None
+                        Row number(s) containing column labels and marking the start of the data (zero-indexed).
+        delimiter:      char, default: '\t'
+                        The delimiter used in the file.
+        engine:         str, default: 'c'
+                        Parser engine to use
+        skiprows:       int, default: 0
+                        Skips the first N rows when reading the file
+        info_dict:      dict, default: DEFAULT_TEMPERATURE_STRUCTURE
+                        The info_dict of the file
+        columns:        str or list of str, default: None
+                        The keys of the columns to be read. Only these columns are parsed. If None, all the columns are read
+        compact:        bool, default: False
+                        If True, the columns are converted to the compact dtypes declared in the info_dict
+
+        Returns
+        -------
+        chunks:         iterator of Data
+                        See ChunkStats for reducing the chunks without building the full data frame
+        """
+        Data.__check_and_fill_info_dict__(info_dict)
+        if len(Utils.dim(file_paths)) == 0:
+            file_paths = [file_paths]
+        read_dict = Data.__select_columns__(info_dict, columns)
+        parse_dict = {key: subdict for key, subdict in read_dict.items() if subdict['col'] >= 0}
+        additive_columns = Utils.get_concatenation_type_columns(read_dict, 'additive')
+        unique_file_paths = list(dict.fromkeys(file_paths))
+
+        offsets = {key: 0 for key in additive_columns} # the sum of the last values of the additive columns in the previous files
+        n_rows = 0
+        for file_id, file_path in enumerate(file_paths):
+            last_values = {key: 0 for key in additive_columns}
+            parsed = Data.__parse__(lambda: file_path, header = header, delimiter = delimiter, engine = engine, skiprows = skiprows, \
+                info_dict = parse_dict, chunksize = chunksize)
+            for df in parsed:
+                n_chunk = df.shape[0]
+                if n_chunk == 0:
+                    continue
+                for key in additive_columns:
+                    if key in df:
+                        values = df[key].to_numpy()
+                        last_values[key] = values[-1]
+                        df[key] = values + offsets[key]
+                df.index = pd.RangeIndex(n_rows, n_rows + n_chunk)
+                df['file'] = pd.Categorical.from_codes(np.full([n_chunk], unique_file_paths.index(file_path)), categories = unique_file_paths)
+                df['file_id'] = np.full([n_chunk], file_id)
+                if compact:
+                    Data.__compact_dtypes__(df, read_dict)
+                n_rows += n_chunk
+                yield Data(df, info_dict)
+            for key in additive_columns:
+                offsets[key] += last_values[key]
+
+    @staticmethod
+    def __select_columns__(info_dict, columns = None):
+        """
+        Returns the entries of the info_dict corresponding to the requested columns
+
+        Parameters
+        ----------
+        info_dict:      dict
+        columns:        str or list of str, default: None
+                        The keys of the requested columns. If None, all entries are kept
+
+        Returns
+        -------
+        read_dict:      dict
+        """
+        if columns is None:
+            return info_dict
+        if len(Utils.dim(columns)) == 0:
+            columns = [columns]
+        for key in columns:
+            if key not in info_dict:
+                raise ValueError(f"'{key}' is not a valid data field!")
+        return {key: subdict for key, subdict in info_dict.items() if key in columns}
+
+    @staticmethod
+    def __get_read_columns__(columns, derived_columns):
+        """
+        Returns the columns which have to be read from the files in order to obtain the requested columns.
+        The derived columns are replaced by the columns from which they are calculated
+
+        Parameters
+        ----------
+        columns:            str, list of str or None
+                            The requested columns
+        derived_columns:    dict
+                            The columns needed for calculating each derived column. Example: {'field': ['output_voltage', 'gap']}
+
+        Returns
+        -------
+        read_columns:       list of str or None
+                            The columns to be read. None if columns is None (all columns are read)
+        """
+        if columns is None:
+            return None
+        if len(Utils.dim(columns)) == 0:
+            columns = [columns]
+
+        read_columns = []
+        for key in columns:
+            needed = derived_columns[key] if key in derived_columns else [key]
+            for needed_key in needed:
+                if needed_key not in read_columns:
+                    read_columns.append(needed_key)
+        return read_columns
+
+    @staticmethod
+    def __compact_dtypes__(df, info_dict):
+        """
+        Converts the columns to the dtypes declared in the info_dict (in place). The file_id is converted to the smallest integer dtype
+
+        Parameters
+        ----------
+        df:             pandas.core.frame.DataFrame
+        info_dict:      dict
+                        The info_dict. Only the entries containing 'dtype' are converted
+        """
+        for key, subdict in info_dict.items():
+            if 'dtype' not in subdict or key not in df:
+                continue
+            dtype = np.dtype(subdict['dtype'])
+            if dtype.kind in 'iub' and df[key].isna().any(): # NaN cannot be represented
+                continue
+            df[key] = df[key].astype(dtype)
+        if 'file_id' in df:
+            df['file_id'] = pd.to_numeric(df['file_id'], downcast = 'integer')
+
+    @staticmethod
+    def __add_additive_offsets__(df, additive_columns, n_points):
+        """
+        Adds to the additive columns of each file the sum of the last values of these columns in all previous files (in place).
+        The offsets are obtained from a prefix sum over the last value of each file.
+
+        Parameters
+        ----------
+        df:                 pandas.core.frame.DataFrame
+                            The concatenated data of all files, before adding the offsets
+        additive_columns:   list of str
+                            The columns to which the offsets are added
+        n_points:           numpy.ndarray
+                            The number of rows from each file
+        """
+        if len(n_points) < 2 or df.shape[0] == 0:
+            return
+        ends = np.cumsum(n_points) - 1 # the index of the last row of each file
+        empty = n_points == 0
+        for key in additive_columns:
+            if key not in df:
+                continue
+            values = df[key].to_numpy()
+            last_values = values[np.maximum(ends, 0)]
+            last_values[empty] = 0 # empty files do not contribute
+            offsets = np.zeros_like(last_values)
+            offsets[1:] = np.cumsum(last_values[:-1])
+            df[key] = values + np.repeat(offsets, n_points)
+
+    @staticmethod
+    def __read_file__(file_path, byte_range = None, header = None, delimiter = '\t', engine = 'c', skiprows = 0, info_dict = DEFAULT_TEMPERATURE_STRUCTURE, \
+        cache = None):
+        """
+        Reads the columns from the info_dict from a single file, using the cache if one is provided
+
+        Parameters
+        ----------
+        file_path:      str
+                        The filepath from where the data will be read
+        byte_range:     (int, int), default: None
+                        If not None, only the data lines between these byte offsets are read. header and skiprows are not applied
+        header:         int, default: None
+        delimiter:      char, default: '\t'
+        engine:         str, default: 'c'
+        skiprows:       int, default: 0
+        info_dict:      dict, optional
+                        The info_dict of the file. Entries with 'col' < 0 are derived columns and are not read
+        cache:          ParseCache, default: None
+
+        Returns
+        -------
+        new_df:         pandas.core.frame.DataFrame
+                        The data frame containing the columns from the info_dict, with the keys of the info_dict as column names
+        """
+        read_dict = {key: subdict for key, subdict in info_dict.items() if subdict['col'] >= 0}
+
+        if byte_range is not None: # read the selected lines in memory and parse them from there
+            with open(file_path, 'rb') as file:
+                file.seek(byte_range[0])
+                data_bytes = file.read(byte_range[1] - byte_range[0])
+            return Data.__read_bytes__(data_bytes, delimiter = delimiter, engine = engine, info_dict = read_dict)
+
+        if cache is not None:
+            schema = ParseCache.make_schema(read_dict, header = header, delimiter = delimiter, skiprows = skiprows)
+            new_df = cache.get(file_path, schema)
+            if new_df is not None:
+                return new_df
+
+        new_df = Data.__parse__(lambda: file_path, header = header, delimiter = delimiter, engine = engine, skiprows = skiprows, info_dict = read_dict)
+
+        if cache is not None:
+            cache.put(file_path, schema, new_df)
+        return new_df
+
+    @staticmethod
+    def __read_bytes__(data_bytes, delimiter = '\t', engine = 'c', info_dict = DEFAULT_TEMPERATURE_STRUCTURE):
+        """
+        Reads the columns from the info_dict from data lines already loaded in memory
+
+        Parameters
+        ----------
+        data_bytes:     bytes
+                        Complete data lines, without header
+        delimiter:      char, default: '\t'
+        engine:         str, default: 'c'
+        info_dict:      dict, optional
+                        The info_dict of the file. Entries with 'col' < 0 are derived columns and are not read
+
+        Returns
+        -------
+        new_df:         pandas.core.frame.DataFrame
+                        The data frame containing the columns from the info_dict, with the keys of the info_dict as column names
+        """
+        read_dict = {key: subdict for key, subdict in info_dict.items() if subdict['col'] >= 0}
+        if len(data_bytes.strip()) == 0: # no lines
+            return pd.DataFrame({key: np.empty([0]) for key in read_dict})
+        return Data.__parse__(lambda: io.BytesIO(data_bytes), header = None, delimiter = delimiter, engine = engine, skiprows = 0, info_dict = read_dict)
+
+    @staticmethod
+    def __parse__(source, header = None, delimiter = '\t', engine = 'c', skiprows = 0, info_dict = DEFAULT_TEMPERATURE_STRUCTURE, chunksize = None):
+        """
+        Parses the columns from the info_dict
+
+        Parameters
+        ----------
+        source:         callable
+                        Returns a new file path or buffer to be parsed each time it is called
+        header:         int, default: None
+        delimiter:      char, default: '\t'
+        engine:         str, default: 'c'
+        skiprows:       int, default: 0
+        info_dict:      dict, optional
+                        The info_dict of the file, without derived columns
+        chunksize:      int, default: None
+                        If not None, an iterator of data frames with at most chunksize rows is returned
+
+        Returns
+        -------
+        new_df:         pandas.core.frame.DataFrame or iterator of pandas.core.frame.DataFrame
+        """
+        keys = np.array(Utils.get_keys_info_dict(info_dict)) #get the keys from the info_dict
+        used_cols = np.array(Utils.get_from_info_dict(info_dict, 'col'), dtype = int)  # get the columns from the info_dict
+
+        # get the number of columns in the file from the first row and use only the columns from the info_dict which are found in the file
+        first_row = pd.read_csv(source(), engine = engine, index_col=False, header = header, skiprows = skiprows, delimiter = delimiter, nrows = 1)
+        mask = used_cols < first_row.shape[1]
+        keys = keys[mask]
+        used_cols = used_cols[mask]
+
+        # read only the used columns. The parser returns them in the order in which they are found in the file
+        unique_cols = np.unique(used_cols)
+        order = np.searchsorted(unique_cols, used_cols)
+        parsed = pd.read_csv(source(), engine = engine, index_col=False, header = header, skiprows = skiprows, delimiter = delimiter, usecols = unique_cols, \
+            chunksize = chunksize)
+        if chunksize is not None:
+            return (Data.__select_parsed__(parsed_df, order, keys) for parsed_df in parsed)
+        return Data.__select_parsed__(parsed, order, keys)
+
+    @staticmethod
+    def __select_parsed__(parsed_df, order, keys):
+        """
+        Reorders the parsed columns as in the info_dict and renames them to the keys of the info_dict
+        """
+        new_df = parsed_df.iloc[:, order]
+        new_df.columns = keys
+        return new_df
+
     @staticmethod
     def __check_and_fill_info_dict__(info_dict):
         """
@@ -0,0 +1,162 @@
+import numpy as np
+
+DECIMATION_METHODS = ['minmax', 'lttb']
+
+def bucket_edges(x, n_buckets):
+    """
+    Splits the points in n_buckets buckets of equal width on the x axis (e.g. one bucket per pixel column).
+    If x is not sorted, the buckets contain an equal number of points
+
+    Parameters
+    ----------
+    x:              numpy.ndarray
+    n_buckets:      int
+
+    Returns
+    -------
+    edges:          numpy.ndarray
+                    The index of the first point of each bucket, followed by len(x). Empty buckets are removed
+    """
+    n = x.shape[0]
+    finite = np.isfinite(x)
+    if np.all(finite) and np.all(x[1:] >= x[:-1]) and x[-1] > x[0]:
+        edges = np.searchsorted(x, np.linspace(x[0], x[-1], n_buckets + 1)[:-1], side = 'left')
+    else:
+        edges = np.linspace(0, n, n_buckets + 1).astype(int)[:-1]
+    edges = np.unique(np.append(edges, n))
+    return edges
+
+def minmax_indices(x, y, n_buckets):
+    """
+    Min/max decimation: keeps the first, the last, the minimum and the maximum point of each bucket (and a NaN value, if the bucket contains one).
+    The envelope of the data is preserved, therefore narrow spikes (e.g. breakdowns or vacuum bursts) are not lost
+
+    Parameters
+    ----------
+    x:              numpy.ndarray
+    y:              numpy.ndarray
+    n_buckets:      int
+                    The number of buckets, e.g. the number of pixel columns
+
+    Returns
+    -------
+    indices:        numpy.ndarray
+                    The sorted indices of the points kept
+    """
+    n = x.shape[0]
+    if n <= 4 * n_buckets:
+        return np.arange(n)
+    edges = bucket_edges(x, n_buckets)
+    bucket = np.repeat(np.arange(edges.shape[0] - 1), np.diff(edges))
+
+    # sort by bucket, then by value: the first point of each bucket is the minimum and the last one the maximum. NaN values are sorted last
+    order_min = np.lexsort((np.where(np.isnan(y), np.inf, y), bucket))
+    order_max = np.lexsort((np.where(np.isnan(y), -np.inf, y), bucket))
+    first = edges[:-1]
+    last = edges[1:] - 1
+    # order_min[last] is a NaN if the bucket contains NaN values, it is kept such that the gaps in the data are not bridged
+    indices = np.concatenate([first, last, order_min[first], order_max[last], order_min[last]])
+    return np.unique(indices)
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets decimation: keeps n_out points, selecting from each bucket the point which forms
+    the largest triangle with the point kept from the previous bucket and the average of the next bucket
+
+    Parameters
+    ----------
+    x:              numpy.ndarray
+    y:              numpy.ndarray
+    n_out:          int
+                    The number of points kept, including the first and the last point
+
+    Returns
+    -------
+    indices:        numpy.ndarray
+                    The sorted indices of the points kept
+    """
+    n = x.shape[0]
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    y_filled = np.where(np.isnan(y), np.nanmean(y) if np.any(np.isfinite(y)) else 0, y)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int) # the buckets between the first and the last point
+    indices = np.empty([n_out], dtype = int)
+    indices[0] = 0
+    indices[-1] = n - 1
+    for i in range(0, n_out - 2):
+        start, end = edges[i], max(edges[i+1], edges[i] + 1)
+        next_start, next_end = end, (edges[i+2] if i + 2 < edges.shape[0] else n)
+        if next_end <= next_start:
+            next_start, next_end = n - 1, n
+        a = indices[i]
+        x_avg = x[next_start:next_end].mean()
+        y_avg = y_filled[next_start:next_end].mean()
+        area = np.abs((x[a] - x_avg) * (y_filled[start:end] - y_filled[a]) - (x[a] - x[start:end]) * (y_avg - y_filled[a]))
+        indices[i+1] = start + np.argmax(area)
+    return np.unique(indices)
+
+def gap_segments(file_separators):
+    """
+    Returns the segments of the data of each file after a gap was inserted after each file (see Data.fix_gaps_between_files())
+
+    Parameters
+    ----------
+    file_separators:    numpy.ndarray
+                        The file separators of the data, before the gaps were inserted
+
+    Returns
+    -------
+    segments:           numpy.ndarray
+                        segments[i, 0] - the index of the first point of file i
+                        segments[i, 1] - the index after the last point of file i
+    """
+    shift = np.arange(file_separators.shape[0])
+    return np.stack([file_separators[:, 0] + shift, file_separators[:, 1] + shift + 1], axis = 1).reshape(-1, 2)
+
+def decimate_segments(x, y, segments, n_pixels, method = 'minmax'):
+    """
+    Decimates each segment of the data separately (e.g. the data of each file, between the gaps inserted for plotting).
+    The point budget of each segment is proportional to its extent on the x axis
+
+    Parameters
+    ----------
+    x:              numpy.ndarray
+    y:              numpy.ndarray
+    segments:       numpy.ndarray
+                    segments[i, 0] - the index of the first point of segment i
+                    segments[i, 1] - the index after the last point of segment i
+                    The points between the segments (e.g. the NaN gaps) are always kept
+    n_pixels:       int
+                    The width of the plot in pixels (the number of buckets of the whole x range)
+    method:         ['minmax'|'lttb'], default: 'minmax'
+
+    Returns
+    -------
+    indices:        numpy.ndarray
+                    The sorted indices of the points kept
+    """
+    if method not in DECIMATION_METHODS:
+        raise ValueError(f"Invalid decimation method '{method}'. Valid methods: {DECIMATION_METHODS}")
+    n = x.shape[0]
+    if segments.shape[0] == 0 or n <= 2 * n_pixels:
+        return np.arange(n)
+
+    finite_x = x[np.isfinite(x)]
+    x_range = finite_x.max() - finite_x.min() if finite_x.shape[0] > 0 else 0
+    keep = np.ones([n], dtype = bool)
+    for start, end in segments:
+        if end - start < 3:
+            continue
+        segment_x = x[start:end]
+        if x_range > 0 and np.all(np.isfinite(segment_x[[0, -1]])):
+            share = abs(segment_x[-1] - segment_x[0]) / x_range
+        else:
+            share = (end - start) / n
+        n_buckets = max(int(np.ceil(share * n_pixels)), 1)
+        if method == 'minmax':
+            selected = minmax_indices(segment_x, y[start:end], n_buckets)
+        else:
+            selected = lttb_indices(segment_x, y[start:end], 2 * n_buckets + 2) # the same number of points as minmax
+        keep[start:end] = False
+        keep[start + selected] = True
+    return np.flatnonzero(keep)
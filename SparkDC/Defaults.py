@@ -2,6 +2,11 @@ import numpy as np
 
 LABVIEW_TIMESTAMP_OFFSET = 2082844800
 
+DEFAULT_CHUNKSIZE = 100000 # the default number of rows of the chunks read by read_chunks()
+
+DEFAULT_RASTERIZE_THRESHOLD = 10000 # the artists with more points are rasterized when a figure is saved in a vector format
+DEFAULT_RASTER_DPI = 300 # the resolution of the rasterized artists
+
 DEFAULT_STYLE = {
 #   Temperature
     'temp_A':       {'color': 'crimson',         'linestyle': 'solid'},
@@ -33,49 +38,49 @@ DEFAULT_STYLE = {
 
 
 DEFAULT_TEMPERATURE_STRUCTURE = {
-    'temp_A':                   {'col': 0,  'label': 'Temperature CH A',                'unit':   'K',         'concatenation_type': 'normal'},
-    'temp_B':                   {'col': 1,  'label': 'Temperature CH B',                'unit':   'K',         'concatenation_type': 'normal'},
-    'temp_C':                   {'col': 2,  'label': 'Temperature CH C',                'unit':   'K',         'concatenation_type': 'normal'},
-    'temp_D':                   {'col': 3,  'label': 'Temperature CH D',                'unit':   'K',         'concatenation_type': 'normal'},
-    'temp_E':                   {'col': 4,  'label': 'Temperature CH E',                'unit':   'K',         'concatenation_type': 'normal'},
-    'temp_F':                   {'col': 5,  'label': 'Temperature CH F',                'unit':   'K',         'concatenation_type': 'normal'},
-    'warning_state':            {'col': 6,  'label': 'Warning State',                   'unit':   '',          'concatenation_type': 'normal'},
-    'alarm_state':              {'col': 7,  'label': 'Alarm State',                     'unit':   '',          'concatenation_type': 'normal'},
-    'water_in_temp':            {'col': 8,  'label': 'Water In Temp',                   'unit':   '°C',        'concatenation_type': 'normal'},
-    'water_out_temp':           {'col': 9,  'label': 'Water Out Temp',                  'unit':   '°C',        'concatenation_type': 'normal'},
-    'oil_temp':                 {'col': 10, 'label': 'Oil Temperature',                 'unit':   '°C',        'concatenation_type': 'normal'},
-    'helium_temp':              {'col': 11, 'label': 'Helium Temperature',              'unit':   'K',         'concatenation_type': 'normal'},
-    'low_pressure':             {'col': 12, 'label': 'Low Pressure',                    'unit':   'bar',       'concatenation_type': 'normal'},
-    'low_pressure_avg':         {'col': 13, 'label': 'Low Pressure Average',            'unit':   'bar',       'concatenation_type': 'normal'},
-    'high_pressure':            {'col': 14, 'label': 'High Pressure',                   'unit':   'bar',       'concatenation_type': 'normal'},
-    'high_pressure_avg':        {'col': 15, 'label': 'High Pressure Average',           'unit':   'bar',       'concatenation_type': 'normal'},
-    'delta_pressure_avg':       {'col': 16, 'label': 'Delta Pressure Average',          'unit':   'bar',       'concatenation_type': 'normal'},
-    'motor_current':            {'col': 17, 'label': 'Motor Current',                   'unit':   'A',         'concatenation_type': 'normal'},
-    'time_of_operation':        {'col': 18, 'label': 'Time of Operation',               'unit':   's',         'concatenation_type': 'normal'},
-    'heater_1':                 {'col': 19, 'label': 'Heater 1',                        'unit':   '%',         'concatenation_type': 'normal'},
-    'heater_2':                 {'col': 20, 'label': 'Heater 2',                        'unit':   '%',         'concatenation_type': 'normal'},
-    'timestamp':                {'col': 21, 'label': 'Timestamp',                       'unit':   's',         'concatenation_type': 'normal'},
-    'capacitance':              {'col': 22, 'label': 'Capacitance',                     'unit':   'F',         'concatenation_type': 'normal'},
-    'vacuum_1':                 {'col': 23, 'label': 'Vacuum 1',                        'unit':   'mbar',      'concatenation_type': 'normal'},
-    'vacuum_2':                 {'col': 24, 'label': 'Vacuum 2',                        'unit':   'mbar',      'concatenation_type': 'normal'},
-    'resistivity_A':            {'col': 25, 'label': 'Resistivity A',                   'unit':   'Ohm',       'concatenation_type': 'normal'},
-    'resistivity_B':            {'col': 26, 'label': 'Resistivity B',                   'unit':   'Ohm',       'concatenation_type': 'normal'},
-    'resistivity_C':            {'col': 27, 'label': 'Resistivity C',                   'unit':   'Ohm',       'concatenation_type': 'normal'},
-    'resistivity_D':            {'col': 28, 'label': 'Resistivity D',                   'unit':   'Ohm',       'concatenation_type': 'normal'},
-    'resistivity_E':            {'col': 29, 'label': 'Resistivity E',                   'unit':   'Ohm',       'concatenation_type': 'normal'},
-    'resistivity_F':            {'col': 30, 'label': 'Resistivity F',                   'unit':   'Ohm',       'concatenation_type': 'normal'},
-    'closed_loop':              {'col': 31, 'label': 'Closed Loop On',                  'unit':   '',          'concatenation_type': 'normal'},
-    'setpoint':                 {'col': 32, 'label': 'Setpoint',                        'unit':   'K',         'concatenation_type': 'normal'},
-    'poportional_gain':         {'col': 33, 'label': 'Proportional Gain',               'unit':   '',          'concatenation_type': 'normal'},
-    'integral_time':            {'col': 34, 'label': 'Integral Time',                   'unit':   'min',       'concatenation_type': 'normal'},
-    'derivative_time':          {'col': 35, 'label': 'Derivative Time',                 'unit':   'min',       'concatenation_type': 'normal'},
-    'proportional_action':      {'col': 36, 'label': 'Proportional Action',             'unit':   '',          'concatenation_type': 'normal'},
-    'integral_action':          {'col': 37, 'label': 'Integral Action',                 'unit':   '',          'concatenation_type': 'normal'},
-    'derivative_action':        {'col': 38, 'label': 'Derivative Action',               'unit':   '',          'concatenation_type': 'normal'}
+    'temp_A':                   {'col': 0,  'label': 'Temperature CH A',                'unit':   'K',         'concatenation_type': 'normal', 'dtype': 'float32'},
+    'temp_B':                   {'col': 1,  'label': 'Temperature CH B',                'unit':   'K',         'concatenation_type': 'normal', 'dtype': 'float32'},
+    'temp_C':                   {'col': 2,  'label': 'Temperature CH C',                'unit':   'K',         'concatenation_type': 'normal', 'dtype': 'float32'},
+    'temp_D':                   {'col': 3,  'label': 'Temperature CH D',                'unit':   'K',         'concatenation_type': 'normal', 'dtype': 'float32'},
+    'temp_E':                   {'col': 4,  'label': 'Temperature CH E',                'unit':   'K',         'concatenation_type': 'normal', 'dtype': 'float32'},
+    'temp_F':                   {'col': 5,  'label': 'Temperature CH F',                'unit':   'K',         'concatenation_type': 'normal', 'dtype': 'float32'},
+    'warning_state':            {'col': 6,  'label': 'Warning State',                   'unit':   '',          'concatenation_type': 'normal', 'dtype': 'int8'   },
+    'alarm_state':              {'col': 7,  'label': 'Alarm State',                     'unit':   '',          'concatenation_type': 'normal', 'dtype': 'int8'   },
+    'water_in_temp':            {'col': 8,  'label': 'Water In Temp',                   'unit':   '°C',        'concatenation_type': 'normal', 'dtype': 'float32'},
+    'water_out_temp':           {'col': 9,  'label': 'Water Out Temp',                  'unit':   '°C',        'concatenation_type': 'normal', 'dtype': 'float32'},
+    'oil_temp':                 {'col': 10, 'label': 'Oil Temperature',                 'unit':   '°C',        'concatenation_type': 'normal', 'dtype': 'float32'},
+    'helium_temp':              {'col': 11, 'label': 'Helium Temperature',              'unit':   'K',         'concatenation_type': 'normal', 'dtype': 'float32'},
+    'low_pressure':             {'col': 12, 'label': 'Low Pressure',                    'unit':   'bar',       'concatenation_type': 'normal', 'dtype': 'float32'},
+    'low_pressure_avg':         {'col': 13, 'label': 'Low Pressure Average',            'unit':   'bar',       'concatenation_type': 'normal', 'dtype': 'float32'},
+    'high_pressure':            {'col': 14, 'label': 'High Pressure',                   'unit':   'bar',       'concatenation_type': 'normal', 'dtype': 'float32'},
+    'high_pressure_avg':        {'col': 15, 'label': 'High Pressure Average',           'unit':   'bar',       'concatenation_type': 'normal', 'dtype': 'float32'},
+    'delta_pressure_avg':       {'col': 16, 'label': 'Delta Pressure Average',          'unit':   'bar',       'concatenation_type': 'normal', 'dtype': 'float32'},
+    'motor_current':            {'col': 17, 'label': 'Motor Current',                   'unit':   'A',         'concatenation_type': 'normal', 'dtype': 'float32'},
+    'time_of_operation':        {'col': 18, 'label': 'Time of Operation',               'unit':   's',         'concatenation_type': 'normal', 'dtype': 'float32'},
+    'heater_1':                 {'col': 19, 'label': 'Heater 1',                        'unit':   '%',         'concatenation_type': 'normal', 'dtype': 'float32'},
+    'heater_2':                 {'col': 20, 'label': 'Heater 2',                        'unit':   '%',         'concatenation_type': 'normal', 'dtype': 'float32'},
+    'timestamp':                {'col': 21, 'label': 'Timestamp',                       'unit':   's',         'concatenation_type': 'normal', 'dtype': 'float64'},
+    'capacitance':              {'col': 22, 'label': 'Capacitance',                     'unit':   'F',         'concatenation_type': 'normal', 'dtype': 'float32'},
+    'vacuum_1':                 {'col': 23, 'label': 'Vacuum 1',                        'unit':   'mbar',      'concatenation_type': 'normal', 'dtype': 'float32'},
+    'vacuum_2':                 {'col': 24, 'label': 'Vacuum 2',                        'unit':   'mbar',      'concatenation_type': 'normal', 'dtype': 'float32'},
+    'resistivity_A':            {'col': 25, 'label': 'Resistivity A',                   'unit':   'Ohm',       'concatenation_type': 'normal', 'dtype': 'float32'},
+    'resistivity_B':            {'col': 26, 'label': 'Resistivity B',                   'unit':   'Ohm',       'concatenation_type': 'normal', 'dtype': 'float32'},
+    'resistivity_C':            {'col': 27, 'label': 'Resistivity C',                   'unit':   'Ohm',       'concatenation_type': 'normal', 'dtype': 'float32'},
+    'resistivity_D':            {'col': 28, 'label': 'Resistivity D',                   'unit':   'Ohm',       'concatenation_type': 'normal', 'dtype': 'float32'},
+    'resistivity_E':            {'col': 29, 'label': 'Resistivity E',                   'unit':   'Ohm',       'concatenation_type': 'normal', 'dtype': 'float32'},
+    'resistivity_F':            {'col': 30, 'label': 'Resistivity F',                   'unit':   'Ohm',       'concatenation_type': 'normal', 'dtype': 'float32'},
+    'closed_loop':              {'col': 31, 'label': 'Closed Loop On',                  'unit':   '',          'concatenation_type': 'normal', 'dtype': 'bool'   },
+    'setpoint':                 {'col': 32, 'label': 'Setpoint',                        'unit':   'K',         'concatenation_type': 'normal', 'dtype': 'float32'},
+    'poportional_gain':         {'col': 33, 'label': 'Proportional Gain',               'unit':   '',          'concatenation_type': 'normal', 'dtype': 'float32'},
+    'integral_time':            {'col': 34, 'label': 'Integral Time',                   'unit':   'min',       'concatenation_type': 'normal', 'dtype': 'float32'},
+    'derivative_time':          {'col': 35, 'label': 'Derivative Time',                 'unit':   'min',       'concatenation_type': 'normal', 'dtype': 'float32'},
+    'proportional_action':      {'col': 36, 'label': 'Proportional Action',             'unit':   '',          'concatenation_type': 'normal', 'dtype': 'float32'},
+    'integral_action':          {'col': 37, 'label': 'Integral Action',                 'unit':   '',          'concatenation_type': 'normal', 'dtype': 'float32'},
+    'derivative_action':        {'col': 38, 'label': 'Derivative Action',               'unit':   '',          'concatenation_type': 'normal', 'dtype': 'float32'}
 }
 
 DEFAULT_CONDITIONING_STRUCTURE = {
-    'mode':                     {'col': 0,     'label': 'Mode',                                 'unit': '',        'concatenation_type': 'normal'},
+    'mode':                     {'col': 0,     'label': 'Mode',                                 'unit': '',        'concatenation_type': 'normal', 'dtype': 'int8'   },
     'timestamp':                {'col': 1,     'label': 'Timestamp',                            'unit': 's',       'concatenation_type': 'normal'},
     'all_pulses':               {'col': 2,     'label': 'All Pulses',                           'unit': '',        'concatenation_type': 'additive'},
     'pulses':                   {'col': 3,     'label': 'Pulses',                               'unit': '',        'concatenation_type': 'normal'},
@@ -91,7 +96,7 @@ DEFAULT_CONDITIONING_STRUCTURE = {
     'BDR':                      {'col': 13,    'label': 'Breakdown Rate',                       'unit': '',        'concatenation_type': 'normal'},
     'output_voltage':           {'col': 14,    'label': 'Output Voltage',                       'unit': 'V',       'concatenation_type': 'normal'},
     'FUG_P':                    {'col': 15,    'label': 'FUG Voltage 2',                        'unit': 'V' ,      'concatenation_type': 'normal'},
-    'stop_cond':                {'col': 16,    'label': 'Stop Condition',                       'unit': '',        'concatenation_type': 'normal'},
+    'stop_cond':                {'col': 16,    'label': 'Stop Condition',                       'unit': '',        'concatenation_type': 'normal', 'dtype': 'int8'   },
     'gap':                      {'col': 17,    'label': 'Gap',                                  'unit': 'um' ,     'concatenation_type': 'normal'},
     'pulses_per_cycle':         {'col': 18,    'label': 'Pulses/Cycle',                         'unit': '',        'concatenation_type': 'normal'},
     'safe_pulses':              {'col': 19,    'label': 'Safe Pulses',                          'unit': '' ,       'concatenation_type': 'normal'},
@@ -104,8 +109,8 @@ DEFAULT_CONDITIONING_STRUCTURE = {
     'marx_pulses':              {'col': 26,    'label': 'Marx Pulses',                          'unit': '',        'concatenation_type': 'normal'},
     'S':                        {'col': 27,    'label': 'S',                                    'unit': '',        'concatenation_type': 'normal'},
     'target_voltage':           {'col': 28,    'label': 'Target Voltage',                       'unit': 'V',       'concatenation_type': 'normal'},
-    'polarity':                 {'col': 29,    'label': 'Polarity',                             'unit': '',        'concatenation_type': 'normal'},
-    'generator':                {'col': 30,    'label': 'Generator Model',                      'unit': '',        'concatenation_type': 'normal'},
+    'polarity':                 {'col': 29,    'label': 'Polarity',                             'unit': '',        'concatenation_type': 'normal', 'dtype': 'int8'   },
+    'generator':                {'col': 30,    'label': 'Generator Model',                      'unit': '',        'concatenation_type': 'normal', 'dtype': 'int8'   },
     'temperature':              {'col': 31,    'label': 'Temperature',                          'unit': 'K',       'concatenation_type': 'normal'},
     'GC_step_up':               {'col': 32,    'label': 'Step Up for Goal Conditioning ',       'unit': 'V',       'concatenation_type': 'normal'},
     'GC_step_down':             {'col': 33,    'label': 'Step Down for Goal Conditioning ',     'unit': 'V',       'concatenation_type': 'normal'},
@@ -117,7 +122,7 @@ DEFAULT_CONDITIONING_STRUCTURE = {
     'cycles_at_CG':             {'col': 39,    'label': 'Cycles Done at Conditioning Goal',     'unit':  '',       'concatenation_type': 'normal'},
     'cycles_since_decr':        {'col': 40,    'label': 'Cycles Since last CG Decrease',        'unit':  '',       'concatenation_type': 'normal'},
     'BDR_CG':                   {'col': 41,    'label': 'Goal Conditioning BDR' ,               'unit':  '',       'concatenation_type': 'normal'},
-    'conditioning_mode':        {'col': 42,    'label': 'Conditioning mode',                    'unit':  '',       'concatenation_type': 'normal'}
+    'conditioning_mode':        {'col': 42,    'label': 'Conditioning mode',                    'unit':  '',       'concatenation_type': 'normal', 'dtype': 'int8'   }
 }
 
 DEFAULT_RGA_STRUCTURE = {
@@ -131,5 +136,6 @@ DEFAULT_RGA_STRUCTURE = {
 DEFAULT_FE_STRUCTURE = {
     'voltage':                    {'col': 6,  'label':  'Voltage',                              'unit': 'kV'},
     'current':                    {'col': 7,  'label':  'Current',                              'unit': 'mA'},
+    'set_voltage':                {'col': 8,  'label':  'Set Voltage',                          'unit': 'kV'},
     'timestamp':            {'col': 9,  'label':  'Relative Time',                 'unit': 's'},
 }
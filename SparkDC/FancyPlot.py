@@ -1,16 +1,44 @@
+import os
 import numpy as np
-import pandas as pd
 import matplotlib
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 from matplotlib.dates import DateFormatter
+from matplotlib.transforms import Affine2D
+from matplotlib.collections import Collection, PolyCollection, LineCollection
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.lines import Line2D
 from dateutil import tz
 from zoneinfo import ZoneInfo
 
-from .Defaults import DEFAULT_STYLE
+from .Defaults import DEFAULT_STYLE, DEFAULT_RASTERIZE_THRESHOLD, DEFAULT_RASTER_DPI
 from . import Utils
+from . import Decimation
+from .ZoomData import ZoomLine, DataSource, PyramidSource
 
 SECONDS_IN_DAY = 60*60*24
+VECTOR_FORMATS = ['pdf', 'svg', 'svgz', 'eps', 'ps'] # the formats in which the dense artists are rasterized, see FancyPlot.savefig()
+AGG_CHUNKSIZE = 10000 # the paths of the rasterized artists are drawn in chunks, such that very dense lines do not overflow the Agg renderer
+
+def timestamp_to_datenum(timestamp):
+    """
+    Converts unix timestamps to matplotlib date numbers (float days since the matplotlib epoch), without making datetime objects
+
+    Parameters
+    ----------
+    timestamp:      double or numpy.ndarray
+
+    Returns
+    -------
+    datenum:        double or numpy.ndarray
+    """
+    return timestamp / SECONDS_IN_DAY + unix_epoch_datenum()
+
+def unix_epoch_datenum():
+    """
+    Returns the matplotlib date number of the unix epoch. It is 0 with the default matplotlib epoch, but the epoch can be changed with mdates.set_epoch()
+    """
+    return mdates.date2num(np.datetime64('1970-01-01T00:00:00'))
 
 class FancyPlot():
     """
@@ -49,6 +77,8 @@ class FancyPlot():
 
         self.color_cycle_counter = 0 #counts the default colors
         self.style_dict = style_dict
+        self.zoom_lines = [] # the lines whose data is fetched again when zooming, see plot_data(follow_zoom = True)
+        self.legend_proxies = {} # the legend handles of the series drawn in a LineCollection, for each axis index, see plot_data(batch = True)
 
         if len(args) == 0: #no arguments
             self.fig, ax = plt.subplots(figsize = figsize, layout='constrained') #constrained for better layouting while adding new axes
@@ -264,6 +294,65 @@ class FancyPlot():
         max = data.df[x_key].max()
         self.set_xlim([min, max])
 
+    def savefig(self, fname, rasterize_threshold = DEFAULT_RASTERIZE_THRESHOLD, dpi = None, **kwargs):
+        """
+        Saves the figure. In vector formats (pdf, svg, eps, ps), the lines and the collections with more than rasterize_threshold points
+        (markers, or vertices which are not simplified by matplotlib) are rasterized at the given dpi, while the axes, the text and the stripes stay vectors. This reduces the size of the files
+        and the time needed to write and to open them by orders of magnitude for long data sets
+
+        Parameters
+        ----------
+        fname:                  str, path-like, file-like or PdfPages
+                                The output. A PdfPages object adds a page to a multipage pdf
+        rasterize_threshold:    int or None, default: 10000
+                                The artists with more points are rasterized. If None, nothing is rasterized
+        dpi:                    double, default: None
+                                The resolution of the figure (of the rasterized artists, in vector formats).
+                                If None, 300 is used in vector formats and rcParams['savefig.dpi'] in the other formats
+        kwargs:                 The other arguments of matplotlib.figure.Figure.savefig()
+        """
+        if isinstance(fname, PdfPages):
+            kwargs.setdefault('format', 'pdf')
+        file_format = kwargs.get('format')
+        if file_format is None:
+            extension = os.path.splitext(fname)[1] if isinstance(fname, (str, os.PathLike)) else ''
+            file_format = extension[1:] if extension != '' else plt.rcParams['savefig.format']
+
+        vector_format = file_format.lower() in VECTOR_FORMATS
+        if dpi is None:
+            dpi = DEFAULT_RASTER_DPI if vector_format else plt.rcParams['savefig.dpi']
+
+        rasterized = [] # the artists rasterized for this save, restored afterwards
+        if rasterize_threshold is not None and vector_format:
+            for ax in self.axs:
+                for artist in ax.get_children():
+                    if not artist.get_rasterized() and FancyPlot.__count_points__(artist) > rasterize_threshold:
+                        artist.set_rasterized(True)
+                        rasterized.append(artist)
+        try:
+            with plt.rc_context({'agg.path.chunksize': AGG_CHUNKSIZE} if len(rasterized) > 0 else {}):
+                self.fig.savefig(fname, dpi = dpi, **kwargs)
+        finally:
+            for artist in rasterized:
+                artist.set_rasterized(False)
+
+    @staticmethod
+    def __count_points__(artist):
+        """
+        Returns the number of points drawn by a line or a collection. Stripes (PolyCollection) and the other artists are not counted.
+        The vertices of a line without markers are counted only if its path is not simplified, the vector backends simplify
+        long lines themselves (with path.simplify) and rasterizing them would only slow down the export
+        """
+        if isinstance(artist, Line2D):
+            n_vertices = artist.get_path().vertices.shape[0]
+            n_points = n_vertices if artist.get_marker() not in [None, 'None', '', ' '] else 0
+            if artist.get_linestyle() not in ['None', '', ' '] and not artist.get_path().should_simplify:
+                n_points += n_vertices
+            return n_points
+        if isinstance(artist, Collection) and not isinstance(artist, PolyCollection):
+            return sum(path.vertices.shape[0] for path in artist.get_paths()) + len(artist.get_offsets())
+        return 0
+
     def legend(self, ax_id = -1, loc = 'best'):
         """
         Make the legend for the plot.
@@ -277,10 +366,13 @@ class FancyPlot():
         """
         h = []
         l = []
-        for ax in self.axs: #   combining all the plots from all axes
+        for i, ax in enumerate(self.axs): #   combining all the plots from all axes
             h1, l1 = ax.get_legend_handles_labels()
             h += h1
             l += l1
+            proxies = self.legend_proxies.get(i, []) # the series drawn in LineCollections
+            h += proxies
+            l += [proxy.get_label() for proxy in proxies]
         self.axs[ax_id].legend(h, l, loc=loc, fontsize = self.fontsize)
 
     def __get_zorder__(self):
@@ -359,23 +451,23 @@ class FancyPlot():
 
     def stripe_from_data(self, data, start_i, end_i, x_key = 'timestamp', ax_id = 0, color = '0.9', datetime_plot = False):
         """
-        Adds an axvspan between data.df[x_key].iloc[start_i] and data.df[x_key].iloc[end_i]
+        Adds stripes between data.df[x_key].iloc[start_i] and data.df[x_key].iloc[end_i], see FancyPlot.stripe()
 
         Parameters
         ----------
         data:       Data
                     The data object used in the plot
         start_i:    int
-                    The index from which to start the axvspan
+                    The index from which to start the stripes
         end_i:      int
-                    The index at which the axvspan ends
+                    The index at which the stripes end
 
         x_key:          str, default = 'timestamp'
                         The column used for the x axis
         ax_id:          int, default = 0
-                        The index of the matplotlib axes in the axs list on which the axvspan will be drawn
+                        The index of the matplotlib axes in the axs list on which the stripes will be drawn
         color:          matplotlib color, default: '0.9' (grey)
-                        The facecolor of the axvspan
+                        The facecolor of the stripes
         datetime_plot:  bool, default: False
                         Specified whether the x axis is formated as datetime
         """
@@ -386,46 +478,59 @@ class FancyPlot():
 
     def stripe(self, start_x, end_x, ax_id = 0, color = '0.9', datetime_plot = False):
         """
-        Adds an axvspan between start and end
+        Adds vertical stripes (spanning the whole height of the axis) between start and end.
+        All the stripes are drawn as a single PolyCollection, therefore thousands of stripes cost about the same as one
 
         Parameters
         ----------
         data:       Data
                     The data object used in the plot
         start:      np.ndarray or double
-                    The start of the axvspan
+                    The start of the stripes
         end:        np.ndarray or double
-                    The end of the axvspan
+                    The end of the stripes
 
         ax_id:          int, default = 0
-                        The index of the matplotlib axes in the axs list on which the axvspan will be drawn
+                        The index of the matplotlib axes in the axs list on which the stripes will be drawn
         color:          matplotlib color, default: '0.9' (grey)
-                        The facecolor of the axvspan
+                        The facecolor of the stripes
         datetime_plot:  bool, default: False
                         Specified whether the x axis is formated as datetime
-        """
-        if datetime_plot: # convert to mdates if datetime plot
-            new_start_x = mdates.num2date(start_x/SECONDS_IN_DAY)
-            new_end_x = mdates.num2date(end_x/SECONDS_IN_DAY)
-        else:
-            new_start_x = start_x
-            new_end_x  = end_x
-
-        if len(Utils.dim(new_start_x)) == 0 and len(Utils.dim(new_end_x)) == 0: #If start and end are scalar, convert to np.ndarray
-            new_start_x = np.array([new_start_x])
-            new_end_x = np.array([new_end_x])
 
-        # if pandas.Series, convert to numpy
-        if type(new_start_x) == pd.core.series.Series: new_start_x = pd.Series.to_numpy(new_start_x)
-        if type(new_end_x) == pd.core.series.Series: new_end_x = pd.Series.to_numpy(new_end_x)
-
-        # finally, create the axvspan
-        for i in range(new_start_x.shape[0]):
-            self.axs[ax_id].axvspan(new_start_x[i], new_end_x[i], facecolor = color)
+        Returns
+        -------
+        collection:     matplotlib.collections.PolyCollection or None
+                        None if there are no stripes
+        """
+        # convert scalars, lists and pandas.Series to np.ndarray
+        new_start_x = np.atleast_1d(np.asarray(start_x, dtype = float))
+        new_end_x = np.atleast_1d(np.asarray(end_x, dtype = float))
+        if new_start_x.shape[0] == 0:
+            return None
+
+        if datetime_plot: # convert to matplotlib date numbers if datetime plot
+            new_start_x = timestamp_to_datenum(new_start_x)
+            new_end_x = timestamp_to_datenum(new_end_x)
+
+        # one rectangle per stripe: x in data coordinates, y from the bottom (0) to the top (1) of the axis
+        verts = np.empty([new_start_x.shape[0], 4, 2])
+        verts[:, [0, 1], 0] = new_start_x[:, None]
+        verts[:, [2, 3], 0] = new_end_x[:, None]
+        verts[:, [0, 3], 1] = 0
+        verts[:, [1, 2], 1] = 1
+
+        current_ax = self.axs[ax_id]
+        collection = PolyCollection(verts, facecolors = color, edgecolors = 'none', transform = current_ax.get_xaxis_transform())
+        current_ax.add_collection(collection, autolim = False)
+        # as for axvspan, the stripes are included in the x limits of the axis, but not in the y limits
+        current_ax.update_datalim(np.stack([np.concatenate([new_start_x, new_end_x]), np.zeros([2 * new_start_x.shape[0]])], axis = 1), \
+            updatex = True, updatey = False)
+        current_ax.autoscale_view(scaley = False)
+        return collection
 
     def stripe_files(self, data, x_key = 'timestamp', ax_id = 0, color = '0.9', sec_color = '1.0', datetime_plot = False):
         """
-        Makes axvspans that separate data from different files
+        Makes stripes that separate data from different files. The odd and the even files are drawn as one PolyCollection each
 
         Parameters
         ----------
@@ -433,21 +538,22 @@ class FancyPlot():
                     The data object used in the plot
 
         ax_id:          int, default = 0
-                        The index of the matplotlib axes in the axs list on which the axvspan will be drawn
+                        The index of the matplotlib axes in the axs list on which the stripes will be drawn
         x_key:          str, default = 'timestamp'
                         The column used for the x axis
         color:          matplotlib color, default: '0.9' (grey)
-                        The facecolor of the odd axvspans
+                        The facecolor of the odd stripes
         sec_color:      matplotlib color, default: '1.0' (white)
-                        The facecolor of the even axvspans
+                        The facecolor of the even stripes
         datetime_plot:  bool, default: False
                         Specified whether the x axis is formated as datetime
         """
         f_sep = data.file_separators
+        x = data.df[x_key].to_numpy()
 
-        for i in range(f_sep.shape[0]):
-            current_color = color if i%2 else sec_color
-            self.stripe_from_data(data, f_sep[i,0], f_sep[i,1], x_key = x_key, ax_id = ax_id, color = current_color, datetime_plot = datetime_plot)
+        # the odd and the even files are striped with one call each
+        self.stripe(x[f_sep[1::2, 0]], x[f_sep[1::2, 1]], ax_id = ax_id, color = color, datetime_plot = datetime_plot)
+        self.stripe(x[f_sep[0::2, 0]], x[f_sep[0::2, 1]], ax_id = ax_id, color = sec_color, datetime_plot = datetime_plot)
 
     def plot(self, x, y, ax_id = 0, date_format = "%m-%d %H:%M:%S", timezone = 'Europe/Stockholm', datetime_plot = True, marker = None, \
     markersize = 5, linestyle = 'solid', linewidth = 2, color = None, label = None, scaling_x = 1, scaling_y = 1):
@@ -468,7 +574,8 @@ class FancyPlot():
         timezone:       str, default = 'Europe/Stockholm'
                         The timezone used if if datetime_plot is enabled
         datetime_plot:  bool, default: True
-                        Specified whether the x axis is formated as datetime. If the x data are already mdates, this should be set to False
+                        Specified whether the x axis is formated as datetime. If True, x contains unix timestamps, which are shown as dates
+                        without converting them to datetime objects. If the x data are already mdates, this should be set to False
 
         marker:         matplotlib marker, default: None
         markersize:     int, default: 5
@@ -478,25 +585,22 @@ class FancyPlot():
         label:          str, default: None
                         The label of the Line2D plot
         scaling_x:      double
-                        The x data is multiplied by this number when plotting. Useful when converting units
+                        The x data is multiplied by this number when plotting. Useful when converting units. Not used if datetime_plot is True
         scaling_y:      double
                         The y data is multiplied by this number when plotting. Useful when converting units
         """
-        if datetime_plot: # convert to mdates
-            new_x = mdates.num2date(x/SECONDS_IN_DAY)
-            date_formatter = DateFormatter(date_format, tz=tz.gettz(timezone))
-            self.axs[ax_id].xaxis.set_major_formatter(date_formatter)
-            plt.setp(self.axs[0].xaxis.get_majorticklabels(), rotation=70)
-        else:
-            new_x = scaling_x*x # scale the x axis
-        new_y = scaling_y * y # scale the y axis
+        current_ax = self.axs[ax_id]
+        if datetime_plot: # the x axis shows dates, while the x data stay unix timestamps
+            self.__set_date_axis__(ax_id, date_format, timezone)
         if color == None: color = self.__get_next_color__() # get next color in the color cycle
-        self.axs[ax_id].plot(new_x,  new_y, color = color, marker = marker, markersize = markersize, \
-                linestyle = linestyle, linewidth = linewidth, label = label)
+        # the data is converted to dates and scaled by the transform of the line, no copy of the data is made
+        current_ax.plot(x,  y, color = color, marker = marker, markersize = markersize, linestyle = linestyle, linewidth = linewidth, label = label, \
+            transform = self.__data_transform__(ax_id, scaling_x = scaling_x, scaling_y = scaling_y, datetime_plot = datetime_plot))
 
 
     def plot_data(self, data, keys, x_key = 'timestamp', datetime_plot = True, date_format = "%m-%d %H:%M:%S", timezone = 'Europe/Stockholm', \
-    ax_id = None, marker = None, markersize = 5, linestyle = '-', linewidth = 2, color = None, labels = None, scaling_x = 1, scaling_y = 1, use_style_dict = True):
+    ax_id = None, marker = None, markersize = 5, linestyle = '-', linewidth = 2, color = None, labels = None, scaling_x = 1, scaling_y = 1, use_style_dict = True, \
+    decimate = None, n_pixels = None, follow_zoom = False, batch = False):
         """
         Plots the selected columns from the pandas dataframe of the Data obejct
 
@@ -533,6 +637,17 @@ class FancyPlot():
                             The y data is multiplied by this number when plotting. Useful when converting units
         use_style_dict:     bool,   default: True
                             If true, the proprieties of the plot will be derived from the provided style_dict
+        decimate:           ['minmax'|'lttb'], default: None
+                            If not None, the data of each file is decimated before plotting, keeping about 2 points per pixel column.
+                            'minmax' keeps the minimum and the maximum of each pixel column, such that spikes are preserved. 'lttb' uses Largest-Triangle-Three-Buckets
+        n_pixels:           int, default: None
+                            The point budget used for the decimation, as the number of pixel columns of the whole x range. If None, the width of the axis in pixels is used
+        follow_zoom:        bool, default: False
+                            If True, the lines are decimated again for the visible window when the x limits change (zoom or pan) in an interactive figure,
+                            such that the detail appears when zooming in. If decimate is None, 'minmax' is used. See ZoomData.ZoomLine
+        batch:              bool, default: False
+                            If True, the series without markers are drawn as a single LineCollection per axis instead of one line each, which is much faster
+                            when many series are plotted. The legend entries are made from proxy lines, see FancyPlot.legend(). Not supported with follow_zoom
 
         """
         # check the dimensions of the key list and convert it to a standard format(list of list of str)
@@ -567,24 +682,32 @@ class FancyPlot():
         else:
             raise ValueError("The ax_id array should be a int or list of int")
 
+        if batch and follow_zoom:
+            raise ValueError("The batch mode does not support follow_zoom")
+
         # do the same thing for the other parameters
         marker = Utils.fix_parameter_list(keys, marker)
         linestyle = Utils.fix_parameter_list(keys, linestyle)
         color = Utils.fix_parameter_list(keys, color)
         linewidth = Utils.fix_parameter_list(keys, linewidth)
         markersize = Utils.fix_parameter_list(keys, markersize)
+        # the styles of all series are resolved at once, in the order of the keys
+        styles = self.__get_styles__(keys, color, linestyle, linewidth, marker, markersize, use_style_dict = use_style_dict)
 
 
         # fix gaps between data corresponding to different files. A NaN value is added at the end of the data corresponding to each file.
             # Otherwise, in the plot, a line will brige the gap between the data corresponding to different neighbouring files
         # x_data = data.df[x_key]
-        x_data = Utils.fix_gaps_between_files(data, x_key, add_nan = False)
-        if datetime_plot and x_key == 'timestamp': # convert to mdates
-            new_x = x_data
-            date_formatter = DateFormatter(date_format, tz=tz.gettz(timezone))
-            new_x = mdates.num2date(x_data/SECONDS_IN_DAY)
-        else:
-            new_x = x_data
+        x_data = data.fix_gaps_between_files(x_key, add_nan = False)[x_key]
+        y_keys = [key for sublist in keys for key in sublist]
+        y_fixed = data.fix_gaps_between_files(y_keys, add_nan = True) # all the y columns are fixed at once
+        # the timestamps are shown as dates by the transform of the lines, they are not converted
+        date_axis = datetime_plot and x_key == 'timestamp'
+
+        if follow_zoom and decimate is None:
+            decimate = 'minmax'
+        if decimate is not None: # the segments containing the data of each file, between the gaps
+            segments = Decimation.gap_segments(data.file_separators)
 
         for i in range(0, n_axes): #iterate through all axes
             if ax_id is None: # if ax_id is None, use axs[i], else use axs[ax_id[i]]
@@ -594,25 +717,204 @@ class FancyPlot():
                 current_ax = self.axs[ax_id[i]]
                 current_ax_id = ax_id[i]
 
-            if datetime_plot and x_key == 'timestamp': # set up the plot for datetime plotting
-                current_ax.xaxis.set_major_formatter(date_formatter)
-                plt.setp(self.axs[0].xaxis.get_majorticklabels(), rotation=70)
-
+            batch_segments = [] # the series drawn in the LineCollection of the axis
+            batch_styles = []
             for j in range(0, len(keys[i])):
-                # get style from the  style_dict, if available
-                current_color, current_linestyle, current_linewidth, current_marker, current_markersize = \
-                    self.__get_style__(keys[i][j], color[i][j], linestyle[i][j], linewidth[i][j], marker[i][j], markersize[i][j], use_style_dict = use_style_dict)
+                current_color, current_linestyle, current_linewidth, current_marker, current_markersize = styles[i][j]
 
                 if labels is None:
                     label = data.info_dict[keys[i][j]]['label']
                 else:
                     label = labels[i][j]
                 # y_data = data.df[keys[i][j]]
-                y_data = Utils.fix_gaps_between_files(data, keys[i][j], add_nan = True)
+                y_data = y_fixed[keys[i][j]]
+                current_x = x_data
+                if decimate is not None:
+                    current_n_pixels = n_pixels if n_pixels is not None else \
+                        int(np.ceil(current_ax.get_position().width * self.fig.get_figwidth() * self.fig.dpi))
+                    indices = Decimation.decimate_segments(x_data, y_data, segments, current_n_pixels, method = decimate)
+                    current_x = x_data[indices]
+                    y_data = y_data[indices]
+
+                if batch and current_marker in [None, 'None', 'none', '']: # the series with markers are drawn as lines
+                    batch_segments.append(np.stack([current_x, y_data], axis = 1))
+                    batch_styles.append((current_color, current_linestyle, current_linewidth, label))
+                    continue
+                self.plot(current_x,  y_data, ax_id = current_ax_id, scaling_x = scaling_x, scaling_y = scaling_y, color = current_color, marker = current_marker, \
+                    markersize = current_markersize, linestyle = current_linestyle, linewidth = current_linewidth, label = label, datetime_plot = date_axis, \
+                    date_format = date_format, timezone = timezone)
+                if follow_zoom: # the line data is replaced with the data of the visible window when the x limits change
+                    source = DataSource(x_data, y_fixed[keys[i][j]], segments, method = decimate)
+                    self.zoom_lines.append(ZoomLine(current_ax.get_lines()[-1], source))
+
+            if len(batch_segments) > 0:
+                self.__plot_collection__(current_ax_id, batch_segments, batch_styles, scaling_x = scaling_x, scaling_y = scaling_y, \
+                    datetime_plot = date_axis, date_format = date_format, timezone = timezone)
+
+    def plot_pyramid(self, pyramid, keys, timestamp_limits = None, ax_id = 0, stat = 'minmax', date_format = "%m-%d %H:%M:%S", timezone = 'Europe/Stockholm', \
+    marker = None, markersize = 5, linestyle = '-', linewidth = 2, color = None, labels = None, scaling_y = 1, use_style_dict = True):
+        """
+        Plots status channels from a StatusPyramid on a datetime axis. The data of the visible window is fetched again when the x limits change (zoom or pan),
+        from the coarsest level which still gives the resolution of the screen, or from the raw status files at deep zoom. See ZoomData.PyramidSource
+
+        Parameters
+        ----------
+        pyramid:            StatusPyramid
+                            The pyramid of the status folder
+        keys:               str or list of str
+                            The channels plotted on the axis
+        timestamp_limits:   list of double, default: None
+                            The initial x limits (unix timestamps). If None, the whole range of the status files is shown
+        ax_id:              int, default: 0
+                            The index of the matplotlib axes in the axs list on which the data will be plotted
+        stat:               ['minmax'|'mean'], default: 'minmax'
+                            'minmax' plots the minimum and the maximum of each bucket, such that spikes are not lost. 'mean' plots the mean of each bucket
+        date_format:        str, default = '%m-%d %H:%M:%S'
+                            The format of the datetime on the x axis
+        timezone:           str, default = 'Europe/Stockholm'
+                            The timezone of the datetime on the x axis
+        marker:             matplotlib marker, default: None
+        markersize:         int, default: 5
+        linestyle:          matplotlib linestyle, default: 'solid'
+        linewidth:          int, default: 2
+        color:              matplotlib color, default: None (a color is selected from the color cycle)
+        labels:             str or list of str, default: None
+                            The labels of the Line2D plots. If None, get the labels from the info_dict of the pyramid
+        scaling_y:          double
+                            The y data is multiplied by this number when plotting. Useful when converting units
+        use_style_dict:     bool,   default: True
+                            If true, the proprieties of the plot will be derived from the provided style_dict
+        """
+        if len(Utils.dim(keys)) == 0:
+            keys = [keys]
+        if labels is not None and len(Utils.dim(labels)) == 0:
+            labels = [labels]
+        if timestamp_limits is None:
+            pyramid.file_index.update()
+            entries = [entry for entry in pyramid.file_index.entries.values() if entry['n_rows'] > 0]
+            if len(entries) == 0:
+                raise ValueError(f"No status data found in {pyramid.folder_path}")
+            timestamp_limits = [min(entry['first_timestamp'] for entry in entries), max(entry['last_timestamp'] for entry in entries)]
+
+        current_ax = self.axs[ax_id]
+        self.__set_date_axis__(ax_id, date_format, timezone)
+        transform = self.__data_transform__(ax_id, scaling_y = scaling_y, datetime_plot = True)
+
+        new_lines = []
+        for j, key in enumerate(keys):
+            current_color, current_linestyle, current_linewidth, current_marker, current_markersize = \
+                self.__get_style__(key, color, linestyle, linewidth, marker, markersize, use_style_dict = use_style_dict)
+            if current_color == None: current_color = self.__get_next_color__()
+            label = pyramid.info_dict[key]['label'] if labels is None else labels[j]
+            line, = current_ax.plot([], [], color = current_color, marker = current_marker, markersize = current_markersize, \
+                linestyle = current_linestyle, linewidth = current_linewidth, label = label, transform = transform)
+            zoom_line = ZoomLine(line, PyramidSource(pyramid, key, stat = stat))
+            self.zoom_lines.append(zoom_line)
+            new_lines.append(zoom_line)
+
+        current_ax.set_xlim(timestamp_to_datenum(timestamp_limits[0]), timestamp_to_datenum(timestamp_limits[1])) # fetches the data of the lines
+        for zoom_line in new_lines:
+            zoom_line.update()
+        current_ax.relim()
+        current_ax.autoscale_view(scalex = False)
+
+    def __plot_collection__(self, ax_id, segments, styles, scaling_x = 1, scaling_y = 1, datetime_plot = False, date_format = "%m-%d %H:%M:%S", \
+        timezone = 'Europe/Stockholm'):
+        """
+        Draws several series as a single LineCollection and makes their legend proxies
+
+        Parameters
+        ----------
+        ax_id:          int
+                        The index of the matplotlib axes in the axs list
+        segments:       list of numpy.ndarray
+                        The (x, y) points of each series, of shape (n_points, 2). NaN values break the lines
+        styles:         list of tuple
+                        The (color, linestyle, linewidth, label) of each series
+        scaling_x:      double, default: 1
+        scaling_y:      double, default: 1
+        datetime_plot:  bool, default: False
+                        If True, the x data are unix timestamps shown as dates
+        date_format:    str, default = '%m-%d %H:%M:%S'
+        timezone:       str, default = 'Europe/Stockholm'
+
+        Returns
+        -------
+        collection:     matplotlib.collections.LineCollection
+        """
+        current_ax = self.axs[ax_id]
+        if datetime_plot:
+            self.__set_date_axis__(ax_id, date_format, timezone)
+        colors, linestyles, linewidths, labels = zip(*styles)
+        collection = LineCollection(segments, colors = list(colors), linestyles = list(linestyles), linewidths = list(linewidths), \
+            transform = self.__data_transform__(ax_id, scaling_x = scaling_x, scaling_y = scaling_y, datetime_plot = datetime_plot))
+        current_ax.add_collection(collection, autolim = True)
+        current_ax.autoscale_view()
+
+        # the collection has a single legend entry, a proxy line is made for each series
+        proxies = self.legend_proxies.setdefault(ax_id, [])
+        for color, linestyle, linewidth, label in styles:
+            proxies.append(Line2D([], [], color = color, linestyle = linestyle, linewidth = linewidth, label = label))
+        return collection
+
+    def __set_date_axis__(self, ax_id, date_format = "%m-%d %H:%M:%S", timezone = 'Europe/Stockholm'):
+        """
+        Formats the x axis as datetime. The data plotted on it are matplotlib date numbers (see FancyPlot.__data_transform__())
+        """
+        self.axs[ax_id].xaxis_date(tz = tz.gettz(timezone))
+        date_formatter = DateFormatter(date_format, tz=tz.gettz(timezone))
+        self.axs[ax_id].xaxis.set_major_formatter(date_formatter)
+        plt.setp(self.axs[0].xaxis.get_majorticklabels(), rotation=70)
 
-                # datetime_plot is set to False in the following. This is done because x_data is already converted to mdates
-                self.plot(new_x,  y_data, ax_id = current_ax_id, scaling_x = scaling_x, scaling_y = scaling_y, color = current_color, marker = current_marker, \
-                    markersize = current_markersize, linestyle = current_linestyle, linewidth = current_linewidth, label = label, datetime_plot = False)
+    def __data_transform__(self, ax_id, scaling_x = 1, scaling_y = 1, datetime_plot = False):
+        """
+        Returns the transform of a line from its data to the display. Unit scaling and the conversion of unix timestamps to matplotlib
+        date numbers are done by the transform, therefore the data of the line is not copied
+
+        Parameters
+        ----------
+        ax_id:          int
+                        The index of the matplotlib axes in the axs list
+        scaling_x:      double, default: 1
+                        Not used if datetime_plot is True
+        scaling_y:      double, default: 1
+        datetime_plot:  bool, default: False
+                        If True, the x data are unix timestamps
+
+        Returns
+        -------
+        transform:      matplotlib.transforms.Transform
+        """
+        ax = self.axs[ax_id]
+        if datetime_plot:
+            return Affine2D().scale(1 / SECONDS_IN_DAY, scaling_y).translate(unix_epoch_datenum(), 0) + ax.transData
+        if scaling_x == 1 and scaling_y == 1:
+            return ax.transData
+        return Affine2D().scale(scaling_x, scaling_y) + ax.transData
+
+    def __get_styles__(self, keys, colors, linestyles, linewidths, markers, markersizes, use_style_dict = True):
+        """
+        Gets the styles of several series at once. The colors which are not given are taken from the color cycle, in the order of the keys
+
+        Parameters
+        ----------
+        keys:           list of list of str
+        colors, linestyles, linewidths, markers, markersizes:
+                        list of list, with the same shape as keys. See FancyPlot.__get_style__()
+        use_style_dict: bool, default: True
+
+        Returns
+        -------
+        styles:         list of list of tuple
+                        The (color, linestyle, linewidth, marker, markersize) of each key
+        """
+        styles = []
+        for i in range(0, len(keys)):
+            styles.append([])
+            for j in range(0, len(keys[i])):
+                styles[i].append(self.__get_style__(keys[i][j], colors[i][j], linestyles[i][j], linewidths[i][j], markers[i][j], markersizes[i][j], \
+                    use_style_dict = use_style_dict))
+        return styles
 
     def __get_style__(self, key, color, linestyle, linewidth, marker, markersize, use_style_dict = True):
         """
@@ -4,6 +4,18 @@ import pandas as pd
 from .Defaults import DEFAULT_FE_STRUCTURE, LABVIEW_TIMESTAMP_OFFSET
 from . import Data
 from . import FancyPlot
+from . import Utils
+
+FN_A = 1.541434E-6 # the first Fowler-Nordheim constant, A eV V^-2
+FN_B = 6.830890E9 # the second Fowler-Nordheim constant, eV^-3/2 V m^-1
+DEFAULT_WORK_FUNCTION = 4.5 # eV
+
+# the columns needed for calculating each derived column
+DERIVED_COLUMNS = {
+    'field':        ['voltage'],
+    'true_voltage': ['voltage', 'current'],
+    'true_field':   ['voltage', 'current'],
+}
 
 class FieldEmissionData(Data):
     """
@@ -33,7 +45,7 @@ class FieldEmissionData(Data):
         self.calculate_derived_columns()
 
     def plot_IV(self, x_key = 'true_field', fplot = None, FN_plot = False, minI = 1E-3, figsize = (13, 8), ax_id = 0, marker = None, markersize = 5, \
-    linestyle = '-', linewidth = 2, color = None, label = None, fontweight = 'normal', fontsize = 12):
+    linestyle = '-', linewidth = 2, color = None, label = None, fontweight = 'normal', fontsize = 12, aggregate_steps = False):
         """
         Plots the selected columns from the pandas dataframe of the Data obejct
 
@@ -63,12 +75,18 @@ class FieldEmissionData(Data):
         color:              matplotlib color, default: None (a color is selected from the color cycle)
         label:              str, default: None
                             The labels of the Line2D plot.
+        aggregate_steps:    bool, default: False
+                            If True, the mean of each set voltage step is plotted instead of the raw samples, see FieldEmissionData.aggregate_steps()
 
         Returns
         -------
         fplot:  FancyPlot
                 The FancyPlot on which the data was plotted
         """
+        if aggregate_steps:
+            return self.aggregate_steps().plot_IV(x_key = x_key, fplot = fplot, FN_plot = FN_plot, minI = minI, figsize = figsize, ax_id = ax_id, \
+                marker = marker, markersize = markersize, linestyle = linestyle, linewidth = linewidth, color = color, label = label, \
+                fontweight = fontweight, fontsize = fontsize)
 
         if fplot is None:
             fplot = FancyPlot(n_ax = 1, figsize = figsize, style_dict = None, fontweight = fontweight, fontsize = fontsize)
@@ -102,23 +120,269 @@ class FieldEmissionData(Data):
         fplot.set_axis_ylabel(0, 'Current [uA]')
         return fplot
 
+    def get_ramps(self, by = 'file_id', split_key = None):
+        """
+        Get the indices corresponding to the start and end of each ramp. The ramps are the groups of consecutive rows with the same value of the column by
+        (e.g. the files), optionally split where the column split_key changes direction (e.g. the ramp up and the ramp down of a file)
+
+        Parameters
+        ----------
+        by:             str, default: 'file_id'
+                        The column defining the groups. If None, the whole data is one group
+        split_key:      str, default: None
+                        If not None, the groups are split at the maximum and the minimum points of this column. It should not be noisy (e.g. a set voltage),
+                        the rows in which it does not change continue the previous direction
+
+        Returns
+        -------
+        ramp_separators:    numpy.ndarray
+                            ramp_separators[i, 0] - the index corresponding to the start of ramp i
+                            ramp_separators[i, 1] - the index corresponding to the end of ramp i
+        """
+        n_rows = self.df.shape[0]
+        if n_rows == 0:
+            return np.empty([0, 2], dtype = int)
+        starts = self.get_segments(by)[1][:, 0] if by is not None else np.array([0])
+
+        if split_key is not None and n_rows > 2:
+            # the direction of each step between two rows. The steps between the groups have no direction
+            direction = np.nan_to_num(np.sign(np.diff(self.df[split_key].to_numpy(dtype = float))))
+            boundaries = starts[starts > 0] - 1
+            direction[boundaries] = 0
+            # the steps without a change continue the previous direction of their group
+            anchors = direction != 0
+            anchors[boundaries] = True
+            direction = direction[np.maximum.accumulate(np.where(anchors, np.arange(direction.shape[0]), 0))]
+            # the turning point ends the ramp, the next ramp starts after it
+            turns = np.flatnonzero((direction[1:] != direction[:-1]) & (direction[1:] != 0) & (direction[:-1] != 0)) + 2
+            starts = np.union1d(starts, turns)
+
+        ends = np.append(starts[1:] - 1, n_rows - 1)
+        return np.stack([starts, ends], axis = 1).astype(int)
+
+    def get_steps(self, by = 'file_id'):
+        """
+        Get the indices corresponding to the start and end of each set voltage step: the consecutive rows with the same 'set_voltage' in a group.
+        A step is also split at the turning points of the ramps, see FieldEmissionData.get_ramps()
+
+        Parameters
+        ----------
+        by:             str, default: 'file_id'
+                        The column defining the groups (e.g. the files). If None, the whole data is one group
+
+        Returns
+        -------
+        step_separators:    numpy.ndarray
+                            step_separators[i, 0] - the index corresponding to the start of step i
+                            step_separators[i, 1] - the index corresponding to the end of step i
+        """
+        if 'set_voltage' not in self.df:
+            raise ValueError("The 'set_voltage' column is needed for finding the steps!")
+        n_rows = self.df.shape[0]
+        if n_rows == 0:
+            return np.empty([0, 2], dtype = int)
+        starts = np.union1d(self.get_segments('set_voltage')[1][:, 0], self.get_ramps(by, split_key = 'set_voltage')[:, 0])
+        ends = np.append(starts[1:] - 1, n_rows - 1)
+        return np.stack([starts, ends], axis = 1).astype(int)
+
+    def aggregate_steps(self, by = 'file_id', skip = 0):
+        """
+        Aggregates the samples of each set voltage step, such that the IV curves are made of one robust point per step.
+        The steps are found in one vectorized pass, see FieldEmissionData.get_steps()
+
+        Parameters
+        ----------
+        by:             str, default: 'file_id'
+                        The column defining the groups (e.g. the files). If None, the whole data is one group
+        skip:           int, default: 0
+                        The number of samples skipped at the start of each step (e.g. the transients after the change of the voltage)
+
+        Returns
+        -------
+        steps:          FieldEmissionData
+                        One row per step, with the same gap and current limiting resistor. The columns 'voltage', 'current' and 'timestamp' are the means
+                        of the samples and the derived columns are calculated from them. The other columns:
+                        'set_voltage'                               - the set voltage of the step
+                        'current_median', 'current_std'             - the median and the standard deviation of the current
+                        'true_field_median', 'true_field_std'       - the median and the standard deviation of the true field
+                        'duration'                                  - the time between the first and the last sample of the step
+                        'n_samples'                                 - the number of samples aggregated
+                        'direction'                                 - 1 for the steps of a ramp up, -1 for the steps of a ramp down, 0 for a ramp of a single step
+                        'ramp_id'                                   - the index of the ramp, see FieldEmissionData.get_ramps()
+                        'file_id'                                   - the file of the step, if present in the data
+        """
+        separators = self.get_steps(by)
+        ramps = self.get_ramps(by, split_key = 'set_voltage')
+        n_steps = separators.shape[0]
+        set_voltage = self.df['set_voltage'].to_numpy(dtype = float)
+        ramp_direction = np.sign(set_voltage[ramps[:, 1]] - set_voltage[ramps[:, 0]]).astype(int)
+
+        # the samples kept from each step
+        step = np.repeat(np.arange(n_steps), separators[:, 1] - separators[:, 0] + 1)
+        kept = np.arange(step.shape[0]) - separators[step, 0] >= skip
+        step = step[kept]
+        n_samples = np.bincount(step, minlength = n_steps)
+
+        columns = {}
+        with np.errstate(invalid = 'ignore', divide = 'ignore'):
+            for key in ['voltage', 'current', 'timestamp']:
+                if key in self.df:
+                    columns[key] = np.bincount(step, weights = self.df[key].to_numpy(dtype = float)[kept], minlength = n_steps) / n_samples
+            for key in ['current', 'true_field']:
+                if key in self.df:
+                    values = self.df[key].to_numpy(dtype = float)[kept]
+                    columns[key + '_median'] = FieldEmissionData.__grouped_median__(step, values, n_steps)
+                    mean = np.bincount(step, weights = values, minlength = n_steps) / n_samples
+                    squares = np.bincount(step, weights = (values - mean[step])**2, minlength = n_steps)
+                    columns[key + '_std'] = np.sqrt(squares / (n_samples - 1))
+        columns['set_voltage'] = set_voltage[separators[:, 0]]
+        if 'timestamp' in self.df:
+            timestamp = self.df['timestamp'].to_numpy(dtype = float)
+            columns['duration'] = timestamp[separators[:, 1]] - timestamp[np.minimum(separators[:, 0] + skip, separators[:, 1])]
+        columns['n_samples'] = n_samples
+        columns['ramp_id'] = np.searchsorted(ramps[:, 0], separators[:, 0], side = 'right') - 1
+        columns['direction'] = ramp_direction[columns['ramp_id']]
+        if 'file_id' in self.df:
+            columns['file_id'] = self.df['file_id'].to_numpy()[separators[:, 0]]
+        valid = n_samples > 0
+        df = pd.DataFrame({key: value[valid] for key, value in columns.items()})
+
+        info_dict = {key: dict(subdict) for key, subdict in self.info_dict.items() if key in df}
+        labels = {'current_median': ('Current (median)', 'mA'), 'current_std': ('Current (std)', 'mA'), 'true_field_median': ('Electric Field (median)', 'MV/m'), \
+            'true_field_std': ('Electric Field (std)', 'MV/m'), 'duration': ('Step Duration', 's'), 'n_samples': ('Samples', ''), 'direction': ('Ramp Direction', ''), \
+            'ramp_id': ('Ramp', '')}
+        for key, (label, unit) in labels.items():
+            if key in df:
+                info_dict[key] = {'col': -1, 'label': label, 'unit': unit}
+        return FieldEmissionData(df, info_dict, gap = self.gap, current_limiting_resistor = self.current_limiting_resistor)
+
+    def fit_FN(self, x_key = 'true_field', minI = 1E-3, by = 'file_id', split_key = None, work_function = DEFAULT_WORK_FUNCTION, confidence = 0.95):
+        """
+        Fits the Fowler-Nordheim law I = A * FN_A * (beta * E)^2 / phi * exp(-FN_B * phi^1.5 / (beta * E)) to each ramp, giving the field enhancement factor beta
+        and the emission area A. All the ramps are fitted at once: the linear regressions of ln(I/E^2) against 1/E are calculated with grouped sums
+
+        Parameters
+        ----------
+        x_key:          ['true_field'|'field'], default: 'true_field'
+                        The key corresponding to the electric field, in MV/m
+        minI:           double, default: 1E-3
+                        The current bellow this value is not fitted. Units: mA
+        by:             str, default: 'file_id'
+                        The column defining the ramps, see FieldEmissionData.get_ramps()
+        split_key:      str, default: None
+                        The column at which direction changes the ramps are split, see FieldEmissionData.get_ramps()
+        work_function:  double, default: 4.5
+                        The work function of the electrodes, in eV
+        confidence:     double, default: 0.95
+                        The confidence level of the intervals
+
+        Returns
+        -------
+        fits:           dict of numpy.ndarray
+                        The results for each ramp:
+                        'start', 'end'              - the indices of the first and the last row of the ramp
+                        'n_points'                  - the number of points fitted
+                        'slope', 'intercept'        - the line fitted to ln(I/E^2) against 1/E, with I in A and E in V/m
+                        'beta'                      - the field enhancement factor
+                        'beta_low', 'beta_high'     - the confidence interval of beta
+                        'area'                      - the emission area, in m^2
+                        'area_low', 'area_high'     - the confidence interval of the area
+                        'R2'                        - the coefficient of determination
+                        The results of the ramps with less than 3 points or with a positive slope are NaN
+        """
+        if x_key not in ['true_field', 'field']:
+            raise ValueError(f'Invalid x_key {x_key} in fit_FN()')
+        separators = self.get_ramps(by, split_key)
+        n_ramps = separators.shape[0]
+        ramp = np.repeat(np.arange(n_ramps), separators[:, 1] - separators[:, 0] + 1)
+
+        field = self.df[x_key].to_numpy(dtype = float) * 1E6 # V/m
+        current = self.df['current'].to_numpy(dtype = float) * 1E-3 # A
+        with np.errstate(invalid = 'ignore'):
+            mask = (current > minI * 1E-3) & (field > 0)
+        x = 1.0 / field[mask]
+        y = np.log(current[mask] / field[mask]**2)
+        group = ramp[mask]
+
+        # the least squares of all the ramps, from the centered sums of each ramp
+        with np.errstate(invalid = 'ignore', divide = 'ignore'):
+            n = np.bincount(group, minlength = n_ramps).astype(float)
+            mean_x = np.bincount(group, weights = x, minlength = n_ramps) / n
+            mean_y = np.bincount(group, weights = y, minlength = n_ramps) / n
+            dx = x - mean_x[group]
+            dy = y - mean_y[group]
+            sxx = np.bincount(group, weights = dx * dx, minlength = n_ramps)
+            sxy = np.bincount(group, weights = dx * dy, minlength = n_ramps)
+            syy = np.bincount(group, weights = dy * dy, minlength = n_ramps)
+
+            slope = sxy / sxx
+            intercept = mean_y - slope * mean_x
+            sse = np.maximum(syy - slope * sxy, 0)
+            R2 = 1 - sse / syy
+            s2 = sse / (n - 2) # the variance of the residuals
+            var_slope = s2 / sxx
+            var_intercept = s2 * (1 / n + mean_x**2 / sxx)
+            cov = -mean_x * s2 / sxx
+            t = Utils.t_quantile(0.5 + confidence / 2, n - 2) * np.sqrt(var_slope)
+
+            valid = (n >= 3) & (slope < 0)
+            slope[~valid] = np.nan
+            intercept[~valid] = np.nan
+            R2[~valid] = np.nan
+            # beta is monotonic in the slope, its interval is given by the interval of the slope
+            B = FN_B * work_function**1.5
+            beta = -B / slope
+            beta_low = -B / (slope - t)
+            beta_high = np.where(slope + t < 0, -B / (slope + t), np.inf)
+            # ln(area) = intercept + 2 ln(-slope) + constant, its variance is propagated from the covariance of the fit
+            log_area = intercept + np.log(work_function / (FN_A * beta**2))
+            log_area_error = Utils.t_quantile(0.5 + confidence / 2, n - 2) * \
+                np.sqrt(var_intercept + 4 * var_slope / slope**2 + 4 * cov / slope)
+
+        results = {'beta': beta, 'beta_low': beta_low, 'beta_high': beta_high,
+            'area': np.exp(log_area), 'area_low': np.exp(log_area - log_area_error), 'area_high': np.exp(log_area + log_area_error)}
+        for array in results.values():
+            array[~valid] = np.nan # e.g. the upper limit of beta is infinite if the interval of the slope reaches 0
+        return {'start': separators[:, 0], 'end': separators[:, 1], 'n_points': n.astype(int), 'slope': slope, 'intercept': intercept, **results, 'R2': R2}
+
+    @staticmethod
+    def __grouped_median__(group, values, n_groups):
+        """
+        Returns the median of the values of each group, from one sort of all the values. NaN values are ignored
+        """
+        finite = np.isfinite(values)
+        group = group[finite]
+        order = np.lexsort((values[finite], group))
+        values = values[finite][order]
+        count = np.bincount(group, minlength = n_groups)
+        offset = np.concatenate([[0], np.cumsum(count)[:-1]])
+        median = np.full([n_groups], np.nan)
+        has_values = count > 0
+        lower = offset[has_values] + (count[has_values] - 1) // 2
+        upper = offset[has_values] + count[has_values] // 2
+        median[has_values] = (values[lower] + values[upper]) / 2
+        return median
+
     def calculate_derived_columns(self):
         """
-        (Re)calculates the derived columns: 'field', 'true_voltage', 'true_field'
+        (Re)calculates the derived columns: 'field', 'true_voltage', 'true_field'. A derived column is skipped if the columns needed for calculating it were not read
         """
-        self.df['field'] = (self.df.voltage / self.gap)
-        self.add_info_dict_entry('field', label = 'Electic Field', unit = 'MV/m')
+        if 'voltage' in self.df:
+            self.df['field'] = (self.df.voltage / self.gap)
+            self.add_info_dict_entry('field', label = 'Electic Field', unit = 'MV/m')
 
-        self.df['true_voltage'] = self.df.voltage - self.df.current * self.current_limiting_resistor * 1E-3
-        self.add_info_dict_entry('true_voltage', label = 'Electic Field', unit = 'MV/m')
+        if 'voltage' in self.df and 'current' in self.df:
+            self.df['true_voltage'] = self.df.voltage - self.df.current * self.current_limiting_resistor * 1E-3
+            self.add_info_dict_entry('true_voltage', label = 'Electic Field', unit = 'MV/m')
 
-        self.df['true_field'] = (self.df.true_voltage / self.gap)
-        self.add_info_dict_entry('true_field', label = 'Electic Field', unit = 'V')
+            self.df['true_field'] = (self.df.true_voltage / self.gap)
+            self.add_info_dict_entry('true_field', label = 'Electic Field', unit = 'V')
+        self.invalidate()
 
 
     @staticmethod
     def read_from_files(file_paths, header = None, delimiter = '\t', engine = 'c', skiprows = 1, info_dict = DEFAULT_FE_STRUCTURE, \
-        gap = 60, current_limiting_resistor = 0):
+        gap = 60, current_limiting_resistor = 0, cache = None, n_workers = 1, columns = None, compact = False):
         """
         Reads data from multiple files
 
@@ -140,15 +404,30 @@ class FieldEmissionData(Data):
                                             The length of the gap between the electrodes in um
         current_limiting_resistor:          double, default: 0
                                             The value of the current limiting resistor used in the measurements.
+        cache:          ParseCache, default: None
+                        If not None, the parsed files are loaded from (and stored in) this on-disk cache instead of being parsed every time
+        n_workers:      int, default: 1
+                        The number of files parsed at the same time. If 1, the files are parsed sequentially
+        columns:        str or list of str, default: None
+                        The keys of the columns to be read. Only these columns (and the ones needed for the requested derived columns) are parsed.
+                        If None, all the columns are read
+        compact:        bool, default: False
+                        If True, the columns are converted to the compact dtypes declared in the info_dict. See Data.read_from_files()
 
         Returns
         -------
         data:   FieldEmissionData
                 FieldEmissionData object corresponding to the data read from the file_paths
         """
-        data = Data.read_from_files(file_paths, header = header, delimiter = delimiter, engine = engine, skiprows = skiprows, info_dict = info_dict)
-        data.df.loc[:, 'timestamp'] = (data.df.loc[:, 'timestamp'] - LABVIEW_TIMESTAMP_OFFSET)
-        data.df.loc[:, 'voltage'] = data.df.voltage * 1000
+        data = Data.read_from_files(file_paths, header = header, delimiter = delimiter, engine = engine, skiprows = skiprows, info_dict = info_dict, cache = cache, \
+            n_workers = n_workers, columns = Data.__get_read_columns__(columns, DERIVED_COLUMNS), compact = compact)
+        if 'timestamp' in data.df:
+            data.df.loc[:, 'timestamp'] = (data.df.loc[:, 'timestamp'] - LABVIEW_TIMESTAMP_OFFSET)
+        if 'voltage' in data.df:
+            data.df.loc[:, 'voltage'] = data.df.voltage * 1000
         info_dict['voltage']['unit'] = 'V'
+        if 'set_voltage' in data.df:
+            data.df.loc[:, 'set_voltage'] = data.df.set_voltage * 1000
+            info_dict['set_voltage']['unit'] = 'V'
         FE_data = FieldEmissionData(data.df, info_dict, gap = gap, current_limiting_resistor = current_limiting_resistor)
         return FE_data
@@ -0,0 +1,481 @@
+import os
+import json
+import fnmatch
+import numpy as np
+
+from .Defaults import DEFAULT_TEMPERATURE_STRUCTURE, LABVIEW_TIMESTAMP_OFFSET
+
+DEFAULT_INDEX_FILENAME = '.sparkdc_index.json' # the default name of the sidecar file containing the index
+INDEX_VERSION = 2
+SEEK_TOLERANCE = 1E-3 # seconds, margin of the byte-offset search for the rounding of the parsed timestamps
+
+class FileIndex():
+    """
+    Persistent index of the data files from a folder, in which the rows are appended in time order (e.g. the CryoDC status files).
+    For each file it stores the first and the last timestamp, the number of rows, the size and the modification time.
+    The index is saved in a sidecar JSON file and it is updated incrementally: unchanged files are not read again,
+    while for files that grew only the appended bytes are read.
+
+    Parameters
+    ----------
+    folder_path:        str
+                        The folder containing the data files
+    pattern:            str, default: 'cryodc_*.dat'
+                        The shell-style pattern of the names of the data files
+    timestamp_col:      int, default: DEFAULT_TEMPERATURE_STRUCTURE['timestamp']['col']
+                        The column containing the timestamp
+    delimiter:          char, default: '\t'
+                        The delimiter used in the files. If None, the columns are separated by any whitespace
+    skiprows:           int, default: 0
+                        The number of rows at the start of the files which do not contain data
+    timestamp_offset:   double, default: LABVIEW_TIMESTAMP_OFFSET
+                        The offset subtracted from the timestamps in the files. The index stores unix timestamps
+    index_path:         str, default: None
+                        The path of the sidecar file. If None, the file '.sparkdc_index.json' from folder_path is used
+    """
+
+    def __init__(self, folder_path, pattern = 'cryodc_*.dat', timestamp_col = DEFAULT_TEMPERATURE_STRUCTURE['timestamp']['col'], delimiter = '\t', \
+        skiprows = 0, timestamp_offset = LABVIEW_TIMESTAMP_OFFSET, index_path = None):
+        self.folder_path = folder_path
+        self.pattern = pattern
+        self.timestamp_col = timestamp_col
+        self.delimiter = delimiter
+        self.skiprows = skiprows
+        self.timestamp_offset = timestamp_offset
+        self.index_path = index_path if index_path is not None else os.path.join(folder_path, DEFAULT_INDEX_FILENAME)
+        self.entries = {}
+        self.load()
+
+    def load(self):
+        """
+        Loads the index from the sidecar file. The index is left empty if the file does not exist or if it was made with different settings
+        """
+        self.entries = {}
+        if not os.path.isfile(self.index_path):
+            return
+        try:
+            with open(self.index_path, 'r') as file:
+                saved = json.load(file)
+        except (OSError, ValueError):
+            return
+        if saved.get('version') == INDEX_VERSION and saved.get('settings') == self.__settings__():
+            self.entries = saved['files']
+
+    def save(self):
+        """
+        Saves the index to the sidecar file
+        """
+        saved = {'version': INDEX_VERSION, 'settings': self.__settings__(), 'files': self.entries}
+        temp_path = self.index_path + '.tmp'
+        with open(temp_path, 'w') as file:
+            json.dump(saved, file)
+        os.replace(temp_path, self.index_path)
+
+    def update(self, save = True):
+        """
+        Updates the index with the files that were added, changed or removed since the last update
+
+        Parameters
+        ----------
+        save:           bool, default: True
+                        If True, the index is saved to the sidecar file if anything changed
+
+        Returns
+        -------
+        changed:        bool
+                        True if the index changed
+        """
+        changed = False
+        found = set()
+        for dir_entry in os.scandir(self.folder_path):
+            if not dir_entry.is_file() or not fnmatch.fnmatch(dir_entry.name, self.pattern):
+                continue
+            found.add(dir_entry.name)
+            stat = dir_entry.stat()
+            entry = self.entries.get(dir_entry.name)
+            if entry is not None and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+                continue # unchanged
+            self.entries[dir_entry.name] = self.__index_file__(dir_entry.path, stat, entry)
+            changed = True
+
+        for name in list(self.entries.keys()):
+            if name not in found: # the file was removed
+                del self.entries[name]
+                changed = True
+
+        if changed and save:
+            self.save()
+        return changed
+
+    def files_between_timestamps(self, timestamp_limits):
+        """
+        Returns the files which contain data in the inclusive range timestamp_limits[0], timestamp_limits[1]
+
+        Parameters
+        ----------
+        timestamp_limits:   list of double
+                            The unix timestamp limits
+
+        Returns
+        -------
+        file_paths:         list of str
+                            The full paths of the files, in ascending time order
+        """
+        names, first, last = self.__sorted_arrays__()
+        if len(names) == 0:
+            return []
+        # the files are sorted by their first timestamp, therefore all files after end start after the upper limit
+        end = np.searchsorted(first, timestamp_limits[1], side = 'right')
+        # the running maximum of the last timestamps is sorted, therefore all files before start end before the lower limit
+        start = np.searchsorted(np.maximum.accumulate(last), timestamp_limits[0], side = 'left')
+        selected = [i for i in range(start, end) if last[i] >= timestamp_limits[0]]
+        return [os.path.join(self.folder_path, names[i]) for i in selected]
+
+    def get_entry(self, file_path):
+        """
+        Returns the index entry of a file: {'size', 'mtime_ns', 'n_rows', 'first_timestamp', 'last_timestamp', ...}
+
+        Parameters
+        ----------
+        file_path:      str
+                        The path or the name of the file
+
+        Returns
+        -------
+        entry:          dict or None
+        """
+        return self.entries.get(os.path.basename(file_path))
+
+    def __sorted_arrays__(self):
+        """
+        Returns the names, the first and the last timestamps of the non-empty files, sorted by the first timestamp
+        """
+        items = [(entry['first_timestamp'], entry['last_timestamp'], name) for name, entry in self.entries.items() if entry['n_rows'] > 0]
+        items.sort()
+        names = [item[2] for item in items]
+        first = np.array([item[0] for item in items], dtype = float)
+        last = np.array([item[1] for item in items], dtype = float)
+        return names, first, last
+
+    def __settings__(self):
+        """
+        The settings which change the content of the index
+        """
+        return {'pattern': self.pattern, 'timestamp_col': self.timestamp_col, 'delimiter': self.delimiter, 'skiprows': self.skiprows, \
+            'timestamp_offset': self.timestamp_offset}
+
+    def __index_file__(self, file_path, stat, old_entry = None):
+        """
+        Makes the index entry of a file. If the file grew since old_entry was made, only the appended bytes are read
+
+        Parameters
+        ----------
+        file_path:      str
+        stat:           os.stat_result
+                        The stat of the file
+        old_entry:      dict, default: None
+                        The previous entry of the file
+
+        Returns
+        -------
+        entry:          dict
+        """
+        appended = old_entry is not None and stat.st_size > old_entry['size'] and old_entry['n_rows'] > 0
+
+        with open(file_path, 'rb') as file:
+            if appended: # count only the lines in the appended bytes
+                start = old_entry['size']
+                n_newlines = old_entry['n_newlines']
+                first_timestamp = old_entry['first_timestamp']
+            else:
+                start = 0
+                n_newlines = 0
+                first_line = read_line_at(file, skip_lines(file, 0, self.skiprows))
+                first_timestamp = self.__get_timestamp__(first_line)
+
+            n_newlines += count_newlines(file, start, stat.st_size)
+            # a last line which is still being written is not a row, the timestamp of the last complete row is used
+            last_line, last_is_row = read_last_row(file, stat.st_size, self.delimiter)
+            last_timestamp = self.__get_timestamp__(last_line)
+
+        n_rows = max(n_newlines + (1 if last_is_row else 0) - self.skiprows, 0)
+        if first_timestamp is None or last_timestamp is None:
+            n_rows = 0
+
+        return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'n_rows': n_rows, 'n_newlines': n_newlines, \
+            'first_timestamp': first_timestamp, 'last_timestamp': last_timestamp}
+
+    def __get_timestamp__(self, line):
+        """
+        Returns the unix timestamp from a line of the file, or None if the line does not contain a valid timestamp
+        """
+        value = get_field(line, self.timestamp_col, self.delimiter)
+        if value is None:
+            return None
+        return value - self.timestamp_offset
+
+READ_BLOCK_SIZE = 2**16
+
+def count_newlines(file, start, end):
+    """
+    Counts the newlines in a binary file between the byte offsets start and end
+
+    Parameters
+    ----------
+    file:           file object opened in binary mode
+    start:          int
+    end:            int
+
+    Returns
+    -------
+    n_newlines:     int
+    """
+    file.seek(start)
+    n_newlines = 0
+    position = start
+    while position < end:
+        block = file.read(min(READ_BLOCK_SIZE * 16, end - position))
+        if not block:
+            break
+        n_newlines += block.count(b'\n')
+        position += len(block)
+    return n_newlines
+
+def skip_lines(file, offset, n_lines):
+    """
+    Returns the byte offset of the start of the line found n_lines after the line starting at offset
+
+    Parameters
+    ----------
+    file:           file object opened in binary mode
+    offset:         int
+    n_lines:        int
+
+    Returns
+    -------
+    offset:         int
+    """
+    file.seek(offset)
+    for i in range(0, n_lines):
+        line = file.readline()
+        if not line:
+            break
+        offset += len(line)
+    return offset
+
+def read_line_at(file, offset):
+    """
+    Reads the line starting at a byte offset
+
+    Parameters
+    ----------
+    file:           file object opened in binary mode
+    offset:         int
+
+    Returns
+    -------
+    line:           bytes
+                    The line, without the trailing newline
+    """
+    file.seek(offset)
+    return file.readline().rstrip(b'\r\n')
+
+def read_last_line(file, size):
+    """
+    Reads the last non-empty line of a file
+
+    Parameters
+    ----------
+    file:           file object opened in binary mode
+    size:           int
+                    The size of the file, in bytes
+
+    Returns
+    -------
+    line:           bytes
+                    The last line, without the trailing newline
+    """
+    block_size = READ_BLOCK_SIZE
+    while True:
+        start = max(0, size - block_size)
+        file.seek(start)
+        block = file.read(size - start).rstrip(b'\r\n')
+        newline = block.rfind(b'\n')
+        if newline >= 0 or start == 0:
+            return block[newline+1:]
+        block_size *= 2 # the last line is longer than the block, read a larger block
+
+def read_last_row(file, size, delimiter = '\t'):
+    """
+    Reads the last complete row of a file. A last line without a newline at the end (e.g. in a file still being written) is a complete row
+    only if it has at least as many columns as the line before it, otherwise the line before it is returned
+
+    Parameters
+    ----------
+    file:           file object opened in binary mode
+    size:           int
+                    The size of the file, in bytes
+    delimiter:      char, default: '\t'
+                    If None, the columns are separated by any whitespace
+
+    Returns
+    -------
+    line:           bytes
+                    The last complete row, without the trailing newline
+    last_is_row:    bool
+                    True if the last line does not end with a newline and it is a complete row
+    """
+    file.seek(max(size - 1, 0))
+    if size == 0 or file.read(1) == b'\n':
+        return read_last_line(file, size), False
+
+    line = read_last_line(file, size)
+    line_start = size - len(line)
+    while line_start > 0: # step back over the stripped '\r' characters, if any
+        file.seek(line_start - 1)
+        if file.read(1) == b'\n':
+            break
+        line_start -= 1
+    if line_start == 0: # a single line, it cannot be compared
+        return line, True
+    previous = read_last_line(file, line_start)
+    if len(split_fields(line, delimiter)) >= len(split_fields(previous, delimiter)):
+        return line, True
+    return previous, False
+
+def split_fields(line, delimiter = '\t'):
+    """
+    Splits a line in its columns
+
+    Parameters
+    ----------
+    line:           bytes
+    delimiter:      char, default: '\t'
+                    If None, the columns are separated by any whitespace
+
+    Returns
+    -------
+    fields:         list of bytes
+    """
+    return line.split(delimiter.encode()) if delimiter is not None else line.split()
+
+def get_field(line, col, delimiter = '\t'):
+    """
+    Returns the float value found at a column of a line
+
+    Parameters
+    ----------
+    line:           bytes
+    col:            int
+    delimiter:      char, default: '\t'
+                    If None, the columns are separated by any whitespace
+
+    Returns
+    -------
+    value:          double or None
+                    None if the column is not found or is not a number
+    """
+    fields = split_fields(line, delimiter)
+    if col >= len(fields):
+        return None
+    try:
+        return float(fields[col])
+    except ValueError:
+        return None
+
+def next_line_start(file, offset):
+    """
+    Returns the byte offset of the first line starting at or after offset
+
+    Parameters
+    ----------
+    file:           file object opened in binary mode
+    offset:         int
+
+    Returns
+    -------
+    offset:         int
+    """
+    if offset == 0:
+        return 0
+    file.seek(offset - 1)
+    if file.read(1) == b'\n':
+        return offset
+    return offset + len(file.readline())
+
+def seek_timestamp(file, timestamp, col, delimiter = '\t', data_start = 0, size = None, side = 'left', timestamp_offset = 0):
+    """
+    Binary searches the byte offset of the first line with a timestamp >= timestamp (side = 'left') or > timestamp (side = 'right').
+    The lines of the file must be sorted by their timestamp. Lines without a valid timestamp are treated as being at the end of the file.
+    Only O(log(size)) lines are read
+
+    Parameters
+    ----------
+    file:           file object opened in binary mode
+    timestamp:      double
+                    The timestamp searched
+    col:            int
+                    The column containing the timestamp
+    delimiter:      char, default: '\t'
+                    If None, the columns are separated by any whitespace
+    data_start:     int, default: 0
+                    The byte offset of the first data line
+    size:           int, default: None
+                    The size of the file, in bytes. If None, it is obtained from the file
+    side:           {'left', 'right'}, default: 'left'
+    timestamp_offset:   double, default: 0
+                    The offset subtracted from the timestamps in the file before comparing them with timestamp
+
+    Returns
+    -------
+    offset:         int
+                    The byte offset of the start of the line found, or size if all lines are before timestamp
+    """
+    if size is None:
+        file.seek(0, os.SEEK_END)
+        size = file.tell()
+
+    low = data_start # always the start of a line
+    high = size      # always the start of a line or the end of the file
+    while low < high:
+        middle = next_line_start(file, (low + high) // 2)
+        if middle >= high: # no line starts in the upper half, search the line starting at low
+            middle = low
+        value = get_field(read_line_at(file, middle), col, delimiter)
+        if value is not None:
+            value = value - timestamp_offset
+        if value is not None and (value < timestamp or (side == 'right' and value == timestamp)):
+            low = next_line_start(file, middle + 1)
+        else:
+            high = middle
+    return low
+
+def timestamp_byte_range(file_path, timestamp_limits, col, delimiter = '\t', skiprows = 0, timestamp_offset = 0):
+    """
+    Returns the byte offsets of the lines of a file with a timestamp in the inclusive range timestamp_limits[0], timestamp_limits[1]
+
+    Parameters
+    ----------
+    file_path:          str
+    timestamp_limits:   list of double
+                        The timestamp limits
+    col:                int
+                        The column containing the timestamp
+    delimiter:          char, default: '\t'
+                        If None, the columns are separated by any whitespace
+    skiprows:           int, default: 0
+                        The number of rows at the start of the file which do not contain data
+    timestamp_offset:   double, default: 0
+                        The offset subtracted from the timestamps in the file before comparing them with timestamp_limits
+
+    Returns
+    -------
+    byte_range:         (int, int)
+                        The start and the end offset. They are equal if no line is found in the range
+    """
+    with open(file_path, 'rb') as file:
+        size = os.fstat(file.fileno()).st_size
+        data_start = skip_lines(file, 0, skiprows)
+        start = seek_timestamp(file, timestamp_limits[0], col, delimiter, data_start, size, side = 'left', timestamp_offset = timestamp_offset)
+        end = seek_timestamp(file, timestamp_limits[1], col, delimiter, start, size, side = 'right', timestamp_offset = timestamp_offset)
+    return start, end
@@ -0,0 +1,351 @@
+import os
+import fnmatch
+import numpy as np
+import pandas as pd
+
+from .Defaults import DEFAULT_TEMPERATURE_STRUCTURE, LABVIEW_TIMESTAMP_OFFSET
+from . import Data
+from . import Utils
+from .StatusData import StatusData
+
+INITIAL_CAPACITY = 1024 # the initial number of rows of a ColumnBuffer
+
+class TailReader():
+    """
+    Reads the lines appended to a growing text file since the previous read.
+    The reader remembers the byte offset of the first line not yet returned, such that each read costs only the new bytes.
+    A partial last line (still being written) is not returned until it is completed by a newline.
+
+    Parameters
+    ----------
+    file_path:      str
+                    The file to be followed
+    skiprows:       int, default: 0
+                    The number of rows at the start of the file which do not contain data. They are not returned
+    """
+
+    def __init__(self, file_path, skiprows = 0):
+        self.file_path = file_path
+        self.skiprows = skiprows
+        self.offset = 0     # the byte offset of the first line not yet returned
+        self.n_skipped = 0  # the number of rows skipped so far
+
+    def read(self, final = False):
+        """
+        Returns the complete lines appended since the previous read
+
+        Parameters
+        ----------
+        final:          bool, default: False
+                        If True, a partial last line is also returned. Use it when the file is not written anymore
+
+        Returns
+        -------
+        data_bytes:     bytes
+                        The new lines. Empty if no new complete line was found
+        """
+        size = os.path.getsize(self.file_path)
+        if size < self.offset: # the file was truncated or replaced, read it again from the start
+            self.offset = 0
+            self.n_skipped = 0
+
+        with open(self.file_path, 'rb') as file:
+            file.seek(self.offset)
+            data_bytes = file.read(size - self.offset)
+        if not final:
+            data_bytes = data_bytes[:data_bytes.rfind(b'\n') + 1] # keep only the complete lines
+        self.offset += len(data_bytes)
+
+        while self.n_skipped < self.skiprows and len(data_bytes) > 0: # skip the header rows
+            newline = data_bytes.find(b'\n')
+            data_bytes = data_bytes[newline + 1:] if newline >= 0 else b''
+            self.n_skipped += 1
+        return data_bytes
+
+class ColumnBuffer():
+    """
+    In-memory buffer of data columns, to which rows can be appended in amortized O(new rows).
+    Each column is stored in a numpy array whose capacity is doubled when it is full.
+
+    Parameters
+    ----------
+    capacity:       int, default: 1024
+                    The initial number of rows of the arrays
+    """
+
+    def __init__(self, capacity = INITIAL_CAPACITY):
+        self.capacity = capacity
+        self.n_rows = 0
+        self.columns = {}
+
+    def __len__(self):
+        return self.n_rows
+
+    def append(self, df):
+        """
+        Appends the rows of a data frame. Columns missing from df are filled with NaN
+
+        Parameters
+        ----------
+        df:             pandas.core.frame.DataFrame
+                        The new rows. Only numeric and bool columns are supported
+        """
+        n_new = df.shape[0]
+        n_total = self.n_rows + n_new
+        if n_total > self.capacity: # grow all the arrays
+            self.capacity = max(2 * self.capacity, n_total)
+            for key, array in self.columns.items():
+                new_array = np.empty([self.capacity], dtype = array.dtype)
+                new_array[:self.n_rows] = array[:self.n_rows]
+                self.columns[key] = new_array
+
+        for key in df.columns:
+            values = df[key].to_numpy()
+            if key not in self.columns and self.n_rows == 0:
+                self.columns[key] = np.empty([self.capacity], dtype = values.dtype)
+            elif key not in self.columns: # a new column, the previous rows are NaN
+                self.columns[key] = np.full([self.capacity], np.nan, dtype = np.result_type(values.dtype, float))
+            elif not np.can_cast(values.dtype, self.columns[key].dtype, casting = 'safe'):
+                self.columns[key] = self.columns[key].astype(np.result_type(values.dtype, self.columns[key].dtype))
+            self.columns[key][self.n_rows:n_total] = values
+
+        for key in self.columns.keys() - set(df.columns):
+            if n_new == 0:
+                break
+            if not np.can_cast(float, self.columns[key].dtype, casting = 'same_kind'):
+                self.columns[key] = self.columns[key].astype(float)
+            self.columns[key][self.n_rows:n_total] = np.nan
+        self.n_rows = n_total
+
+    def frame(self):
+        """
+        Returns the buffered rows as a data frame. The columns are views of the buffer arrays, no data is copied
+
+        Returns
+        -------
+        df:             pandas.core.frame.DataFrame
+        """
+        return pd.DataFrame({key: array[:self.n_rows] for key, array in self.columns.items()}, copy = False)
+
+    def clear(self):
+        """
+        Removes all rows from the buffer
+        """
+        self.n_rows = 0
+        self.columns = {}
+
+class Follower():
+    """
+    Follows data files while they are written: each refresh() parses only the complete lines appended since the previous refresh
+    and appends them to an in-memory buffer.
+    When a new file appears (rollover), the rest of the previous file is read and the new file is followed.
+    The additive columns continue across the files, as in Data.read_from_files().
+    Subclasses define the files to be followed in find_files().
+
+    Parameters
+    ----------
+    delimiter:      char, default: '\t'
+                    The delimiter used in the files
+    engine:         str, default: 'c'
+                    Parser engine to use
+    skiprows:       int, default: 0
+                    Skips the first N rows of each file
+    info_dict:      dict, default: DEFAULT_TEMPERATURE_STRUCTURE
+                    The info_dict of the files
+    columns:        str or list of str, default: None
+                    The keys of the columns to be read. If None, all the columns are read
+    """
+
+    def __init__(self, delimiter = '\t', engine = 'c', skiprows = 0, info_dict = DEFAULT_TEMPERATURE_STRUCTURE, columns = None):
+        Data.__check_and_fill_info_dict__(info_dict)
+        self.delimiter = delimiter
+        self.engine = engine
+        self.skiprows = skiprows
+        self.info_dict = info_dict
+        self.read_dict = Data.__select_columns__(info_dict, columns)
+        self.additive_columns = Utils.get_concatenation_type_columns(self.read_dict, 'additive')
+
+        self.file_paths = []    # the files followed so far, in order
+        self.n_points = []      # the number of rows read from each file
+        self.reader = None      # the TailReader of the current file
+        self.buffer = ColumnBuffer()
+        self.offsets = {key: 0 for key in self.additive_columns}      # the offsets added to the additive columns of the current file
+        self.last_values = {key: 0 for key in self.additive_columns}  # the last values of the additive columns in the current file
+
+    def find_files(self):
+        """
+        Returns the files to be followed, in order. Only the files after the current one are used
+
+        Returns
+        -------
+        file_paths:     list of str
+        """
+        return list(self.file_paths)
+
+    def refresh(self):
+        """
+        Reads the lines appended since the previous refresh, including the lines from new files, and appends them to the buffer
+
+        Returns
+        -------
+        new_data:       Data
+                        The new rows
+        """
+        files = self.find_files()
+        if self.reader is None:
+            new_files = files[-1:] # start with the newest file
+        else:
+            paths = [os.path.abspath(file_path) for file_path in files]
+            current = os.path.abspath(self.reader.file_path)
+            new_files = files[paths.index(current) + 1:] if current in paths else []
+
+        dfs = []
+        if self.reader is not None:
+            dfs.append(self.__read_chunk__(self.reader.read(final = len(new_files) > 0)))
+        for i, file_path in enumerate(new_files): # rollover, all but the last of the new files are complete
+            self.__open_file__(file_path)
+            dfs.append(self.__read_chunk__(self.reader.read(final = i < len(new_files) - 1)))
+
+        # files can have less columns than the info_dict, the columns of the empty chunks are not known
+        dfs = [df for df in dfs if df.shape[0] > 0]
+        if len(dfs) == 0:
+            return self.__make_data__(self.__empty_frame__())
+        new_df = pd.concat(dfs, axis = 0, ignore_index = True)
+        self.__postprocess__(new_df)
+        self.buffer.append(new_df)
+        return self.__make_data__(new_df)
+
+    @property
+    def data(self):
+        """
+        All the rows read so far. The data frame shares the memory with the buffer, it should not be modified in place
+        """
+        if len(self.buffer) == 0:
+            return self.__make_data__(self.__empty_frame__())
+        return self.__make_data__(self.buffer.frame())
+
+    @property
+    def file_separators(self):
+        """
+        The indices corresponding to the start and end of each file in the buffer, obtained from the number of rows read from each file.
+        Same format as Data.file_separators
+
+        Returns
+        -------
+        file_separators: numpy.ndarray
+        """
+        n_points = np.array(self.n_points, dtype = int)
+        ends = np.cumsum(n_points)
+        file_separators = np.stack([ends - n_points, ends - 1], axis = 1).reshape(-1, 2)
+        return file_separators[n_points > 0]
+
+    def __open_file__(self, file_path):
+        """
+        Starts following a new file. The additive columns of the new file continue from the previous file
+        """
+        if self.reader is not None:
+            for key in self.additive_columns:
+                self.offsets[key] += self.last_values[key]
+                self.last_values[key] = 0
+        self.file_paths.append(file_path)
+        self.n_points.append(0)
+        self.reader = TailReader(file_path, skiprows = self.skiprows)
+
+    def __read_chunk__(self, data_bytes):
+        """
+        Parses new lines of the current file and applies the additive offsets
+        """
+        df = Data.__read_bytes__(data_bytes, delimiter = self.delimiter, engine = self.engine, info_dict = self.read_dict)
+        if df.shape[0] > 0:
+            for key in self.additive_columns:
+                if key in df:
+                    values = df[key].to_numpy()
+                    self.last_values[key] = values[-1]
+                    df[key] = values + self.offsets[key]
+        df['file_id'] = np.full([df.shape[0]], max(len(self.file_paths) - 1, 0), dtype = int)
+        if len(self.n_points) > 0:
+            self.n_points[-1] += df.shape[0]
+        return df
+
+    def __empty_frame__(self):
+        """
+        Returns a data frame without rows, containing all the columns from the info_dict
+        """
+        df = Data.__read_bytes__(b'', info_dict = self.read_dict)
+        df['file_id'] = np.empty([0], dtype = int)
+        self.__postprocess__(df)
+        return df
+
+    def __postprocess__(self, df):
+        """
+        Converts the new rows (in place) before they are appended to the buffer
+        """
+        pass
+
+    def __make_data__(self, df):
+        """
+        Makes the Data object corresponding to a data frame from the buffer, adding the 'file' column
+        """
+        df.insert(df.columns.get_loc('file_id'), 'file', pd.Categorical.from_codes(df['file_id'].to_numpy(), categories = self.file_paths))
+        return Data(df, self.info_dict)
+
+class StatusFollower(Follower):
+    """
+    Follows the CryoDC status files of a folder while LabVIEW writes them.
+    Each refresh() costs only the bytes appended since the previous one. When LabVIEW starts a new file, the follower switches to it.
+
+    Parameters
+    ----------
+    folder_path:    str
+                    The folder containing the CryoDC status files
+    file_path:      str, default: None
+                    The first file to be followed. If None, the newest file from the folder is followed
+    pattern:        str, default: 'cryodc_*.dat'
+                    The shell-style pattern of the names of the status files
+    delimiter:      char, default: '\t'
+                    The delimiter used in the files
+    engine:         str, default: 'c'
+                    Parser engine to use
+    skiprows:       int, default: 0
+                    Skips the first N rows of each file
+    info_dict:      dict, default: DEFAULT_TEMPERATURE_STRUCTURE
+                    The info_dict of the files
+    columns:        str or list of str, default: None
+                    The keys of the columns to be read. If None, all the columns are read
+
+    Example
+    -------
+    follower = StatusFollower(folder_path)
+    new_data = follower.refresh() # call periodically, new_data contains only the new rows
+    status_data = follower.data   # all the rows read so far
+    """
+
+    def __init__(self, folder_path, file_path = None, pattern = 'cryodc_*.dat', delimiter = '\t', engine = 'c', skiprows = 0, \
+        info_dict = DEFAULT_TEMPERATURE_STRUCTURE, columns = None):
+        super().__init__(delimiter = delimiter, engine = engine, skiprows = skiprows, info_dict = info_dict, columns = columns)
+        self.folder_path = folder_path
+        self.pattern = pattern
+        if file_path is not None:
+            self.__open_file__(file_path)
+
+    def find_files(self):
+        """
+        Returns the status files from the folder, sorted by name (i.e. by the datetime in their names)
+
+        Returns
+        -------
+        file_paths:     list of str
+        """
+        files = sorted(file for file in os.listdir(self.folder_path) if fnmatch.fnmatch(file, self.pattern))
+        return [os.path.join(self.folder_path, file) for file in files]
+
+    def __postprocess__(self, df):
+        """
+        Converts the LabVIEW timestamps to unix timestamps
+        """
+        if 'timestamp' in df:
+            df['timestamp'] = df['timestamp'] - LABVIEW_TIMESTAMP_OFFSET
+
+    def __make_data__(self, df):
+        data = super().__make_data__(df)
+        return StatusData(data.df, data.info_dict)
@@ -0,0 +1,165 @@
+import os
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+
+DEFAULT_CACHE_SIZE = 2**30 # default size budget of the cache: 1 GiB
+
+class ParseCache():
+    """
+    On-disk cache of parsed data files. Each parsed file is stored as a binary .npz file (one array per column).
+    An entry is keyed by the absolute path of the file and by the schema used to parse it (the info_dict columns and the reading options).
+    The size and modification time of the file are stored in the entry, such that entries for files that changed on disk are invalidated.
+    When the total size of the cache exceeds max_size, the least recently used entries are evicted.
+
+    Parameters
+    ----------
+    cache_dir:      str
+                    The folder where the cache entries are stored. It is created if it does not exist
+    max_size:       int, default: 2**30 (1 GiB)
+                    The size budget of the cache, in bytes
+    """
+
+    def __init__(self, cache_dir, max_size = DEFAULT_CACHE_SIZE):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        os.makedirs(cache_dir, exist_ok = True)
+
+    def get(self, file_path, schema):
+        """
+        Loads the parsed data of a file from the cache
+
+        Parameters
+        ----------
+        file_path:      str
+                        The path of the data file
+        schema:         dict
+                        The schema used to parse the file. See ParseCache.make_schema()
+
+        Returns
+        -------
+        df:             pandas.core.frame.DataFrame or None
+                        The cached data frame. None if the file is not in the cache or if the entry is stale
+        """
+        entry_path = self.__entry_path__(file_path, schema)
+        if not os.path.isfile(entry_path):
+            return None
+
+        try:
+            with np.load(entry_path, allow_pickle = False) as entry:
+                stat = os.stat(file_path)
+                if entry['__size__'] != stat.st_size or entry['__mtime_ns__'] != stat.st_mtime_ns: # the file changed since it was cached
+                    stale = True
+                else:
+                    stale = False
+                    columns = entry['__columns__'].tolist()
+                    df = pd.DataFrame({key: entry[f'col_{i}'] for i, key in enumerate(columns)})
+        except (OSError, ValueError, KeyError): # corrupted or incomplete entry
+            stale = True
+
+        if stale:
+            self.__remove__(entry_path)
+            return None
+
+        os.utime(entry_path) # mark the entry as recently used
+        return df
+
+    def put(self, file_path, schema, df):
+        """
+        Stores the parsed data of a file in the cache. Data frames containing non-numeric columns are not cached.
+
+        Parameters
+        ----------
+        file_path:      str
+                        The path of the data file
+        schema:         dict
+                        The schema used to parse the file. See ParseCache.make_schema()
+        df:             pandas.core.frame.DataFrame
+                        The parsed data
+        """
+        if any(df.dtypes == object):
+            return
+
+        stat = os.stat(file_path)
+        arrays = {f'col_{i}': df[key].to_numpy() for i, key in enumerate(df.columns)}
+        arrays['__columns__'] = np.array(df.columns, dtype = str)
+        arrays['__size__'] = np.array(stat.st_size)
+        arrays['__mtime_ns__'] = np.array(stat.st_mtime_ns)
+
+        entry_path = self.__entry_path__(file_path, schema)
+        temp_path = entry_path + '.tmp'
+        with open(temp_path, 'wb') as file: # write to a temporary file first, such that readers never see a partial entry
+            np.savez(file, **arrays)
+        os.replace(temp_path, entry_path)
+
+        self.evict()
+
+    def evict(self):
+        """
+        Removes the least recently used entries until the total size of the cache is within max_size
+        """
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.npz') and entry.is_file():
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total_size = sum(entry[1] for entry in entries)
+        entries.sort() # oldest first
+        for mtime, size, path in entries:
+            if total_size <= self.max_size:
+                break
+            self.__remove__(path)
+            total_size -= size
+
+    def clear(self):
+        """
+        Removes all entries from the cache
+        """
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith('.npz'):
+                self.__remove__(entry.path)
+
+    @property
+    def size(self):
+        """
+        The total size of the cache entries, in bytes
+        """
+        return sum(entry.stat().st_size for entry in os.scandir(self.cache_dir) if entry.name.endswith('.npz'))
+
+    @staticmethod
+    def make_schema(info_dict, **read_options):
+        """
+        Makes the schema used to key the cache entries
+
+        Parameters
+        ----------
+        info_dict:      dict
+                        The info_dict used for reading the file. Only the keys and the columns are used
+        **read_options: The options passed to the parser, which change the parsed data (header, delimiter, skiprows...)
+
+        Returns
+        -------
+        schema:         dict
+        """
+        columns = [[key, subdict['col']] for key, subdict in info_dict.items()]
+        return {'columns': columns, 'options': read_options}
+
+    def __entry_path__(self, file_path, schema):
+        """
+        Returns the path of the cache entry for a file and a schema
+        """
+        key = json.dumps([os.path.abspath(file_path), schema], sort_keys = True, default = str)
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f'{digest}.npz')
+
+    @staticmethod
+    def __remove__(path):
+        """
+        Removes a cache entry, ignoring entries that were already removed
+        """
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -11,6 +11,12 @@ from . import Utils
 
 TORR_TO_MBAR = 1.33322368
 
+# the columns needed for calculating each derived column
+DERIVED_COLUMNS = {
+    'pressure_mbar':    ['pressure_torr'],
+    'timestamp':        ['rel_time'],
+}
+
 class RGAData(Data):
     """
     StatusData Class for SparkDC Data
@@ -52,14 +58,17 @@ class RGAData(Data):
 
     def calculate_derived_columns(self):
         """
-        (Re)calculates the derived columns: 'pressure_mbar'
+        (Re)calculates the derived columns: 'pressure_mbar'. The column is skipped if 'pressure_torr' was not read
         """
+        if 'pressure_torr' not in self.df:
+            return
         recalculate = 'pressure_mbar' in self.df
         if recalculate:
             self.df.loc[:, 'pressure_mbar'] = (self.df['pressure_torr'] * TORR_TO_MBAR)
         else:
             self.df['pressure_mbar'] = (self.df['pressure_torr'] * TORR_TO_MBAR)
             self.add_info_dict_entry('pressure_mbar', label = 'Pressure', unit = 'mbar')
+        self.invalidate()
 
     def plot_masses(self, masses, key = 'pressure_mbar', x_key = 'timestamp', datetime_plot = True, date_format = "%m-%d %H:%M:%S", timezone = 'Europe/Stockholm', \
     ax_id = None, fplot = None, figsize = (13, 8), fontsize = 12, fontweight = 'normal', linestyle = '-', linewidth = 2, \
@@ -132,7 +141,8 @@ class RGAData(Data):
         return -1
 
     @staticmethod
-    def read_from_file(filename, header = None, delimiter = ',', skiprows = 22, engine ='c', info_dict = DEFAULT_RGA_STRUCTURE, timezone = "Europe/Stockholm"):
+    def read_from_file(filename, header = None, delimiter = ',', skiprows = 22, engine ='c', info_dict = DEFAULT_RGA_STRUCTURE, timezone = "Europe/Stockholm", \
+        columns = None):
         """
         Reads data from a single file
 
@@ -152,6 +162,9 @@ class RGAData(Data):
                         Parser engine to use. The C and pyarrow engines are faster, while the python engine is currently more feature-complete. Multithreading is currently only supported by the pyarrow engine.
         skiprows:       int, default: 22
                         Skips the first N rows when reading the file
+        columns:        str or list of str, default: None
+                        The keys of the columns to be read. Only these columns (and the ones needed for the requested derived columns) are parsed.
+                        If None, all the columns are read
 
         Returns
         -------
@@ -174,9 +187,11 @@ class RGAData(Data):
                 break
             count += 1
         file.close()
-        data = Data.read_from_files([filename], header = header, delimiter = delimiter, engine = engine, skiprows = skiprows, info_dict = info_dict)
-        data.df['timestamp'] = (data.df['rel_time'] / 1000.0 + timestamp) #make the timestamp
-        data.add_info_dict_entry('timestamp', label = 'Timestamp', unit = 's')
+        data = Data.read_from_files([filename], header = header, delimiter = delimiter, engine = engine, skiprows = skiprows, info_dict = info_dict, \
+            columns = Data.__get_read_columns__(columns, DERIVED_COLUMNS))
+        if 'rel_time' in data.df:
+            data.df['timestamp'] = (data.df['rel_time'] / 1000.0 + timestamp) #make the timestamp
+            data.add_info_dict_entry('timestamp', label = 'Timestamp', unit = 's')
 
         rga_data = RGAData(data.df, data.info_dict)
         return rga_data
@@ -0,0 +1,264 @@
+import os
+import json
+import hashlib
+import contextlib
+import concurrent.futures
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_pdf import PdfPages
+
+from .ConditioningData import ConditioningData
+from .StatusData import StatusData
+from .FieldEmissionData import FieldEmissionData
+from .RGAData import RGAData
+
+# the readers which can be used in the report specs
+READERS = {
+    'conditioning_runs':    ConditioningData.read_runs,
+    'conditioning_files':   ConditioningData.read_from_files,
+    'status_files':         StatusData.read_from_files,
+    'status_timestamps':    StatusData.read_from_folder_between_timestamps,
+    'status_datetimes':     StatusData.read_from_folder_between_datetimes,
+    'status_aggregated':    StatusData.read_aggregated_between_timestamps,
+    'fe_files':             FieldEmissionData.read_from_files,
+    'rga_file':             RGAData.read_from_file,
+}
+REPORT_SUFFIX = '.sparkdc.json' # the suffix of the sidecar file storing the hash of the last render of an output
+REPORT_VERSION = 1
+MULTIPAGE_FORMATS = ['.pdf']
+
+def render_reports(specs, n_workers = 1, force = False):
+    """
+    Renders a list of reports on the non-interactive Agg backend. The reports are rendered in parallel if n_workers > 1.
+    A report is skipped if its spec and its input files did not change since it was last rendered
+
+    Parameters
+    ----------
+    specs:          list of dict
+                    The report specs, see render_report()
+    n_workers:      int, default: 1
+                    The number of processes rendering the reports. If 1, the reports are rendered sequentially in the current process
+    force:          bool, default: False
+                    If True, all the reports are rendered, even if they did not change
+
+    Returns
+    -------
+    results:        list of tuple
+                    (output, status) for each report, status in ['rendered'|'skipped']
+    """
+    if n_workers > 1 and len(specs) > 1:
+        with concurrent.futures.ProcessPoolExecutor(max_workers = n_workers, initializer = __init_worker__) as pool:
+            return list(pool.map(render_report, specs, [force] * len(specs)))
+    return [render_report(spec, force = force) for spec in specs]
+
+def render_report(spec, force = False):
+    """
+    Renders a report: reads the data and makes the figures described by the spec, then saves them to the output file.
+    The figures are rendered on the non-interactive Agg backend, the backend of the caller is restored afterwards.
+    The hash of the spec and of the input files is stored in a sidecar file next to the output (output + '.sparkdc.json'),
+    the report is not rendered again until the hash changes
+
+    Parameters
+    ----------
+    spec:           dict
+                    The report spec:
+                    'output':   str, the output file. The format is given by the extension (e.g. '.png', '.svg', '.pdf').
+                                A '.pdf' output contains one page per figure, the other formats require a single figure
+                    'figures':  list of dict, the figure specs. If not present, the report spec itself is the spec of a single figure
+                    Each figure spec contains:
+                    'reader':       str, the name of the reader from READERS (e.g. 'conditioning_runs')
+                    'read_args':    dict, the arguments of the reader
+                    'plot':         str, the plotting method of the data object (e.g. 'plot_standard', 'plot', 'plot_IV')
+                    'plot_args':    dict, default: {}, the arguments of the plotting method
+                    'calls':        list of dict, default: [], the FancyPlot methods called after plotting, as {'method', 'args', 'kwargs'}
+                    'inputs':       list of str, default: None, the files and folders whose changes trigger a new render.
+                                    If None, the files read by the reader are used: the Marx_data.txt files of the runs, the status files
+                                    which can contain the time range or the existing files found in read_args. It is required if the reader
+                                    reads from a folder and its files cannot be found otherwise
+                    'savefig_args': dict, default: {}, the arguments of FancyPlot.savefig() (e.g. {'dpi': 150, 'rasterize_threshold': 5000})
+    force:          bool, default: False
+                    If True, the report is rendered even if it did not change
+
+    Returns
+    -------
+    output:         str
+    status:         ['rendered'|'skipped']
+
+    Example
+    -------
+    spec = {'output': 'reports/066_RFQ_Nb_rm1.png', 'reader': 'conditioning_runs', 'plot': 'plot_standard',
+            'read_args': {'data_folder': './Example Data', 'electrode': '066_RFQ_Nb_rm1', 'runs': list(range(1, 11))},
+            'plot_args': {'plot_third_axis': True}}
+    render_reports([spec, ...], n_workers = 4)
+    """
+    output = spec['output']
+    figure_specs = spec['figures'] if 'figures' in spec else [spec]
+    extension = os.path.splitext(output)[1].lower()
+    if len(figure_specs) != 1 and extension not in MULTIPAGE_FORMATS:
+        raise ValueError(f"The output {output} can contain a single figure. Use one of {MULTIPAGE_FORMATS} for multiple figures")
+
+    report_hash = get_report_hash(spec)
+    sidecar_path = output + REPORT_SUFFIX
+    if not force and os.path.isfile(output) and __read_sidecar__(sidecar_path) == report_hash:
+        return output, 'skipped'
+
+    output_folder = os.path.dirname(output)
+    if output_folder != '':
+        os.makedirs(output_folder, exist_ok = True)
+    with __agg_backend__():
+        if extension in MULTIPAGE_FORMATS:
+            with PdfPages(output) as pdf:
+                for figure_spec in figure_specs:
+                    fplot = __make_figure__(figure_spec)
+                    fplot.savefig(pdf, **figure_spec.get('savefig_args', {}))
+                    plt.close(fplot.fig)
+        else:
+            fplot = __make_figure__(figure_specs[0])
+            fplot.savefig(output, **figure_specs[0].get('savefig_args', {}))
+            plt.close(fplot.fig)
+
+    temp_path = sidecar_path + '.tmp'
+    with open(temp_path, 'w') as file:
+        json.dump({'version': REPORT_VERSION, 'hash': report_hash}, file)
+    os.replace(temp_path, sidecar_path)
+    return output, 'rendered'
+
+def get_report_hash(spec):
+    """
+    Returns the hash of a report spec and of the size and modification time of its input files
+
+    Parameters
+    ----------
+    spec:           dict
+                    The report spec, see render_report()
+
+    Returns
+    -------
+    report_hash:    str
+    """
+    figure_specs = spec['figures'] if 'figures' in spec else [spec]
+    digest = hashlib.sha256()
+    digest.update(json.dumps(spec, sort_keys = True, default = str).encode())
+    for figure_spec in figure_specs:
+        for path in get_input_paths(figure_spec):
+            for file_path, stat in __walk_files__(path):
+                digest.update(f'{file_path}\t{stat.st_size}\t{stat.st_mtime_ns}\n'.encode())
+    return digest.hexdigest()
+
+def get_input_paths(figure_spec):
+    """
+    Returns the input files and folders of a figure spec: the 'inputs' of the spec or, if not given, the files read by its reader.
+    The files of the readers from INPUT_RESOLVERS are found from the read_args (e.g. the runs), for the other readers the existing files
+    found in read_args are used
+
+    Parameters
+    ----------
+    figure_spec:    dict
+
+    Returns
+    -------
+    paths:          list of str
+    """
+    if figure_spec.get('inputs') is not None:
+        return list(figure_spec['inputs'])
+    read_args = figure_spec.get('read_args', {})
+    resolver = INPUT_RESOLVERS.get(figure_spec['reader'])
+    paths = resolver(read_args) if resolver is not None else None
+    if paths is not None:
+        return paths
+
+    paths = []
+    for value in read_args.values():
+        values = value if isinstance(value, (list, tuple)) else [value]
+        paths += [item for item in values if isinstance(item, str) and os.path.exists(item)]
+    folders = [path for path in paths if os.path.isdir(path)]
+    if len(folders) > 0: # hashing a whole folder (e.g. the data root) would render the report again after any change in it
+        raise ValueError(f"The input files of the reader '{figure_spec['reader']}' cannot be found in the folders {folders}, give them with 'inputs'")
+    return paths
+
+def __run_inputs__(read_args):
+    """
+    Returns the Marx_data.txt files of the runs read by ConditioningData.read_runs()
+    """
+    return ConditioningData.__get_run_paths__(read_args['data_folder'], read_args['electrode'], read_args['runs'], catalog = read_args.get('catalog'))
+
+def __status_inputs__(read_args):
+    """
+    Returns the status files which can contain data in the time range read by the StatusData folder readers, from the datetime in their names.
+    Returns None if the files are not found from the names (e.g. they are found with a catalog)
+    """
+    if read_args.get('folder_path') is None or read_args.get('catalog') is not None:
+        return None
+    timezone = read_args.get('timezone', 'Europe/Stockholm')
+    if 'datetime_limits' in read_args:
+        timestamp_limits = StatusData.__datetimes_to_timestamps__(read_args['datetime_limits'], read_args.get('time_format', '%Y%m%d-%H%M%S'), timezone)
+    else:
+        timestamp_limits = read_args['timestamp_limits']
+    return StatusData.__files_from_names__(read_args['folder_path'], timestamp_limits, timezone)
+
+# the readers whose input files are found from their arguments, see get_input_paths()
+INPUT_RESOLVERS = {
+    'conditioning_runs':    __run_inputs__,
+    'status_timestamps':    __status_inputs__,
+    'status_datetimes':     __status_inputs__,
+    'status_aggregated':    __status_inputs__,
+}
+
+def __make_figure__(figure_spec):
+    """
+    Reads the data of a figure spec and plots it
+
+    Returns
+    -------
+    fplot:          FancyPlot
+    """
+    reader = figure_spec['reader']
+    if reader not in READERS:
+        raise ValueError(f"Invalid reader '{reader}'. Valid readers: {list(READERS.keys())}")
+    data = READERS[reader](**figure_spec.get('read_args', {}))
+    fplot = getattr(data, figure_spec['plot'])(**figure_spec.get('plot_args', {}))
+    for call in figure_spec.get('calls', []):
+        getattr(fplot, call['method'])(*call.get('args', []), **call.get('kwargs', {}))
+    return fplot
+
+def __walk_files__(path):
+    """
+    Yields (file_path, stat) for a file or for all the files of a folder (recursively, in sorted order). Hidden files and folders (e.g. caches, indexes) are skipped
+    """
+    if os.path.isfile(path):
+        yield path, os.stat(path)
+        return
+    for root, dirs, files in os.walk(path):
+        dirs[:] = sorted(folder for folder in dirs if not folder.startswith('.'))
+        for file in sorted(files):
+            if not file.startswith('.'):
+                file_path = os.path.join(root, file)
+                yield file_path, os.stat(file_path)
+
+def __read_sidecar__(sidecar_path):
+    """
+    Returns the hash stored in the sidecar file of an output, or None
+    """
+    try:
+        with open(sidecar_path, 'r') as file:
+            saved = json.load(file)
+    except (OSError, ValueError):
+        return None
+    return saved.get('hash') if saved.get('version') == REPORT_VERSION else None
+
+@contextlib.contextmanager
+def __agg_backend__():
+    """
+    Switches pyplot to the non-interactive Agg backend, the previous backend is restored at the exit. The open figures are not closed
+    """
+    backend = plt.get_backend()
+    plt.switch_backend('Agg')
+    try:
+        yield
+    finally:
+        plt.switch_backend(backend)
+
+def __init_worker__():
+    """
+    Initializes a rendering process: the figures are rendered with the non-interactive Agg backend
+    """
+    plt.switch_backend('Agg')
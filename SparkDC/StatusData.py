@@ -1,6 +1,7 @@
 import numpy as np
 import pandas as pd
 import os
+import fnmatch
 import time
 import datetime
 from zoneinfo import ZoneInfo
@@ -8,8 +9,11 @@ import matplotlib.pyplot as plt
 from matplotlib.lines import Line2D
 from matplotlib.dates import DateFormatter
 
-from .Defaults import DEFAULT_TEMPERATURE_STRUCTURE, LABVIEW_TIMESTAMP_OFFSET
+from .Defaults import DEFAULT_TEMPERATURE_STRUCTURE, LABVIEW_TIMESTAMP_OFFSET, DEFAULT_CHUNKSIZE
 from . import Data
+from . import Utils
+from .FileIndex import FileIndex, timestamp_byte_range, SEEK_TOLERANCE
+from .StatusPyramid import StatusPyramid, DEFAULT_QUERY_POINTS
 
 class StatusData(Data):
     """
@@ -31,7 +35,8 @@ class StatusData(Data):
 
 
     @staticmethod
-    def read_from_files(file_paths, header = None, delimiter = '\t', engine = 'c', skiprows = 0, info_dict = DEFAULT_TEMPERATURE_STRUCTURE):
+    def read_from_files(file_paths, header = None, delimiter = '\t', engine = 'c', skiprows = 0, info_dict = DEFAULT_TEMPERATURE_STRUCTURE, cache = None, n_workers = 1, \
+        columns = None, compact = False):
         """
         Reads data from multiple files
 
@@ -49,20 +54,132 @@ class StatusData(Data):
                         Parser engine to use. The C and pyarrow engines are faster, while the python engine is currently more feature-complete. Multithreading is currently only supported by the pyarrow engine.
         skiprows:       int, default: 0
                         Skips the first N rows when reading the file
+        cache:          ParseCache, default: None
+                        If not None, the parsed files are loaded from (and stored in) this on-disk cache instead of being parsed every time
+        n_workers:      int, default: 1
+                        The number of files parsed at the same time. If 1, the files are parsed sequentially
+        columns:        str or list of str, default: None
+                        The keys of the columns to be read. Only these columns are parsed. If None, all the columns are read
+        compact:        bool, default: False
+                        If True, the columns are converted to the compact dtypes declared in the info_dict. See Data.read_from_files()
 
         Returns
         -------
         temp_data:      StatusData
                         StatusData object corresponding to the data read from the file_paths
         """
-        data = Data.read_from_files(file_paths, header = header, delimiter = delimiter, engine = engine, skiprows = skiprows, info_dict = info_dict)
+        data = Data.read_from_files(file_paths, header = header, delimiter = delimiter, engine = engine, skiprows = skiprows, info_dict = info_dict, cache = cache, \
+            n_workers = n_workers, columns = columns, compact = compact)
         temp_data = StatusData(data.df, info_dict)
-        temp_data.df.loc[:, 'timestamp'] = (temp_data.df.loc[:, 'timestamp'] - LABVIEW_TIMESTAMP_OFFSET)
+        if 'timestamp' in temp_data.df:
+            temp_data.df.loc[:, 'timestamp'] = (temp_data.df.loc[:, 'timestamp'] - LABVIEW_TIMESTAMP_OFFSET)
         return temp_data
 
+    @staticmethod
+    def read_chunks(file_paths, chunksize = DEFAULT_CHUNKSIZE, header = None, delimiter = '\t', engine = 'c', skiprows = 0, \
+        info_dict = DEFAULT_TEMPERATURE_STRUCTURE, columns = None, compact = False):
+        """
+        Reads data from multiple files in chunks with at most chunksize rows, see Data.read_chunks()
+
+        Parameters
+        ----------
+        file_paths:     str or list
+                        The filepaths from where the data will be read
+        chunksize:      int, default: 100000
+                        The maximum number of rows of a chunk
+        header:         int, default: None
+                        Row number(s) containing column labels and marking the start of the data (zero-indexed).
+        delimiter:      char, default: '\t'
+                        The delimiter used in the file.
+        engine:         str, default: 'c'
+                        Parser engine to use
+        skiprows:       int, default: 0
+                        Skips the first N rows when reading the file
+        info_dict:      dict, default: DEFAULT_TEMPERATURE_STRUCTURE
+                        The info_dict of the file
+        columns:        str or list of str, default: None
+                        The keys of the columns to be read. If None, all the columns are read
+        compact:        bool, default: False
+                        If True, the columns are converted to the compact dtypes declared in the info_dict
+
+        Returns
+        -------
+        chunks:         iterator of StatusData
+        """
+        for data in Data.read_chunks(file_paths, chunksize = chunksize, header = header, delimiter = delimiter, engine = engine, skiprows = skiprows, \
+            info_dict = info_dict, columns = columns, compact = compact):
+            temp_data = StatusData(data.df, info_dict)
+            if 'timestamp' in temp_data.df:
+                temp_data.df.loc[:, 'timestamp'] = (temp_data.df.loc[:, 'timestamp'] - LABVIEW_TIMESTAMP_OFFSET)
+            yield temp_data
+
+    @staticmethod
+    def read_from_files_between_timestamps(file_paths, timestamp_limits, header = None, delimiter = '\t', engine = 'c', skiprows = 0, \
+        info_dict = DEFAULT_TEMPERATURE_STRUCTURE, n_workers = 1, columns = None, compact = False):
+        """
+        Reads the status data between specified timestamps from multiple files.
+        The rows of each file must be sorted by their timestamp. The first and the last row in the range are found with a binary search over
+        the byte offsets of the lines, such that only the lines inside the range are parsed
+
+        Parameters
+        ----------
+        file_paths:         str or list
+                            The filepaths from where the data will be read
+        timestamp_limits:   list of double
+                            Read the data between timestamp_limits[0] and timestamp_limits[1] (unix timestamps)
+        header:             int, default: None
+                            Row number(s) containing column labels and marking the start of the data (zero-indexed).
+        delimiter:          char, default: '\t'
+                            The delimiter used in the file.
+        engine:             str, default: 'c'
+                            Parser engine to use. The C and pyarrow engines are faster, while the python engine is currently more feature-complete. Multithreading is currently only supported by the pyarrow engine.
+        skiprows:           int, default: 0
+                            Skips the first N rows when reading the file
+        info_dict:          dict, default: DEFAULT_TEMPERATURE_STRUCTURE
+                            The info_dict of the file
+        n_workers:          int, default: 1
+                            The number of files parsed at the same time. If 1, the files are parsed sequentially
+        columns:            str or list of str, default: None
+                            The keys of the columns to be read. Only these columns (and 'timestamp') are parsed. If None, all the columns are read
+        compact:            bool, default: False
+                            If True, the columns are converted to the compact dtypes declared in the info_dict. See Data.read_from_files()
+
+        Returns
+        -------
+        data:               StatusData
+                            StatusData object corresponding to the data read from the file_paths
+        """
+        if len(Utils.dim(file_paths)) == 0:
+            file_paths = [file_paths]
+
+        file_delimiter = None if delimiter == '\\s+' else delimiter
+        data_skiprows = skiprows + (header + 1 if header is not None else 0)
+
+        # the timestamps parsed by pandas can differ in the last digit from the ones used in the search
+        # search a slightly wider range and remove the data outside the required range after parsing
+        seek_limits = [timestamp_limits[0] - SEEK_TOLERANCE, timestamp_limits[1] + SEEK_TOLERANCE]
+        selected_files = []
+        byte_ranges = []
+        for file_path in file_paths:
+            byte_range = timestamp_byte_range(file_path, seek_limits, info_dict['timestamp']['col'], file_delimiter, data_skiprows, \
+                timestamp_offset = LABVIEW_TIMESTAMP_OFFSET) # the timestamps in the files are LabVIEW timestamps
+            if byte_range[1] > byte_range[0]: # skip the files without lines in the range
+                selected_files.append(file_path)
+                byte_ranges.append(byte_range)
+        if len(selected_files) == 0: # no lines in the range
+            return StatusData.__empty__(info_dict, columns = columns, compact = compact)
+
+        data = Data.read_from_files(selected_files, delimiter = delimiter, engine = engine, info_dict = info_dict, n_workers = n_workers, \
+            columns = StatusData.__with_timestamp__(columns), compact = compact, byte_ranges = byte_ranges)
+        status_data = StatusData(data.df, info_dict)
+        status_data.df.loc[:, 'timestamp'] = (status_data.df.loc[:, 'timestamp'] - LABVIEW_TIMESTAMP_OFFSET)
+        status_data.remove_data_timestamp_range(timestamp_limits)
+        return status_data
+
     @staticmethod
     def read_from_folder_between_timestamps(folder_path, timestamp_limits, timezone = "Europe/Stockholm",\
-     descending_search = True, header = None, delimiter = '\t', skiprows = 0, engine = 'c', info_dict = DEFAULT_TEMPERATURE_STRUCTURE):
+     descending_search = True, header = None, delimiter = '\t', skiprows = 0, engine = 'c', info_dict = DEFAULT_TEMPERATURE_STRUCTURE, cache = None, n_workers = 1, \
+     columns = None, compact = False, file_index = None, seek = False, catalog = None):
         """
         Reads the status data between specified timestamps from folder
 
@@ -84,13 +201,77 @@ class StatusData(Data):
                             Parser engine to use. The C and pyarrow engines are faster, while the python engine is currently more feature-complete. Multithreading is currently only supported by the pyarrow engine.
         skiprows:           int, default: 0
                             Skips the first N rows when reading the file
+        cache:              ParseCache, default: None
+                            If not None, the parsed files are loaded from (and stored in) this on-disk cache instead of being parsed every time
+        n_workers:          int, default: 1
+                            The number of files parsed at the same time. If 1, the files are parsed sequentially
+        columns:            str or list of str, default: None
+                            The keys of the columns to be read. Only these columns (and 'timestamp') are parsed. If None, all the columns are read
+        compact:            bool, default: False
+                            If True, the columns are converted to the compact dtypes declared in the info_dict. See Data.read_from_files()
+        file_index:         FileIndex or bool, default: None
+                            If not None, the files overlapping the range are found with this persistent index (updated incrementally) instead of
+                            parsing the names of all files from the folder. If True, the index from StatusData.make_file_index() is used
+        seek:               bool, default: False
+                            If True, only the lines inside the range are parsed from the selected files, see StatusData.read_from_files_between_timestamps().
+                            The cache is not used in this case
+        catalog:            Catalog, default: None
+                            If not None, the files overlapping the range are found with this catalog of the data root (its status files are updated
+                            incrementally) instead of parsing the names of all files from the folder. folder_path is not used in this case
 
         Returns
         -------
         data:               StatusData
                             StatusData object corresponding to the data read from the file_paths
         """
-        files = os.listdir(folder_path) # get all files from specified folder
+        if catalog is not None: # find the files from the catalog, without reading the folder
+            catalog.update(kinds = ['status'])
+            selected_files_full_path = catalog.files_between_timestamps(timestamp_limits, kind = 'status')
+            if len(selected_files_full_path) == 0: # no files in the range
+                return StatusData.__empty__(info_dict, columns = columns, compact = compact)
+        elif file_index is not None: # find the files from the index, without reading the folder
+            if file_index is True:
+                file_index = StatusData.make_file_index(folder_path, delimiter = delimiter, skiprows = skiprows, info_dict = info_dict)
+            file_index.update()
+            selected_files_full_path = file_index.files_between_timestamps(timestamp_limits)
+            if len(selected_files_full_path) == 0: # no files in the range
+                return StatusData.__empty__(info_dict, columns = columns, compact = compact)
+        else:
+            selected_files_full_path = StatusData.__files_from_names__(folder_path, timestamp_limits, timezone, descending_search)
+
+        if seek: # parse only the lines inside the range
+            return StatusData.read_from_files_between_timestamps(selected_files_full_path, timestamp_limits, header = header, delimiter = delimiter, \
+             engine = engine, skiprows = skiprows, info_dict = info_dict, n_workers = n_workers, columns = columns, compact = compact)
+
+        status_data_full = StatusData.read_from_files(selected_files_full_path, header = header, delimiter = delimiter, engine = engine, \
+         skiprows = skiprows, info_dict = info_dict, cache = cache, n_workers = n_workers, columns = StatusData.__with_timestamp__(columns), compact = compact) # read the files
+
+        #finally, remove the data outside the required range
+        status_data_full.remove_data_timestamp_range(timestamp_limits)
+        return status_data_full
+
+    @staticmethod
+    def __files_from_names__(folder_path, timestamp_limits, timezone = "Europe/Stockholm", descending_search = True):
+        """
+        Finds the status files which can contain data between the specified timestamps from the datetime in their names
+
+        Parameters
+        ----------
+        folder_path:        str
+                            The path of the folder containing the CryoDC status data
+        timestamp_limits:   list of double
+                            The timestamp limits
+        timezone:           str, default: 'Europe/Stockholm'
+                            The timezone corresponding to the datetime in the name of the files
+        descending_search:  bool, default: True
+                            If True, the files are searched starting from the most recent one
+
+        Returns
+        -------
+        file_paths:         list of str
+                            The full paths of the files, in ascending order
+        """
+        files = [file for file in os.listdir(folder_path) if fnmatch.fnmatch(file, 'cryodc_*.dat')] # get all status files from specified folder
 
         n_files = len(files)
         files.sort(reverse = descending_search) # sort files
@@ -132,17 +313,13 @@ class StatusData(Data):
 
         selected_files_full_path = [os.path.join(folder_path, file) for file in selected_files] #join path with folder
         selected_files_full_path.sort(reverse = False) # sort in ascending order
-        status_data_full = StatusData.read_from_files(selected_files_full_path, header = header, delimiter = delimiter, engine = engine, \
-         skiprows = skiprows, info_dict = info_dict) # read the files
-
-        #finally, remove the data outside the required range
-        status_data_full.remove_data_timestamp_range(timestamp_limits)
-        return status_data_full
+        return selected_files_full_path
 
 
     @staticmethod
     def read_from_folder_between_datetimes(folder_path, datetime_limits, time_format = '%Y%m%d-%H%M%S', timezone = "Europe/Stockholm", \
-    descending_search = True, header = None, delimiter = '\t', skiprows = 0, engine = 'c', info_dict = DEFAULT_TEMPERATURE_STRUCTURE):
+    descending_search = True, header = None, delimiter = '\t', skiprows = 0, engine = 'c', info_dict = DEFAULT_TEMPERATURE_STRUCTURE, cache = None, n_workers = 1, \
+    columns = None, compact = False, file_index = None, seek = False, catalog = None):
         """
         Reads the status data between specified datetimes from folder
 
@@ -166,15 +343,162 @@ class StatusData(Data):
                             Parser engine to use. The C and pyarrow engines are faster, while the python engine is currently more feature-complete. Multithreading is currently only supported by the pyarrow engine.
         skiprows:           int, default: 0
                             Skips the first N rows when reading the file
+        cache:              ParseCache, default: None
+                            If not None, the parsed files are loaded from (and stored in) this on-disk cache instead of being parsed every time
+        n_workers:          int, default: 1
+                            The number of files parsed at the same time. If 1, the files are parsed sequentially
+        columns:            str or list of str, default: None
+                            The keys of the columns to be read. Only these columns (and 'timestamp') are parsed. If None, all the columns are read
+        compact:            bool, default: False
+                            If True, the columns are converted to the compact dtypes declared in the info_dict. See Data.read_from_files()
+        file_index:         FileIndex or bool, default: None
+                            If not None, the files overlapping the range are found with this persistent index (updated incrementally) instead of
+                            parsing the names of all files from the folder. If True, the index from StatusData.make_file_index() is used
+        seek:               bool, default: False
+                            If True, only the lines inside the range are parsed from the selected files, see StatusData.read_from_files_between_timestamps().
+                            The cache is not used in this case
+        catalog:            Catalog, default: None
+                            If not None, the files overlapping the range are found with this catalog of the data root (its status files are updated
+                            incrementally) instead of parsing the names of all files from the folder. folder_path is not used in this case
 
         Returns
         -------
         data:               StatusData
                             StatusData object corresponding to the data read from the file_paths
         """
+        timestamp_limits = StatusData.__datetimes_to_timestamps__(datetime_limits, time_format, timezone)
+        return StatusData.read_from_folder_between_timestamps(folder_path, timestamp_limits, timezone = timezone, descending_search = descending_search, \
+         header = header, delimiter = delimiter, skiprows = skiprows, engine = engine, info_dict = info_dict, cache = cache, n_workers = n_workers, columns = columns, \
+         compact = compact, file_index = file_index, seek = seek, catalog = catalog)
+
+    @staticmethod
+    def __datetimes_to_timestamps__(datetime_limits, time_format = '%Y%m%d-%H%M%S', timezone = "Europe/Stockholm"):
+        """
+        Converts the datetime limits of a range to timestamps, see StatusData.read_from_folder_between_datetimes()
+        """
         tzinfo = ZoneInfo(timezone)
         timestamp_limit_lower = time.mktime(datetime.datetime.strptime(datetime_limits[0], time_format).replace(tzinfo=tzinfo).timetuple())
         timestamp_limit_upper = time.mktime(datetime.datetime.strptime(datetime_limits[1], time_format).replace(tzinfo=tzinfo).timetuple())
-        timestamp_limits = [timestamp_limit_lower, timestamp_limit_upper]
-        return StatusData.read_from_folder_between_timestamps(folder_path, timestamp_limits, timezone = timezone, descending_search = descending_search, \
-         header = header, delimiter = delimiter, skiprows = skiprows, engine = engine, info_dict = info_dict)
+        return [timestamp_limit_lower, timestamp_limit_upper]
+
+    @staticmethod
+    def read_aggregated_between_timestamps(folder_path, timestamp_limits, resolution = None, n_points = DEFAULT_QUERY_POINTS, pyramid = None, \
+     columns = None, delimiter = '\t', skiprows = 0, info_dict = DEFAULT_TEMPERATURE_STRUCTURE):
+        """
+        Reads the aggregated status data between specified timestamps from the StatusPyramid of a folder, using the coarsest level which still
+        gives the requested resolution. Overview plots of long time ranges can be made without reading the raw data.
+        If the requested resolution is finer than the finest level, the raw data is read instead.
+        A range without data gives a StatusData without rows, whatever the resolution
+
+        Parameters
+        ----------
+        folder_path:        str
+                            The path of the folder containing the CryoDC status data
+        timestamp_limits:   list of double
+                            Read the data between timestamp_limits[0] and timestamp_limits[1]
+        resolution:         double, default: None
+                            The requested resolution, in seconds. If None, the range is divided by n_points
+        n_points:           int, default: 2000
+                            The number of points requested over the range (e.g. the width of the plot in pixels), used if resolution is None
+        pyramid:            StatusPyramid, default: None
+                            The pyramid of the folder. If None, the pyramid stored in the folder is used (and created, if needed)
+        columns:            str or list of str, default: None
+                            The keys of the channels. If None, all the channels of the pyramid are returned
+        delimiter:          char, default: '\t'
+                            The delimiter used in the file.
+        skiprows:           int, default: 0
+                            Skips the first N rows when reading the file
+        info_dict:          dict, default: DEFAULT_TEMPERATURE_STRUCTURE
+                            The info_dict of the file
+
+        Returns
+        -------
+        data:               StatusData
+                            Contains the mean of each channel (with the key of the channel) and the columns key + '_min', key + '_max', key + '_count'.
+                            See StatusPyramid.query()
+        """
+        if pyramid is None:
+            pyramid = StatusPyramid(folder_path, info_dict = info_dict, delimiter = delimiter, skiprows = skiprows)
+        if columns is not None and len(Utils.dim(columns)) == 0:
+            columns = [columns]
+        if resolution is None:
+            resolution = (timestamp_limits[1] - timestamp_limits[0]) / n_points
+        level = pyramid.select_level(resolution)
+        if level is None: # finer than the pyramid, read the raw data
+            return StatusData.read_from_folder_between_timestamps(folder_path, timestamp_limits, delimiter = delimiter, skiprows = skiprows, \
+             info_dict = info_dict, columns = columns, file_index = pyramid.file_index, seek = True)
+
+        pyramid.update()
+        data = pyramid.query(timestamp_limits, level, keys = columns)
+        return StatusData(data.df, data.info_dict)
+
+    @staticmethod
+    def make_file_index(folder_path, delimiter = '\t', skiprows = 0, info_dict = DEFAULT_TEMPERATURE_STRUCTURE, index_path = None):
+        """
+        Makes the persistent FileIndex of a folder containing CryoDC status files
+
+        Parameters
+        ----------
+        folder_path:        str
+                            The path of the folder containing the CryoDC status data
+        delimiter:          char, default: '\t'
+                            The delimiter used in the file.
+        skiprows:           int, default: 0
+                            Skips the first N rows when reading the file
+        info_dict:          dict, default: DEFAULT_TEMPERATURE_STRUCTURE
+                            The info_dict of the file. It is used for finding the timestamp column
+        index_path:         str, default: None
+                            The path of the sidecar file of the index. If None, it is stored in folder_path
+
+        Returns
+        -------
+        file_index:         FileIndex
+        """
+        return FileIndex(folder_path, pattern = 'cryodc_*.dat', timestamp_col = info_dict['timestamp']['col'], \
+            delimiter = None if delimiter == '\\s+' else delimiter, skiprows = skiprows, index_path = index_path)
+
+    @staticmethod
+    def __empty__(info_dict = DEFAULT_TEMPERATURE_STRUCTURE, columns = None, compact = False):
+        """
+        Makes a StatusData without rows, containing the columns which would be read from the files (e.g. for a range without data)
+
+        Parameters
+        ----------
+        info_dict:      dict, default: DEFAULT_TEMPERATURE_STRUCTURE
+        columns:        str, list of str or None
+                        The keys of the requested columns. 'timestamp' is always included
+        compact:        bool, default: False
+                        If True, the columns are converted to the compact dtypes declared in the info_dict
+
+        Returns
+        -------
+        data:           StatusData
+        """
+        read_dict = Data.__select_columns__(info_dict, StatusData.__with_timestamp__(columns))
+        df = Data.__read_bytes__(b'', info_dict = read_dict)
+        df['file'] = pd.Categorical([], categories = [])
+        df['file_id'] = np.empty([0], dtype = int)
+        if compact:
+            Data.__compact_dtypes__(df, read_dict)
+        return StatusData(df, info_dict)
+
+    @staticmethod
+    def __with_timestamp__(columns):
+        """
+        Adds 'timestamp' to the list of requested columns, since it is needed for selecting the time range
+
+        Parameters
+        ----------
+        columns:        str, list of str or None
+
+        Returns
+        -------
+        columns:        list of str or None
+        """
+        if columns is None:
+            return None
+        if len(Utils.dim(columns)) == 0:
+            columns = [columns]
+        if 'timestamp' not in columns:
+            columns = list(columns) + ['timestamp']
+        return columns
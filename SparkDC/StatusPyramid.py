@@ -0,0 +1,339 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+
+from .Defaults import DEFAULT_TEMPERATURE_STRUCTURE, LABVIEW_TIMESTAMP_OFFSET
+from . import Data
+from .FileIndex import FileIndex, timestamp_byte_range, SEEK_TOLERANCE
+
+DEFAULT_PYRAMID_LEVELS = [60, 600, 3600, 86400] # the widths of the buckets of each level, in seconds: 1 min, 10 min, 1 h, 1 day
+DEFAULT_PYRAMID_DIRNAME = '.sparkdc_pyramid' # the default folder of the pyramid, inside the folder of the status files
+DEFAULT_QUERY_POINTS = 2000 # the default number of points requested from the pyramid over a time range
+PYRAMID_VERSION = 1
+STATS = ['count', 'sum', 'min', 'max'] # the aggregates stored for each bucket
+
+class StatusPyramid():
+    """
+    Multi-resolution pyramid of aggregates of the CryoDC status data. For each level (bucket width), each channel and each bucket
+    the count (of non-NaN values), sum, minimum and maximum are stored, such that the mean, min and max of long time ranges
+    can be plotted without reading the raw data.
+    The buckets are aligned to multiples of their width (unix time). The finest level is aggregated from the raw data and the coarser levels
+    from the finest one. The aggregates of each status file are stored in a .npz file and they are rebuilt only when the status file changes.
+
+    Parameters
+    ----------
+    folder_path:    str
+                    The folder containing the CryoDC status files
+    levels:         list of int, default: [60, 600, 3600, 86400]
+                    The widths of the buckets, in seconds. All widths must be multiples of the smallest one
+    pyramid_dir:    str, default: None
+                    The folder where the pyramid is stored. If None, the folder '.sparkdc_pyramid' from folder_path is used
+    info_dict:      dict, default: DEFAULT_TEMPERATURE_STRUCTURE
+                    The info_dict of the status files
+    columns:        list of str, default: None
+                    The channels to be aggregated. If None, all the channels of the info_dict (except 'timestamp') are aggregated
+    delimiter:      char, default: '\t'
+    skiprows:       int, default: 0
+    pattern:        str, default: 'cryodc_*.dat'
+                    The shell-style pattern of the names of the status files
+    """
+
+    def __init__(self, folder_path, levels = DEFAULT_PYRAMID_LEVELS, pyramid_dir = None, info_dict = DEFAULT_TEMPERATURE_STRUCTURE, columns = None, \
+        delimiter = '\t', skiprows = 0, pattern = 'cryodc_*.dat'):
+        self.levels = sorted(int(level) for level in levels)
+        if any(level % self.levels[0] != 0 for level in self.levels):
+            raise ValueError(f"The widths of the levels {self.levels} must be multiples of the smallest width")
+        self.folder_path = folder_path
+        self.pyramid_dir = pyramid_dir if pyramid_dir is not None else os.path.join(folder_path, DEFAULT_PYRAMID_DIRNAME)
+        self.info_dict = info_dict
+        if columns is None:
+            columns = [key for key, subdict in info_dict.items() if key != 'timestamp' and subdict['col'] >= 0]
+        self.keys = list(columns)
+        self.delimiter = delimiter
+        self.skiprows = skiprows
+        os.makedirs(self.pyramid_dir, exist_ok = True)
+        self.file_index = FileIndex(folder_path, pattern = pattern, timestamp_col = info_dict['timestamp']['col'], \
+            delimiter = None if delimiter == '\\s+' else delimiter, skiprows = skiprows, index_path = os.path.join(self.pyramid_dir, 'index.json'))
+        self.manifest = self.__load_manifest__()
+        self.loaded = {} # the aggregates loaded in memory, {name: (stamp, arrays)}, such that repeated queries (e.g. panning a plot) do not read the disk
+
+    def update(self):
+        """
+        Aggregates the status files which were added or changed since the last update and removes the aggregates of the deleted files
+
+        Returns
+        -------
+        changed:        list of str
+                        The names of the files which were (re)aggregated
+        """
+        self.file_index.update()
+        changed = []
+        for name, entry in self.file_index.entries.items():
+            stamp = [entry['size'], entry['mtime_ns']]
+            if self.manifest.get(name) == stamp and os.path.isfile(self.__entry_path__(name)):
+                continue
+            self.__aggregate_file__(name)
+            self.manifest[name] = stamp
+            changed.append(name)
+
+        removed = [name for name in self.manifest if name not in self.file_index.entries]
+        for name in removed:
+            del self.manifest[name]
+            self.loaded.pop(name, None)
+            if os.path.isfile(self.__entry_path__(name)):
+                os.remove(self.__entry_path__(name))
+
+        if len(changed) > 0 or len(removed) > 0:
+            self.__save_manifest__()
+        return changed
+
+    def select_level(self, resolution):
+        """
+        Returns the coarsest level which still gives the requested resolution
+
+        Parameters
+        ----------
+        resolution:     double
+                        The requested resolution, in seconds (e.g. the time range divided by the number of pixels)
+
+        Returns
+        -------
+        level:          int or None
+                        The width of the buckets of the level. None if the requested resolution is finer than the finest level
+        """
+        valid = [level for level in self.levels if level <= resolution]
+        return valid[-1] if len(valid) > 0 else None
+
+    def query(self, timestamp_limits, level, keys = None):
+        """
+        Returns the aggregates of a level between two timestamps
+
+        Parameters
+        ----------
+        timestamp_limits:   list of double
+                            The unix timestamp limits. The buckets overlapping the range are returned
+        level:              int
+                            The width of the buckets, one of the levels of the pyramid
+        keys:               str or list of str, default: None
+                            The channels. If None, all the aggregated channels are returned
+
+        Returns
+        -------
+        data:               Data
+                            The data frame contains the columns 'timestamp' (the center of the buckets), key (the mean), key + '_min', key + '_max'
+                            and key + '_count' for each channel. The 'file_id' column separates the groups of consecutive buckets
+        """
+        if level not in self.levels:
+            raise ValueError(f"Invalid level {level}. Valid levels: {self.levels}")
+        if keys is None:
+            keys = self.keys
+        elif isinstance(keys, str):
+            keys = [keys]
+        for key in keys:
+            if key not in self.keys:
+                raise ValueError(f"'{key}' is not aggregated in the pyramid!")
+        columns = [self.keys.index(key) for key in keys]
+
+        # load the aggregates of the files overlapping the range
+        parts = {stat: [] for stat in ['bucket'] + STATS}
+        low = np.floor(timestamp_limits[0] / level) * level
+        for file_path in self.file_index.files_between_timestamps([low, timestamp_limits[1]]):
+            entry = self.__load_entry__(os.path.basename(file_path))
+            if entry is None:
+                continue
+            bucket = entry[f'{level}_bucket']
+            start = np.searchsorted(bucket, low, side = 'left') # the buckets are sorted
+            end = np.searchsorted(bucket, timestamp_limits[1], side = 'right')
+            parts['bucket'].append(bucket[start:end])
+            for stat in STATS:
+                parts[stat].append(entry[f'{level}_{stat}'][start:end, columns])
+
+        if len(parts['bucket']) == 0:
+            bucket = np.empty([0])
+            aggregates = {stat: np.empty([0, len(keys)]) for stat in STATS}
+        else:
+            # the buckets at the boundary between two files are found in both files, merge them
+            bucket, aggregates = StatusPyramid.__combine__(np.concatenate(parts['bucket']), \
+                {stat: np.concatenate(parts[stat]) for stat in STATS}, level)
+
+        columns = {'timestamp': bucket + level / 2}
+        info_dict = {'timestamp': dict(self.info_dict['timestamp'])}
+        with np.errstate(invalid = 'ignore', divide = 'ignore'):
+            mean = aggregates['sum'] / aggregates['count']
+        for i, key in enumerate(keys):
+            label = self.info_dict[key].get('label', key)
+            unit = self.info_dict[key].get('unit', '')
+            columns[key] = mean[:, i]
+            columns[key + '_min'] = aggregates['min'][:, i]
+            columns[key + '_max'] = aggregates['max'][:, i]
+            columns[key + '_count'] = aggregates['count'][:, i].astype(int)
+            info_dict[key] = {'col': -1, 'label': label, 'unit': unit, 'concatenation_type': 'normal'}
+            info_dict[key + '_min'] = {'col': -1, 'label': f'{label} (min)', 'unit': unit, 'concatenation_type': 'normal'}
+            info_dict[key + '_max'] = {'col': -1, 'label': f'{label} (max)', 'unit': unit, 'concatenation_type': 'normal'}
+            info_dict[key + '_count'] = {'col': -1, 'label': f'{label} (count)', 'unit': '', 'concatenation_type': 'normal'}
+        # a new group starts after each missing bucket, such that the gaps in the data are not bridged in the plots
+        columns['file_id'] = np.concatenate([[0], np.cumsum(np.diff(bucket) > level)]).astype(int) if bucket.shape[0] > 0 else np.empty([0], dtype = int)
+        df = pd.DataFrame(columns)
+        return Data(df, info_dict)
+
+    def read_raw(self, timestamp_limits, keys = None):
+        """
+        Reads the raw status data between two timestamps. Only the lines inside the range are parsed, see StatusData.read_from_files_between_timestamps()
+
+        Parameters
+        ----------
+        timestamp_limits:   list of double
+                            The unix timestamp limits
+        keys:               str or list of str, default: None
+                            The channels. If None, all the aggregated channels are read
+
+        Returns
+        -------
+        data:               Data
+                            The 'timestamp' column contains unix timestamps
+        """
+        if keys is None:
+            keys = self.keys
+        elif isinstance(keys, str):
+            keys = [keys]
+        read_dict = {key: self.info_dict[key] for key in list(keys) + ['timestamp']}
+        file_delimiter = None if self.delimiter == '\\s+' else self.delimiter
+
+        # the timestamps parsed by pandas can differ in the last digit from the ones used in the search
+        seek_limits = [timestamp_limits[0] - SEEK_TOLERANCE, timestamp_limits[1] + SEEK_TOLERANCE]
+        selected_files = []
+        byte_ranges = []
+        for file_path in self.file_index.files_between_timestamps(seek_limits):
+            byte_range = timestamp_byte_range(file_path, seek_limits, self.info_dict['timestamp']['col'], file_delimiter, self.skiprows, \
+                timestamp_offset = LABVIEW_TIMESTAMP_OFFSET)
+            if byte_range[1] > byte_range[0]:
+                selected_files.append(file_path)
+                byte_ranges.append(byte_range)
+        if len(selected_files) == 0:
+            df = pd.DataFrame({key: np.empty([0]) for key in read_dict})
+            df['file_id'] = np.empty([0], dtype = int)
+            return Data(df, read_dict)
+
+        data = Data.read_from_files(selected_files, delimiter = self.delimiter, info_dict = read_dict, byte_ranges = byte_ranges)
+        data.df['timestamp'] = data.df['timestamp'] - LABVIEW_TIMESTAMP_OFFSET
+        data.remove_data_timestamp_range(timestamp_limits)
+        return data
+
+    def __aggregate_file__(self, name):
+        """
+        Aggregates a status file at all the levels and stores the aggregates
+        """
+        file_path = os.path.join(self.folder_path, name)
+        read_dict = {key: self.info_dict[key] for key in self.keys + ['timestamp']}
+        data = Data.read_from_files(file_path, delimiter = self.delimiter, skiprows = self.skiprows, info_dict = read_dict)
+        timestamp = data.df['timestamp'].to_numpy(dtype = float) - LABVIEW_TIMESTAMP_OFFSET
+        values = np.full([timestamp.shape[0], len(self.keys)], np.nan)
+        for i, key in enumerate(self.keys):
+            if key in data.df:
+                values[:, i] = data.df[key].to_numpy(dtype = float)
+        valid = np.isfinite(timestamp)
+        timestamp = timestamp[valid]
+        values = values[valid]
+
+        # the finest level is aggregated from the raw data
+        finite = np.isfinite(values)
+        aggregates = {'count': finite.astype(float), 'sum': np.where(finite, values, 0), 'min': values, 'max': values}
+        bucket, aggregates = StatusPyramid.__combine__(timestamp, aggregates, self.levels[0])
+
+        arrays = {}
+        for level in self.levels: # the coarser levels are aggregated from the previous level
+            bucket, aggregates = StatusPyramid.__combine__(bucket, aggregates, level)
+            arrays[f'{level}_bucket'] = bucket
+            for stat in STATS:
+                arrays[f'{level}_{stat}'] = aggregates[stat]
+
+        entry_path = self.__entry_path__(name)
+        temp_path = entry_path + '.tmp'
+        with open(temp_path, 'wb') as file:
+            np.savez(file, **arrays)
+        os.replace(temp_path, entry_path)
+
+    def __load_entry__(self, name):
+        """
+        Returns the aggregates of a status file, loaded from the disk only if they changed since they were last loaded
+        """
+        entry_path = self.__entry_path__(name)
+        stamp = self.manifest.get(name)
+        if stamp is None or not os.path.isfile(entry_path):
+            return None
+        if name not in self.loaded or self.loaded[name][0] != stamp:
+            with np.load(entry_path, allow_pickle = False) as entry:
+                self.loaded[name] = (stamp, {key: entry[key] for key in entry.files})
+        return self.loaded[name][1]
+
+    @staticmethod
+    def __combine__(time, aggregates, width):
+        """
+        Combines the aggregates in buckets of the given width
+
+        Parameters
+        ----------
+        time:           numpy.ndarray
+                        The time of each row (raw timestamps or the start of finer buckets)
+        aggregates:     dict
+                        The arrays 'count', 'sum', 'min', 'max' of shape (n_rows, n_channels)
+        width:          double
+                        The width of the buckets
+
+        Returns
+        -------
+        bucket:         numpy.ndarray
+                        The start of each bucket
+        aggregates:     dict
+        """
+        bucket = np.floor(time / width) * width
+        if bucket.shape[0] > 1 and np.any(bucket[1:] < bucket[:-1]): # the rows are usually sorted
+            order = np.argsort(bucket, kind = 'stable')
+            bucket = bucket[order]
+            aggregates = {stat: aggregates[stat][order] for stat in STATS}
+        if bucket.shape[0] == 0:
+            return bucket, aggregates
+        starts = np.concatenate([[0], np.flatnonzero(bucket[1:] != bucket[:-1]) + 1])
+        combined = {
+            'count':    np.add.reduceat(aggregates['count'], starts, axis = 0),
+            'sum':      np.add.reduceat(aggregates['sum'], starts, axis = 0),
+            'min':      np.fmin.reduceat(aggregates['min'], starts, axis = 0),
+            'max':      np.fmax.reduceat(aggregates['max'], starts, axis = 0),
+        }
+        return bucket[starts], combined
+
+    def __entry_path__(self, name):
+        """
+        The path of the aggregates of a status file
+        """
+        return os.path.join(self.pyramid_dir, name + '.npz')
+
+    def __settings__(self):
+        """
+        The settings which change the content of the pyramid
+        """
+        return {'levels': self.levels, 'keys': self.keys, 'delimiter': self.delimiter, 'skiprows': self.skiprows}
+
+    def __load_manifest__(self):
+        """
+        Loads the size and modification time of the aggregated files. The manifest is empty if the settings changed
+        """
+        manifest_path = os.path.join(self.pyramid_dir, 'manifest.json')
+        try:
+            with open(manifest_path, 'r') as file:
+                saved = json.load(file)
+        except (OSError, ValueError):
+            return {}
+        if saved.get('version') != PYRAMID_VERSION or saved.get('settings') != self.__settings__():
+            return {}
+        return saved['files']
+
+    def __save_manifest__(self):
+        """
+        Saves the manifest of the aggregated files
+        """
+        manifest_path = os.path.join(self.pyramid_dir, 'manifest.json')
+        with open(manifest_path + '.tmp', 'w') as file:
+            json.dump({'version': PYRAMID_VERSION, 'settings': self.__settings__(), 'files': self.manifest}, file)
+        os.replace(manifest_path + '.tmp', manifest_path)
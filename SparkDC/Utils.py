@@ -1,6 +1,6 @@
-import copy
 import numpy as np
 import pandas as pd
+from statistics import NormalDist
 
 def dim(a):
     """
@@ -52,12 +52,7 @@ def duplicate_like(array, item):
     -------
     new_array:          list
     """
-    new_array = copy.deepcopy(array)
-    for i in range(0, len(array)):
-        sub_array = array[i]
-        for j in range(0, len(sub_array)):
-            new_array[i][j] = item
-    return new_array
+    return [[item] * len(sub_array) for sub_array in array]
 
 def fix_parameter_list(keys, param_array):
     """
@@ -164,6 +159,7 @@ def get_from_info_dict(info_dict, property):
 def fix_gaps_between_files(data, key, add_nan = True):
     """
     Fixes the data for plotting. It adds n-1 data points in between data corresponding to different files. If add_nan it adds a nan, otherwise it copies the previous data.
+    See Data.fix_gaps_between_files() for fixing several columns at once
 
     Parameters
     ----------
@@ -178,17 +174,30 @@ def fix_gaps_between_files(data, key, add_nan = True):
     new_x:              numpy.ndarray
                         The fixed array
     """
-    file_separators = data.file_separators
-    n_files = file_separators.shape[0]
-    x = data.df[key].to_numpy()
-    new_x = np.zeros([x.shape[0] + n_files - 1])
-    for i in range(0, n_files):
-        start = file_separators[i, 0]
-        end = file_separators[i, 1]+1
-        new_x[start+i:end+i] = x[start:end].flatten()
-        if i != n_files - 1:
-            if add_nan:
-                new_x[end+i] = np.NAN
-            else:
-                new_x[end+i] = x[end-1]
-    return new_x
+    return data.fix_gaps_between_files(key, add_nan = add_nan)[key]
+
+def t_quantile(p, dof):
+    """
+    Quantile of the Student's t distribution, used for the confidence intervals of the fits.
+    Exact for 1 and 2 degrees of freedom, otherwise a Cornish-Fisher expansion of the normal quantile (relative error below 2E-3 for 3 or more degrees of freedom)
+
+    Parameters
+    ----------
+    p:                  double
+                        The probability, e.g. 0.975 for a 95 % two-sided interval
+    dof:                int or numpy.ndarray
+                        The degrees of freedom
+
+    Returns
+    -------
+    t:                  double or numpy.ndarray
+                        NaN where dof < 1
+    """
+    dof = np.asarray(dof, dtype = float)
+    z = NormalDist().inv_cdf(p)
+    with np.errstate(invalid = 'ignore', divide = 'ignore'):
+        t = z + (z**3 + z) / (4 * dof) + (5*z**5 + 16*z**3 + 3*z) / (96 * dof**2) + (3*z**7 + 19*z**5 + 17*z**3 - 15*z) / (384 * dof**3) \
+            + (79*z**9 + 776*z**7 + 1482*z**5 - 1920*z**3 - 945*z) / (92160 * dof**4)
+    t = np.where(dof == 1, np.tan(np.pi * (p - 0.5)), t)
+    t = np.where(dof == 2, (2*p - 1) / np.sqrt(2 * p * (1 - p)), t)
+    return np.where(dof >= 1, t, np.nan)
@@ -0,0 +1,207 @@
+import numpy as np
+import pandas as pd
+
+from . import Decimation
+
+REFETCH_RATIO = 1.5 # the data is fetched again when the resolution of the view changes by more than this factor
+DEFAULT_MARGIN = 0.5 # the fraction of the view fetched on each side of it, such that small pans do not fetch new data
+ZOOM_STATS = ['minmax', 'mean']
+
+class ZoomLine():
+    """
+    A matplotlib line backed by a data source: when the x limits of its axis change (zoom or pan), only the visible window is fetched
+    from the source, at the resolution of the screen, and the data of the line is replaced.
+    A window wider than the view (see margin) is fetched, therefore panning inside it and small zooms do not fetch new data.
+
+    Parameters
+    ----------
+    line:           matplotlib.lines.Line2D
+                    The line, already added to an axis. The data of the line is in the units of the source, the line transform can scale it
+                    (e.g. convert unix timestamps to matplotlib dates, see FancyPlot.plot())
+    source:         callable
+                    source(x_limits, n_pixels) returns the (x, y) arrays of the window x_limits, in data units, decimated to about n_pixels pixel columns.
+                    For example DataSource or PyramidSource
+    margin:         double, default: 0.5
+                    The fraction of the view fetched on each side of it
+    """
+
+    def __init__(self, line, source, margin = DEFAULT_MARGIN):
+        self.line = line
+        self.source = source
+        self.margin = margin
+        self.ax = line.axes
+        self.fetched = None # (lower limit, upper limit, resolution) of the data fetched last
+        # matplotlib keeps only weak references to bound methods, the lambda keeps the ZoomLine alive as long as the axis
+        self.cid = self.ax.callbacks.connect('xlim_changed', lambda ax: self.update())
+
+    def update(self, force = False):
+        """
+        Fetches the data of the visible window, if the data fetched last does not cover it at the resolution of the screen
+
+        Parameters
+        ----------
+        force:          bool, default: False
+                        If True, the data is fetched even if the data fetched last covers the view
+        """
+        # the view limits are converted to data units with the inverse of the scaling done by the line transform
+        to_data = (self.line.get_transform() - self.ax.transData).inverted()
+        lower, upper = np.sort(to_data.transform(np.array([[limit, 0] for limit in self.ax.get_xlim()], dtype = float))[:, 0])
+        if not upper > lower:
+            return
+        n_pixels = max(int(np.ceil(self.ax.bbox.width)), 1)
+        resolution = (upper - lower) / n_pixels
+        if self.fetched is not None and not force:
+            fetched_lower, fetched_upper, fetched_resolution = self.fetched
+            if lower >= fetched_lower and upper <= fetched_upper and \
+                fetched_resolution / REFETCH_RATIO <= resolution <= fetched_resolution * REFETCH_RATIO:
+                return
+
+        extra = self.margin * (upper - lower)
+        x_limits = [lower - extra, upper + extra]
+        x, y = self.source(x_limits, int(np.ceil(n_pixels * (1 + 2 * self.margin))))
+        self.fetched = (x_limits[0], x_limits[1], resolution)
+        self.line.set_data(x, y)
+        self.ax.figure.canvas.draw_idle()
+
+    def disconnect(self):
+        """
+        Stops following the x limits of the axis. The data of the line is not changed anymore
+        """
+        self.ax.callbacks.disconnect(self.cid)
+
+class DataSource():
+    """
+    Source of a ZoomLine from in-memory arrays: the points of the window are found with a binary search (if x is sorted)
+    and decimated with Decimation.decimate_segments()
+
+    Parameters
+    ----------
+    x:              numpy.ndarray
+                    The x data, without NaN values
+    y:              numpy.ndarray
+                    The y data
+    segments:       numpy.ndarray
+                    The segments of the data (e.g. the data of each file, between the gaps), see Decimation.decimate_segments()
+    method:         ['minmax'|'lttb'], default: 'minmax'
+                    The decimation method
+    """
+
+    def __init__(self, x, y, segments = None, method = 'minmax'):
+        if method not in Decimation.DECIMATION_METHODS:
+            raise ValueError(f"Invalid decimation method '{method}'. Valid methods: {Decimation.DECIMATION_METHODS}")
+        self.x = np.asarray(x, dtype = float)
+        self.y = np.asarray(y)
+        self.segments = segments if segments is not None else np.array([[0, self.x.shape[0]]])
+        self.method = method
+        self.is_sorted = bool(np.all(self.x[1:] >= self.x[:-1]))
+
+    def __call__(self, x_limits, n_pixels):
+        """
+        Returns the decimated data of the window x_limits
+
+        Parameters
+        ----------
+        x_limits:       list of double
+        n_pixels:       int
+                        The number of pixel columns of the window
+
+        Returns
+        -------
+        x:              numpy.ndarray
+        y:              numpy.ndarray
+        """
+        if self.is_sorted: # one point outside the window on each side, such that the line reaches the edges of the view
+            start = max(np.searchsorted(self.x, x_limits[0], side = 'left') - 1, 0)
+            end = min(np.searchsorted(self.x, x_limits[1], side = 'right') + 1, self.x.shape[0])
+        else:
+            inside = np.flatnonzero((self.x >= x_limits[0]) & (self.x <= x_limits[1]))
+            start, end = (inside[0], inside[-1] + 1) if inside.shape[0] > 0 else (0, 0)
+        if end <= start:
+            return np.empty([0]), np.empty([0])
+
+        segments = np.clip(self.segments, start, end) - start
+        segments = segments[segments[:, 1] > segments[:, 0]]
+        indices = start + Decimation.decimate_segments(self.x[start:end], self.y[start:end], segments, n_pixels, method = self.method)
+        return self.x[indices], self.y[indices]
+
+    @staticmethod
+    def from_data(data, x_key, y_key, method = 'minmax'):
+        """
+        Makes the source of a column of a Data object. A gap is inserted between the data of different files, as in FancyPlot.plot_data()
+
+        Parameters
+        ----------
+        data:           Data
+        x_key:          str
+        y_key:          str
+        method:         ['minmax'|'lttb'], default: 'minmax'
+
+        Returns
+        -------
+        source:         DataSource
+        """
+        x = data.fix_gaps_between_files(x_key, add_nan = False)[x_key]
+        y = data.fix_gaps_between_files(y_key, add_nan = True)[y_key]
+        return DataSource(x, y, Decimation.gap_segments(data.file_separators), method = method)
+
+class PyramidSource():
+    """
+    Source of a ZoomLine from a StatusPyramid: each window is read from the coarsest level which still gives the resolution of the screen.
+    At deep zoom (finer than the finest level) only the lines of the window are read from the raw status files
+
+    Parameters
+    ----------
+    pyramid:        StatusPyramid
+                    The pyramid. It is updated when the source is made
+    key:            str
+                    The channel
+    stat:           ['minmax'|'mean'], default: 'minmax'
+                    'minmax' plots the minimum and the maximum of each bucket, such that spikes are not lost. 'mean' plots the mean of each bucket
+    method:         ['minmax'|'lttb'], default: 'minmax'
+                    The decimation method used for the raw data and for the buckets exceeding the resolution of the screen
+    """
+
+    def __init__(self, pyramid, key, stat = 'minmax', method = 'minmax'):
+        if stat not in ZOOM_STATS:
+            raise ValueError(f"Invalid stat '{stat}'. Valid stats: {ZOOM_STATS}")
+        self.pyramid = pyramid
+        self.key = key
+        self.stat = stat
+        self.method = method
+        self.pyramid.update()
+
+    def __call__(self, x_limits, n_pixels):
+        """
+        Returns the data of the window x_limits (unix timestamps)
+
+        Parameters
+        ----------
+        x_limits:       list of double
+        n_pixels:       int
+                        The number of pixel columns of the window
+
+        Returns
+        -------
+        x:              numpy.ndarray
+        y:              numpy.ndarray
+        """
+        level = self.pyramid.select_level((x_limits[1] - x_limits[0]) / n_pixels)
+        if level is None: # finer than the finest level
+            data = self.pyramid.read_raw(x_limits, self.key)
+        else:
+            data = self.pyramid.query(x_limits, level, keys = self.key)
+            if self.stat == 'minmax':
+                data = self.__envelope__(data)
+        if data.df.shape[0] == 0:
+            return np.empty([0]), np.empty([0])
+        return DataSource.from_data(data, 'timestamp', self.key, method = self.method)(x_limits, n_pixels)
+
+    def __envelope__(self, data):
+        """
+        Replaces each bucket by two points, at its minimum and maximum
+        """
+        df = data.df
+        envelope = np.stack([df[self.key + '_min'].to_numpy(), df[self.key + '_max'].to_numpy()], axis = 1).ravel()
+        envelope_df = pd.DataFrame({'timestamp': np.repeat(df['timestamp'].to_numpy(), 2), self.key: envelope, \
+            'file_id': np.repeat(df['file_id'].to_numpy(), 2)})
+        return type(data)(envelope_df, {key: data.info_dict[key] for key in ['timestamp', self.key]})
@@ -1,8 +1,16 @@
 from .FancyPlot import FancyPlot
 from .Data import Data
 from .FieldEmissionData import FieldEmissionData
-from .ConditioningData import ConditioningData
+from .ConditioningData import ConditioningData, ConditioningFollower
 from .RGAData import RGAData
 from .StatusData import StatusData
+from .ParseCache import ParseCache
+from .FileIndex import FileIndex
+from .StatusPyramid import StatusPyramid
+from .Catalog import Catalog
+from .LiveData import StatusFollower
+from .ChunkStats import ChunkStats
+from .ZoomData import ZoomLine, DataSource, PyramidSource
+from .Reports import render_report, render_reports
 from .Utils import *
 from .Defaults import *
@@ -0,0 +1,56 @@
+"""
+Benchmark of the Marx_data.txt readers: python engine (regex tokenizer) vs C engine.
+
+The example conditioning runs are scaled up by repeating their data rows (default: 100 times),
+then every run is read with both engines and the resulting data frames are compared.
+
+Usage: python benchmarks/benchmark_marx_reader.py [scale]
+"""
+import os
+import sys
+import glob
+import time
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from SparkDC import ConditioningData
+
+EXAMPLE_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Example Data', '066_RFQ_Nb_rm1')
+
+def make_scaled_files(folder, scale):
+    """
+    Writes the example Marx files to folder, with the data rows repeated scale times
+    """
+    file_paths = []
+    for i, example_path in enumerate(sorted(glob.glob(os.path.join(EXAMPLE_FOLDER, '*', 'Marx_data.txt')))):
+        with open(example_path, 'r') as file:
+            header = file.readline()
+            rows = file.read()
+        if not rows.endswith('\n'):
+            rows += '\n'
+        file_path = os.path.join(folder, f'Marx_data_{i:03d}.txt')
+        with open(file_path, 'w') as file:
+            file.write(header)
+            for j in range(scale):
+                file.write(rows)
+        file_paths.append(file_path)
+    return file_paths
+
+def time_reader(file_paths, engine):
+    start = time.perf_counter()
+    cond_data = ConditioningData.read_from_files(file_paths, engine = engine)
+    return time.perf_counter() - start, cond_data
+
+if __name__ == '__main__':
+    scale = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    with tempfile.TemporaryDirectory() as folder:
+        file_paths = make_scaled_files(folder, scale)
+        size = sum(os.path.getsize(file_path) for file_path in file_paths)
+
+        time_c, data_c = time_reader(file_paths, 'c')
+        time_python, data_python = time_reader(file_paths, 'python')
+
+        print(f'{len(file_paths)} files, {data_c.df.shape[0]} rows, {size/1E6:.1f} MB (example data x{scale})')
+        print(f'python engine: {time_python:8.2f} s')
+        print(f'c engine:      {time_c:8.2f} s  ({time_python/time_c:.1f}x faster)')
+        print(f'identical results: {data_c.df.equals(data_python.df)}')